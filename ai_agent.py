@@ -3,15 +3,47 @@ Zero@Design AI Agent
 Basit kural tabanlı öneri sistemi
 """
 
+import hashlib
 import json
 import random
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
-@dataclass
+from co2_attribution import DEFAULT_TOP_DRIVERS, CO2Attribution
+from collection_optimizer import CollectionOptimizer
+from emission_factors import EmissionFactorLibrary
+from feedback_store import FeedbackStore
+from co2_engine import CO2Engine, DEFAULT_FIBER, DEFAULT_WEIGHT, PROCESS_FLAGS
+from query_cache import QueryCache
+from suggestion_rules import DEFAULT_RULES_PATH, RuleEngine, render_description
+
+# Geri bildirim toplamları bu öneri tipleri için tutulur
+SUGGESTION_TYPES = ('material', 'process', 'design', 'supply_chain')
+
+# Analiz başına döndürülen en fazla öneri
+MAX_SUGGESTIONS = 5
+
+# Bellekte tutulan en fazla ürün analizi sayısı
+ANALYSIS_CACHE_SIZE = 2048
+
+def _normalize_number(value: Any) -> Any:
+    """50, 50.0 ve "50" aynı anahtarı üretsin diye sayıyı sadeleştirir"""
+    try:
+        number = round(float(value), 4)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else number
+
+@dataclass(frozen=True)
 class Suggestion:
-    """AI önerisi veri yapısı"""
+    """
+    AI önerisi veri yapısı
+
+    Değiştirilemez: önbellekteki analiz sonuçları aynı nesneleri paylaşır
+    (QueryCache yalnızca list/dict/tuple kopyalar). Değişiklik için
+    dataclasses.replace kullanılmalıdır.
+    """
     type: str  # 'material', 'process', 'design', 'supply_chain'
     title: str
     description: str
@@ -60,12 +92,97 @@ class ZeroDesignAIAgent:
             'laser_treatment': 0.6
         }
         
-        # Öğrenme için basit hafıza
+        # Veritabanı kompozisyon faktörleri (set_emission_factors ile bağlanır);
+        # değerler calibration ile bu tablonun ölçeğine taşınır, böylece işlem
+        # sabitleri ve eşikler geçerli kalır; yoksa lif katkısı tablodan hesaplanır
+        self.emission_factors: Optional[EmissionFactorLibrary] = None
+        
+        # Koleksiyon düzeyinde vektörel hesap (aynı katsayı tabloları)
+        self.co2_engine = CO2Engine.from_agent(self)
+        self.collection_optimizer = CollectionOptimizer(self.co2_engine)
+        self.co2_attribution = CO2Attribution(self.co2_engine)
+        
+        # Öneri kuralları suggestion_rules.json'dan derlenir; dosya değişince yeniden yüklenir
+        self.rule_engine = RuleEngine(DEFAULT_RULES_PATH)
+        
+        # Aynı kompozisyon tekrar gönderildiğinde analiz önbellekten döner
+        self.analysis_cache = QueryCache(max_entries=ANALYSIS_CACHE_SIZE, ttl=None)
+        
+        # Öğrenme: öneri tipi bazında geri bildirim toplamları (varsayılan
+        # yalnızca bellekte; uygulama kalıcı depo bağlar)
         self.suggestion_history = []
-        self.feedback_data = []
+        self.feedback_store = FeedbackStore()
+    
+    def set_feedback_store(self, feedback_store: FeedbackStore):
+        """Geri bildirim deposunu değiştirir (ör. kalıcı SQLite deposu)"""
+        self.feedback_store = feedback_store
+        self.analysis_cache.clear()
+    
+    def set_emission_factors(self, emission_factors: Optional[EmissionFactorLibrary]):
+        """Emisyon faktörü kütüphanesini bağlar (None: yerleşik lif tablosu)"""
+        self.emission_factors = emission_factors
+        self.co2_engine.emission_factors = emission_factors
+        self.analysis_cache.clear()
     
     def analyze_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Ürün analizi yapar ve önerileri döndürür"""
+        """
+        Ürün analizi yapar ve önerileri döndürür
+        
+        Analiz zaman damgası dışında saf bir fonksiyondur; sonuç kanonik ürün
+        anahtarıyla (canonical_product) LRU önbellekte tutulur. Form her
+        değiştiğinde gönderilen aynı kompozisyon yeniden hesaplanmaz.
+        """
+        product = self.canonical_product(product_data)
+        key = self.analysis_key(product)
+        # Geri bildirim confidence'ları veya kurallar değiştiğinde önbellek sürümü de değişir
+        analysis = self.analysis_cache.get_or_load(
+            key, (self.feedback_store.version, self.rule_engine.current_version()),
+            lambda: self._analyze(product)
+        )
+        analysis['analysis_timestamp'] = datetime.now().isoformat()
+        return analysis
+    
+    def canonical_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analizi etkileyen alanların kanonik biçimi
+        
+        %0 lifler atılır, sayılar sadeleştirilir ve işlemler yalnızca etkin
+        bayraklarıyla tutulur; böylece aynı ürünün farklı yazımları aynı
+        anahtarı üretir. Lif sırası korunur: CO₂ toplamı kayan nokta
+        toplamasının sırasına bağlıdır (.5 yuvarlama sınırında skor
+        değişebilir) ve senaryo değişiklikleri kompozisyon sırasıyla döner.
+        """
+        fibers = []
+        for fiber in product_data.get('fiberComposition', []):
+            percentage = _normalize_number(fiber.get('percentage', 0))
+            if percentage:
+                fibers.append({'type': fiber.get('type', DEFAULT_FIBER), 'percentage': percentage})
+        
+        raw_processes = product_data.get('processes', {})
+        processes: Dict[str, Dict[str, bool]] = {}
+        for group, field in PROCESS_FLAGS:
+            if raw_processes.get(group, {}).get(field):
+                processes.setdefault(group, {})[field] = True
+        
+        return {
+            'fiberComposition': fibers,
+            'processes': processes,
+            'weight': _normalize_number(product_data.get('weight', DEFAULT_WEIGHT)),
+            'productCategory': product_data.get('productCategory', 'T-shirt'),
+            'targetMarket': product_data.get('targetMarket', 'local')
+        }
+    
+    def analysis_key(self, product: Dict[str, Any]) -> str:
+        """Kanonik ürünün sha256 anahtarı"""
+        canonical = json.dumps(product, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def get_analysis_cache_stats(self) -> Dict[str, Any]:
+        """Analiz önbelleği istatistikleri (hits, misses, hit_rate, size)"""
+        return self.analysis_cache.get_stats()
+    
+    def _analyze(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Ürün analizi (zaman damgası hariç)"""
         
         # Temel bilgileri çıkar
         fiber_composition = product_data.get('fiberComposition', [])
@@ -84,30 +201,32 @@ class ZeroDesignAIAgent:
         
         # Önerileri oluştur
         suggestions = self._generate_suggestions(
-            fiber_composition, processes, current_co2, category, target_market
+            fiber_composition, processes, current_co2, category, target_market, weight
         )
         
         # What-if senaryoları
-        scenarios = self._generate_scenarios(fiber_composition, processes, weight)
+        scenarios = self._generate_scenarios(fiber_composition, processes, weight, current_co2)
         
         return {
             'current_co2': current_co2,
             'sustainability_score': sustainability_score,
             'suggestions': suggestions,
-            'scenarios': scenarios,
-            'analysis_timestamp': datetime.now().isoformat()
+            'scenarios': scenarios
         }
     
     def _calculate_co2(self, fiber_composition: List[Dict], processes: Dict, weight: float) -> float:
         """CO₂ emisyonu hesaplar"""
         total_co2 = 0
         
-        # Lif bazlı CO₂
-        for fiber in fiber_composition:
-            fiber_type = fiber.get('type', 'Pamuk')
-            percentage = fiber.get('percentage', 0)
-            co2_value = self.fiber_co2_values.get(fiber_type, 5.0)
-            total_co2 += (co2_value * percentage / 100)
+        # Lif bazlı CO₂: kompozisyon faktörü (O(1) sorgu) veya lif tablosu
+        if self.emission_factors is not None:
+            total_co2 = self.emission_factors.fiber_co2(fiber_composition)
+        else:
+            for fiber in fiber_composition:
+                fiber_type = fiber.get('type', 'Pamuk')
+                percentage = fiber.get('percentage', 0)
+                co2_value = self.fiber_co2_values.get(fiber_type, 5.0)
+                total_co2 += (co2_value * percentage / 100)
         
         # İşlem bazlı CO₂
         dyeing = processes.get('dyeing', {})
@@ -178,126 +297,70 @@ class ZeroDesignAIAgent:
         return max(0, min(100, round(score)))
     
     def _generate_suggestions(self, fiber_composition: List[Dict], processes: Dict, 
-                            current_co2: float, category: str, target_market: str) -> List[Suggestion]:
-        """Önerileri oluşturur"""
-        suggestions = []
-        
-        # Yüksek CO₂ önerileri
-        if current_co2 > 8:
-            suggestions.append(Suggestion(
-                type='material',
-                title='Geri Dönüştürülmüş Lif Kullanın',
-                description='Geri dönüştürülmüş polyester veya organik pamuk kullanarak CO₂ emisyonunu önemli ölçüde azaltabilirsiniz.',
-                impact='high',
-                co2_reduction='30-50%',
-                implementation_difficulty='medium',
-                cost_impact='medium',
-                confidence=0.9
-            ))
-        
-        # Lif bazlı öneriler
-        for fiber in fiber_composition:
-            fiber_type = fiber.get('type', 'Pamuk')
-            percentage = fiber.get('percentage', 0)
-            
-            if fiber_type == 'Polyester' and percentage > 20:
-                suggestions.append(Suggestion(
-                    type='material',
-                    title='Geri Dönüştürülmüş Polyester',
-                    description=f'%{percentage} polyester yerine geri dönüştürülmüş polyester kullanın.',
-                    impact='medium',
-                    co2_reduction='40-60%',
-                    implementation_difficulty='easy',
-                    cost_impact='low',
-                    confidence=0.8
-                ))
-            
-            if fiber_type == 'Pamuk' and percentage > 30:
-                suggestions.append(Suggestion(
-                    type='material',
-                    title='Organik Pamuk Alternatifi',
-                    description=f'%{percentage} konvansiyonel pamuk yerine organik pamuk tercih edin.',
-                    impact='medium',
-                    co2_reduction='35-45%',
-                    implementation_difficulty='easy',
-                    cost_impact='medium',
-                    confidence=0.7
-                ))
-            
-            if fiber_type in ['Elastan', 'Naylon'] and percentage > 5:
-                suggestions.append(Suggestion(
-                    type='material',
-                    title='Düşük Karbonlu Alternatif',
-                    description=f'{fiber_type} yerine Tencel veya Modal gibi düşük karbonlu alternatifler kullanın.',
-                    impact='high',
-                    co2_reduction='50-70%',
-                    implementation_difficulty='medium',
-                    cost_impact='medium',
-                    confidence=0.6
-                ))
-        
-        # İşlem bazlı öneriler
-        dyeing = processes.get('dyeing', {})
-        if not dyeing.get('naturalDye') and not dyeing.get('lowImpactDye'):
-            suggestions.append(Suggestion(
-                type='process',
-                title='Düşük Etkili Boyama',
-                description='Doğal veya düşük etkili boyar madde kullanarak çevresel etkiyi azaltın.',
-                impact='medium',
-                co2_reduction='15-25%',
-                implementation_difficulty='medium',
-                cost_impact='medium',
-                confidence=0.8
-            ))
-        
-        finishing = processes.get('finishing', {})
-        if not finishing.get('enzymaticWash'):
-            suggestions.append(Suggestion(
-                type='process',
-                title='Enzimatik Yıkama',
-                description='Geleneksel yıkama yerine enzimatik yıkama kullanın.',
-                impact='low',
-                co2_reduction='10-20%',
-                implementation_difficulty='easy',
-                cost_impact='low',
-                confidence=0.7
-            ))
-        
-        # Tedarik zinciri önerileri
-        if target_market == 'global':
-            suggestions.append(Suggestion(
-                type='supply_chain',
-                title='Yerel Tedarik Zinciri',
-                description='Lojistik emisyonlarını azaltmak için yerel tedarikçileri tercih edin.',
-                impact='medium',
-                co2_reduction='20-35%',
-                implementation_difficulty='hard',
-                cost_impact='medium',
-                confidence=0.6
-            ))
-        
-        # Tasarım önerileri
-        if category in ['Jean', 'Mont', 'Ceket']:
-            suggestions.append(Suggestion(
-                type='design',
-                title='Modüler Tasarım',
-                description='Parçaları değiştirilebilir modüler tasarım ile ürün ömrünü uzatın.',
-                impact='high',
-                co2_reduction='25-40%',
-                implementation_difficulty='hard',
-                cost_impact='high',
-                confidence=0.5
-            ))
-        
-        # En iyi 5 öneriyi döndür
-        suggestions.sort(key=lambda x: (x.confidence, x.impact == 'high'), reverse=True)
-        return suggestions[:5]
+                            current_co2: float, category: str, target_market: str,
+                            weight: Optional[float] = None) -> List[Suggestion]:
+        """Önerileri oluşturur (kural tablosu ile)"""
+        context = {
+            'current_co2': current_co2,
+            'weight': weight,
+            'fiberComposition': fiber_composition,
+            'processes': processes,
+            'category': category,
+            'target_market': target_market
+        }
+        return self._rank_suggestions(context, self.rule_engine.evaluate([context])[0])
+    
+    def _rank_suggestions(self, context: Dict[str, Any], matches: List) -> List[Suggestion]:
+        """
+        Kural eşleşmelerini confidence'a göre sıralayıp en iyi önerileri üretir
+        
+        Confidence geri bildirimle tip bazında ayarlanır; Suggestion nesneleri
+        yalnızca döndürülen öneriler için oluşturulur.
+        """
+        adjusted = {}
+        ranked = []
+        for rule, fiber in matches:
+            fields = rule['suggestion']
+            key = (fields['type'], fields['confidence'])
+            if key not in adjusted:
+                adjusted[key] = self.feedback_store.adjust_confidence(*key)
+            ranked.append((adjusted[key], fields['impact'] == 'high', rule, fiber))
+        
+        # En iyi 5 öneriyi döndür (eşitlikte kural sırası korunur)
+        ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [
+            Suggestion(**dict(rule['suggestion'], confidence=confidence,
+                              description=render_description(rule, context, fiber)))
+            for confidence, _, rule, fiber in ranked[:MAX_SUGGESTIONS]
+        ]
+    
+    def suggest_batch(self, products: List[Dict[str, Any]]) -> List[List[Suggestion]]:
+        """
+        Ürün grubunun önerileri tek kural değerlendirmesiyle üretilir
+        
+        CO₂ değerleri CO2Engine ile, kural yüklemleri tüm grup için maske
+        olarak hesaplanır; sonuç her ürün için analyze_product önerileriyle
+        aynıdır.
+        """
+        canonical = [self.canonical_product(product) for product in products]
+        current_co2 = self.co2_engine.analyze_collection(canonical)['current_co2']
+        contexts = [{
+            'current_co2': float(co2),
+            'fiberComposition': product['fiberComposition'],
+            'processes': product['processes'],
+            'weight': product['weight'],
+            'category': product['productCategory'],
+            'target_market': product['targetMarket']
+        } for product, co2 in zip(canonical, current_co2)]
+        return [self._rank_suggestions(context, matches)
+                for context, matches in zip(contexts, self.rule_engine.evaluate(contexts))]
     
     def _generate_scenarios(self, fiber_composition: List[Dict], processes: Dict, 
-                          weight: float) -> List[Dict[str, Any]]:
-        """What-if senaryoları oluşturur"""
+                          weight: float, base_co2: Optional[float] = None) -> List[Dict[str, Any]]:
+        """What-if senaryoları oluşturur (base_co2 verilmezse hesaplanır)"""
         scenarios = []
-        base_co2 = self._calculate_co2(fiber_composition, processes, weight)
+        if base_co2 is None:
+            base_co2 = self._calculate_co2(fiber_composition, processes, weight)
         
         # Senaryo 1: Tüm lifleri sürdürülebilir alternatiflere değiştir
         sustainable_composition = []
@@ -369,78 +432,66 @@ class ZeroDesignAIAgent:
     
     def optimize_collection(self, collection_data: List[Dict[str, Any]], 
                           target_reduction: float = 15.0) -> Dict[str, Any]:
-        """Koleksiyon optimizasyonu yapar"""
-        
-        total_co2_before = 0
-        optimized_products = []
-        
-        for product in collection_data:
-            analysis = self.analyze_product(product)
-            total_co2_before += analysis['current_co2']
-            
-            # En iyi senaryoyu seç
-            best_scenario = max(analysis['scenarios'], 
-                              key=lambda x: x['reduction_percentage'])
-            
-            optimized_products.append({
-                'original': product,
-                'optimized_co2': best_scenario['co2_after'],
-                'reduction': best_scenario['reduction_percentage'],
-                'changes': best_scenario['changes']
-            })
-        
-        total_co2_after = sum(p['optimized_co2'] for p in optimized_products)
-        actual_reduction = ((total_co2_before - total_co2_after) / total_co2_before) * 100
-        
-        return {
-            'target_reduction': target_reduction,
-            'actual_reduction': round(actual_reduction, 1),
-            'total_co2_before': round(total_co2_before, 1),
-            'total_co2_after': round(total_co2_after, 1),
-            'products': optimized_products,
-            'success': actual_reduction >= target_reduction
-        }
+        """
+        Koleksiyon optimizasyonu yapar
+        
+        Ürün başına müdahaleler (lif değişimi, düşük etkili işlemler, ağırlık
+        azaltma) koleksiyon hedefine en düşük maliyet ve zorlukla ulaşacak
+        şekilde CollectionOptimizer ile seçilir; yanıt maliyet-azaltım Pareto
+        sınırını da içerir.
+        """
+        return self.collection_optimizer.optimize(collection_data, target_reduction)
     
-    def learn_from_feedback(self, suggestion_id: str, feedback: Dict[str, Any]):
-        """Geri bildirimden öğrenir (basit implementasyon)"""
-        self.feedback_data.append({
-            'suggestion_id': suggestion_id,
-            'feedback': feedback,
-            'timestamp': datetime.now().isoformat()
-        })
-        
-        # Basit öğrenme: pozitif geri bildirim alan önerilerin confidence'ını artır
-        if feedback.get('rating', 0) >= 4:
-            # Bu tür önerilerin confidence'ını artır
-            pass
+    def explain_co2(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ürün CO₂'sinin lif ve işlem katkıları ile ağırlık ve yüzde türevleri
+        
+        current_co2 analyze_product ile aynıdır; katkılar yuvarlanmamış
+        toplamı (total_co2) verir.
+        """
+        return self.co2_attribution.explain(self.canonical_product(product_data))
+    
+    def top_co2_drivers(self, collection_data: List[Dict[str, Any]],
+                        top: int = DEFAULT_TOP_DRIVERS) -> Dict[str, Any]:
+        """Koleksiyon genelinde en büyük CO₂ etkenleri ve işlem kaldıraçları"""
+        return self.co2_attribution.top_drivers(collection_data, top)
+    
+    def learn_from_feedback(self, suggestion_id: str, feedback: Dict[str, Any],
+                            suggestion_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Geri bildirimden öğrenir
+        
+        Puan öneri tipinin toplamlarına eklenir; sonraki analizlerde bu tipin
+        önerilerinin confidence'ı Bayesçi başarı oranına göre ayarlanır.
+        
+        Args:
+            suggestion_id: İstemcinin öneri kimliği
+            feedback: {'rating': 1-5, 'suggestion_type': ..., 'comment': ...}
+            suggestion_type: Öneri tipi (verilmezse feedback içinden okunur)
+            
+        Returns:
+            Öneri tipinin güncel istatistikleri
+        """
+        suggestion_type = suggestion_type or feedback.get('suggestion_type') or feedback.get('type')
+        if suggestion_type not in SUGGESTION_TYPES:
+            suggestion_type = 'unknown'
+        
+        rating = float(feedback.get('rating', 0))
+        if not 0 <= rating <= 5:
+            raise ValueError("Puan 0-5 arasında olmalı")
+        
+        return self.feedback_store.record(suggestion_type, rating, suggestion_id, feedback.get('comment'))
     
     def get_learning_insights(self) -> Dict[str, Any]:
-        """Öğrenme verilerinden içgörüler çıkarır"""
-        if not self.feedback_data:
+        """Öğrenme verilerinden içgörüler çıkarır (tip toplamlarından, O(1))"""
+        insights = self.feedback_store.get_insights()
+        if not insights['total_feedback']:
             return {'message': 'Henüz yeterli veri yok'}
         
-        # Basit istatistikler
-        total_feedback = len(self.feedback_data)
-        positive_feedback = sum(1 for f in self.feedback_data 
-                              if f['feedback'].get('rating', 0) >= 4)
-        
         return {
             'total_suggestions': len(self.suggestion_history),
-            'total_feedback': total_feedback,
-            'positive_feedback_rate': round((positive_feedback / total_feedback) * 100, 1) if total_feedback > 0 else 0,
-            'most_successful_suggestion_types': self._get_successful_suggestion_types()
+            **insights
         }
-    
-    def _get_successful_suggestion_types(self) -> List[str]:
-        """En başarılı öneri tiplerini döndürür"""
-        type_success = {}
-        
-        for feedback in self.feedback_data:
-            if feedback['feedback'].get('rating', 0) >= 4:
-                suggestion_type = feedback.get('suggestion_type', 'unknown')
-                type_success[suggestion_type] = type_success.get(suggestion_type, 0) + 1
-        
-        return sorted(type_success.keys(), key=lambda x: type_success[x], reverse=True)
 
 # Global AI Agent instance
 ai_agent = ZeroDesignAIAgent()
\ No newline at end of file
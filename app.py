@@ -3,15 +3,24 @@ Zero@Design - Eco-Design @ Source Platform
 Ana uygulama dosyası
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, Response, stream_with_context
 import json
 import os
-from datetime import datetime
+import atexit
 import pandas as pd
 from ai_agent import ai_agent
 from dpp_nft import DPPGenerator, NFTIntegration, DPPStorage
+from dpp_bulk import BulkDPPCreator, iter_ndjson
+from feedback_store import FeedbackStore
 from blockchain_integration import BlockchainDPPIntegration, DPPBlockchainStorage
-from database_manager import db_manager
+from co2_uncertainty import DEFAULT_DRAWS, simulate_collection
+from database_manager import MATCH_MODES, db_manager
+from emission_factors import EmissionFactorLibrary
+from merkle_anchor import MerkleAnchorService
+from optimization_jobs import ASYNC_THRESHOLD, OptimizationJobManager
+from registration_queue import RegistrationQueue, RegistrationWorkerPool
+from scenario_sweep import ScenarioSweep
+from style_card_store import StyleCardStore
 
 app = Flask(__name__)
 
@@ -24,6 +33,18 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
+# Stil kartları (eski style_cards.json ilk kullanımda SQLite'a taşınır)
+style_card_store = StyleCardStore(db_manager.pool, os.path.join(DATA_DIR, 'style_cards.json'))
+
+# AI önerisi geri bildirimleri kalıcı tutulur (öneri tipi toplamları)
+ai_agent.set_feedback_store(FeedbackStore(os.path.join(DATA_DIR, 'ai_feedback.db')))
+
+# Lif CO₂'si product_fabric_co2 kompozisyon faktörlerinden, ajanın tablo ölçeğine
+# kalibre edilerek hesaplanır (tablolar boşsa yerleşik tablo)
+emission_factors = EmissionFactorLibrary.from_database(db_manager, ai_agent.fiber_co2_values)
+if len(emission_factors):
+    ai_agent.set_emission_factors(emission_factors)
+
 # Basit kullanıcı veritabanı (gerçek uygulamada veritabanı kullanılmalı)
 USERS = {
     'admin': 'admin123',
@@ -294,41 +315,53 @@ def get_benchmark_data():
 @app.route('/api/save-style-card', methods=['POST'])
 def save_style_card():
     """Stil kartını kaydet"""
-    data = request.get_json()
-    
-    # Stil kartı verilerini dosyaya kaydet
-    style_card_file = os.path.join(DATA_DIR, 'style_cards.json')
-    
-    # Mevcut verileri yükle
-    if os.path.exists(style_card_file):
-        with open(style_card_file, 'r', encoding='utf-8') as f:
-            style_cards = json.load(f)
-    else:
-        style_cards = []
-    
-    # Yeni stil kartını ekle
-    data['created_at'] = datetime.now().isoformat()
-    data['id'] = len(style_cards) + 1
-    style_cards.append(data)
-    
-    # Dosyaya kaydet
-    with open(style_card_file, 'w', encoding='utf-8') as f:
-        json.dump(style_cards, f, ensure_ascii=False, indent=2)
-    
-    return jsonify({"status": "success", "id": data['id']})
+    try:
+        data = request.get_json()
+        card = style_card_store.add(data)
+        return jsonify({"status": "success", "id": card['id']})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 @app.route('/api/style-cards')
 def get_style_cards():
-    """Kaydedilmiş stil kartlarını getir"""
-    style_card_file = os.path.join(DATA_DIR, 'style_cards.json')
-    
-    if os.path.exists(style_card_file):
-        with open(style_card_file, 'r', encoding='utf-8') as f:
-            style_cards = json.load(f)
-    else:
-        style_cards = []
-    
-    return jsonify({"style_cards": style_cards})
+    """Kaydedilmiş stil kartlarını sayfalı getir (?after_id=&limit=&category=)"""
+    try:
+        page = style_card_store.list_cards(
+            after_id=int(request.args.get('after_id', 0)),
+            limit=int(request.args.get('limit', 100)),
+            category=request.args.get('category')
+        )
+        return jsonify(page)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'after_id ve limit tamsayı olmalı'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/style-cards/<int:card_id>')
+def get_style_card(card_id):
+    """Id ile tek stil kartını getir"""
+    try:
+        card = style_card_store.get(card_id)
+        if card is None:
+            return jsonify({
+                'success': False,
+                'error': 'Stil kartı bulunamadı'
+            }), 404
+        return jsonify({'success': True, 'style_card': card})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
 @app.route('/api/ai-suggestions', methods=['POST'])
 def get_ai_suggestions():
@@ -375,6 +408,16 @@ def optimize_collection():
         collection_data = data.get('collection', [])
         target_reduction = data.get('target_reduction', 15.0)
         
+        # Büyük koleksiyonlar süreç havuzunda iş olarak çözülür; istemci
+        # status_url üzerinden ilerlemeyi ve sonucu sorgular
+        if data.get('async') or len(collection_data) > ASYNC_THRESHOLD:
+            job = optimization_jobs.submit(collection_data, target_reduction, data.get('timeout'))
+            job['status_url'] = url_for('get_optimization_job', job_id=job['job_id'])
+            return jsonify({
+                'success': True,
+                'job': job
+            }), 202
+        
         # AI Agent ile optimizasyon yap
         optimization = ai_agent.optimize_collection(collection_data, target_reduction)
         
@@ -383,6 +426,107 @@ def optimize_collection():
             'optimization': optimization
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/optimize-collection/jobs/<job_id>')
+def get_optimization_job(job_id):
+    """Optimizasyon işinin durumu, ilerlemesi ve (tamamlandıysa) sonucu"""
+    try:
+        job = optimization_jobs.get_job(job_id)
+        
+        if job:
+            return jsonify({
+                'success': True,
+                'job': job
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Optimizasyon işi bulunamadı'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/optimize-collection/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_optimization_job(job_id):
+    """Optimizasyon işini iptal eder"""
+    try:
+        job = optimization_jobs.cancel_job(job_id)
+        
+        if job:
+            return jsonify({
+                'success': True,
+                'job': job
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Optimizasyon işi bulunamadı'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/scenario-sweep', methods=['POST'])
+def sweep_scenarios():
+    """
+    Ürün için ağırlık x lif değişimi x işlem bayrağı ızgarası
+    
+    Gövde: product, weight_factors (liste veya {min, max, steps}),
+    substitutions (%0-100), process_flags (değiştirilecek bayraklar) ve
+    prune (varsayılan true: yalnızca maliyet-CO₂ Pareto noktaları).
+    İlk satır ızgara özeti, sonraki her satır bir noktadır (NDJSON).
+    """
+    try:
+        data = request.get_json() or {}
+        result = scenario_sweep.sweep(
+            ai_agent.canonical_product(data.get('product') or {}),
+            data.get('weight_factors'),
+            data.get('substitutions'),
+            data.get('process_flags'),
+            bool(data.get('prune', True))
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    points = result.pop('points')
+    
+    def generate():
+        yield json.dumps({'success': True, **result}, ensure_ascii=False) + '\n'
+        for point in points:
+            yield json.dumps(point, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/ai-stats')
+def get_ai_stats():
+    """AI Agent analiz önbelleği, geri bildirim öğrenme ve kural tablosu istatistikleri"""
+    try:
+        return jsonify({
+            'success': True,
+            'analysis_cache': ai_agent.get_analysis_cache_stats(),
+            'learning': ai_agent.get_learning_insights(),
+            'rules': ai_agent.rule_engine.get_stats()
+        })
+        
     except Exception as e:
         return jsonify({
             'success': False,
@@ -395,16 +539,22 @@ def submit_ai_feedback():
     try:
         data = request.get_json()
         suggestion_id = data.get('suggestion_id')
-        feedback = data.get('feedback')
+        feedback = data.get('feedback') or {}
         
         # AI Agent'a geri bildirim gönder
-        ai_agent.learn_from_feedback(suggestion_id, feedback)
+        stats = ai_agent.learn_from_feedback(suggestion_id, feedback, data.get('suggestion_type'))
         
         return jsonify({
             'success': True,
-            'message': 'Geri bildirim kaydedildi'
+            'message': 'Geri bildirim kaydedildi',
+            'suggestion_type_stats': stats
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -429,12 +579,12 @@ def create_dpp():
                 # NFT metadata hazırla
                 nft_metadata = nft_integration.prepare_nft_metadata(dpp)
                 
-                # Blockchain'e kaydet
-                blockchain_result = blockchain_integration.register_dpp_on_blockchain(dpp)
-                
-                # Blockchain kaydını yerel olarak sakla
-                if blockchain_result['success']:
-                    blockchain_storage.save_blockchain_record(dpp['dpp_id'], blockchain_result)
+                # Blockchain kaydı kalıcı kuyruğa alınır; worker'lar Merkle
+                # batch'i halinde sabitler, istek zincir gecikmesini beklemez
+                blockchain_result = anchor_service.make_receipt(dpp)
+                blockchain_storage.save_blockchain_record(dpp['dpp_id'], blockchain_result)
+                blockchain_result['registration'] = registration_queue.enqueue(dpp['dpp_id'])
+                blockchain_result['status_url'] = url_for('get_dpp_registration', dpp_id=dpp['dpp_id'])
                 
                 return jsonify({
                     'success': True,
@@ -462,6 +612,71 @@ def create_dpp():
             'error': str(e)
         }), 500
 
+@app.route('/api/create-dpp/batch', methods=['POST'])
+def create_dpp_batch():
+    """
+    Stil kartlarından toplu DPP oluştur
+    
+    Gövde JSON dizisi ({"style_cards": [...]} da olur) veya NDJSON
+    (application/x-ndjson, satır başına bir kart) olabilir. Her kartın
+    sonucu giriş sırasıyla NDJSON satırı olarak akıtılır; son satır özettir.
+    """
+    try:
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            style_cards = iter_ndjson(request.stream)
+        else:
+            data = request.get_json()
+            if isinstance(data, dict):
+                data = data.get('style_cards')
+            if not isinstance(data, list):
+                raise ValueError('Stil kartı dizisi veya NDJSON bekleniyor')
+            style_cards = data
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    def generate():
+        summary = {'total': 0, 'created': 0, 'failed': 0}
+        try:
+            for result in bulk_dpp_creator.process(style_cards):
+                summary['total'] += 1
+                summary['created' if result['success'] else 'failed'] += 1
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+            yield json.dumps({'success': True, 'summary': summary}, ensure_ascii=False) + '\n'
+        except Exception as e:
+            # Akış başladıktan sonra durum kodu değiştirilemez; hata son satırda
+            yield json.dumps({'success': False, 'error': str(e), 'summary': summary},
+                             ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/dpp/<dpp_id>/registration')
+def get_dpp_registration(dpp_id):
+    """DPP'nin blockchain kayıt durumunu getir (pending/processing/confirmed/failed)"""
+    try:
+        job = registration_queue.get_status(dpp_id)
+        
+        if job:
+            record = blockchain_storage.load_blockchain_record(dpp_id) or {}
+            return jsonify({
+                'success': True,
+                'dpp_id': dpp_id,
+                'status': job['status'],
+                'registration': job,
+                'transaction_hash': record.get('transaction_hash'),
+                'anchor': record.get('anchor')
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Kayıt işi bulunamadı'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/dpp/<dpp_id>')
 def get_dpp(dpp_id):
     """DPP'yi getir (yerel ve blockchain verisi ile)"""
@@ -473,8 +688,8 @@ def get_dpp(dpp_id):
             # Blockchain kaydını yükle
             blockchain_record = blockchain_storage.load_blockchain_record(dpp_id)
             
-            # Blockchain'den doğrulama yap
-            blockchain_verification = blockchain_integration.verify_dpp_on_blockchain(dpp_id)
+            # Yerel DPP'yi Merkle kanıtı ve sabitlenmiş kök ile doğrula
+            blockchain_verification = blockchain_integration.verify_dpp_on_blockchain(dpp_id, dpp)
             
             return jsonify({
                 'success': True,
@@ -496,29 +711,44 @@ def get_dpp(dpp_id):
 
 @app.route('/api/dpp-list')
 def list_dpps():
-    """Tüm DPP'leri listele"""
-    try:
-        dpp_ids = dpp_storage.list_dpps()
-        
-        # Her DPP için temel bilgileri getir
-        dpp_list = []
-        for dpp_id in dpp_ids:
-            dpp = dpp_storage.load_dpp(dpp_id)
-            if dpp:
-                dpp_list.append({
-                    'dpp_id': dpp_id,
-                    'product_name': dpp['product_info']['name'],
-                    'category': dpp['product_info']['category'],
-                    'co2_footprint': dpp['sustainability']['co2_footprint']['total_kg'],
-                    'sustainability_score': dpp['sustainability']['sustainability_score'],
-                    'created_at': dpp['created_at']
-                })
+    """DPP'leri katalogdan listele (?sort=&order=&category=&min_score=&max_co2=&cursor=&limit=)"""
+    try:
+        def number_arg(name):
+            value = request.args.get(name)
+            return float(value) if value not in (None, '') else None
+        
+        page = dpp_storage.list_catalog(
+            sort=request.args.get('sort', 'created_at'),
+            order=request.args.get('order', 'desc'),
+            category=request.args.get('category'),
+            min_score=number_arg('min_score'),
+            max_score=number_arg('max_score'),
+            min_co2=number_arg('min_co2'),
+            max_co2=number_arg('max_co2'),
+            cursor=request.args.get('cursor'),
+            limit=int(request.args.get('limit', 50))
+        )
+        
+        dpp_list = [{
+            'dpp_id': entry['dpp_id'],
+            'product_name': entry['product_name'],
+            'category': entry['category'],
+            'co2_footprint': entry['co2_footprint'],
+            'sustainability_score': entry['sustainability_score'],
+            'created_at': entry['created_at']
+        } for entry in page['dpps']]
         
         return jsonify({
             'success': True,
-            'dpps': dpp_list
+            'dpps': dpp_list,
+            'next_cursor': page['next_cursor']
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -556,7 +786,9 @@ def get_blockchain_stats():
         stats = blockchain_integration.get_blockchain_stats()
         return jsonify({
             'success': True,
-            'stats': stats
+            'stats': stats,
+            'anchoring': anchor_service.get_stats(),
+            'registration_queue': registration_queue.get_stats()
         })
     except Exception as e:
         return jsonify({
@@ -566,6 +798,26 @@ def get_blockchain_stats():
 
 # ===== VERİTABANI API ENDPOINT'LERİ =====
 
+@app.route('/api/blockchain-anchor/<batch_id>')
+def get_blockchain_anchor(batch_id):
+    """Merkle batch (kök) kaydını getir"""
+    try:
+        anchor = blockchain_storage.load_anchor_record(batch_id)
+        if anchor:
+            return jsonify({
+                'success': True,
+                'anchor': anchor
+            })
+        return jsonify({
+            'success': False,
+            'error': 'Anchor kaydı bulunamadı'
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/database/stats')
 def get_database_stats():
     """Veritabanı istatistiklerini getir"""
@@ -573,7 +825,8 @@ def get_database_stats():
         stats = db_manager.get_database_stats()
         return jsonify({
             'success': True,
-            'stats': stats
+            'stats': stats,
+            'cache': db_manager.get_cache_stats()
         })
     except Exception as e:
         return jsonify({
@@ -581,17 +834,30 @@ def get_database_stats():
             'error': str(e)
         }), 500
 
+def match_arg() -> str:
+    """?match= parametresi; iç kullanımdaki modlar (ör. 'equals') kabul edilmez"""
+    match = request.args.get('match', 'contains')
+    if match not in MATCH_MODES:
+        raise ValueError(f"Geçersiz eşleşme modu: {match} ({', '.join(MATCH_MODES)})")
+    return match
+
 @app.route('/api/operations/finished-products')
 def get_finished_product_operations():
     """Bitmiş ürün işlemlerini getir"""
     try:
         category = request.args.get('category')
-        operations = db_manager.get_finished_product_operations(category)
+        match = match_arg()
+        operations = db_manager.get_finished_product_operations(category, match)
         return jsonify({
             'success': True,
             'operations': operations,
             'count': len(operations)
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -603,12 +869,18 @@ def get_garment_processes():
     """Konfeksiyon süreçlerini getir"""
     try:
         category = request.args.get('category')
-        processes = db_manager.get_garment_processes(category)
+        match = match_arg()
+        processes = db_manager.get_garment_processes(category, match)
         return jsonify({
             'success': True,
             'processes': processes,
             'count': len(processes)
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -621,12 +893,18 @@ def get_master_co2_data():
     try:
         category = request.args.get('category')
         operation = request.args.get('operation')
-        co2_data = db_manager.get_master_co2_data(category, operation)
+        match = match_arg()
+        co2_data = db_manager.get_master_co2_data(category, operation, match)
         return jsonify({
             'success': True,
             'co2_data': co2_data,
             'count': len(co2_data)
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -652,7 +930,7 @@ def get_categories():
 
 @app.route('/api/search')
 def search_operations():
-    """İşlem arama"""
+    """İşlem arama (sıralı ve sayfalı)"""
     try:
         search_term = request.args.get('q', '')
         if not search_term:
@@ -661,15 +939,30 @@ def search_operations():
                 'error': 'Arama terimi gerekli'
             }), 400
         
-        results = db_manager.search_operations(search_term)
-        total_results = sum(len(v) for v in results.values())
+        per_page = min(max(int(request.args.get('per_page', 50)), 1), 200)
+        page = max(int(request.args.get('page', 1)), 1)
+        tables = request.args.get('tables')
+        tables = [t.strip() for t in tables.split(',') if t.strip()] if tables else None
+        
+        search = db_manager.search_operations(
+            search_term, limit=per_page, offset=(page - 1) * per_page, tables=tables
+        )
         
         return jsonify({
             'success': True,
-            'results': results,
-            'total_results': total_results,
+            'results': search['results'],
+            'ranked': search['ranked'],
+            'total_results': search['total'],
+            'totals_by_table': search['totals_by_table'],
+            'page': page,
+            'per_page': per_page,
             'search_term': search_term
         })
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'page ve per_page tamsayı olmalı'
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -696,12 +989,98 @@ def calculate_co2():
                 'error': 'En az bir işlem seçilmeli'
             }), 400
         
-        calculation_result = db_manager.calculate_product_co2(product_name, selected_operations)
+        # Opsiyonel Monte Carlo: {"draws": 10000, "seed": 42, "distribution": "uniform"}
+        monte_carlo = data.get('monte_carlo') or {}
+        calculation_result = db_manager.calculate_product_co2(
+            product_name, selected_operations,
+            draws=int(monte_carlo.get('draws', 0)),
+            seed=monte_carlo.get('seed'),
+            distribution=monte_carlo.get('distribution', 'uniform'),
+            attribution=bool(data.get('attribution'))
+        )
         
         return jsonify({
             'success': True,
             'calculation': calculation_result
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/co2-attribution', methods=['POST'])
+def attribute_co2():
+    """
+    CO₂ katkı ve duyarlılık analizi
+    
+    Gövde {"product": {...}} ise ürünün lif/işlem katkıları ve türevleri,
+    {"collection": [...], "top": 10} ise koleksiyonun en büyük etkenleri döner.
+    """
+    try:
+        data = request.get_json() or {}
+        
+        if isinstance(data.get('collection'), list) and data['collection']:
+            return jsonify({
+                'success': True,
+                'drivers': ai_agent.top_co2_drivers(data['collection'], int(data.get('top', 10)))
+            })
+        
+        if not isinstance(data.get('product'), dict):
+            return jsonify({
+                'success': False,
+                'error': 'Ürün (product) veya koleksiyon (collection) gerekli'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'attribution': ai_agent.explain_co2(data['product'])
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/co2-uncertainty', methods=['POST'])
+def calculate_co2_uncertainty():
+    """Ürün ve koleksiyon için Monte Carlo p5/p50/p95 CO2 bantları"""
+    try:
+        data = request.get_json() or {}
+        products = data.get('products', [])
+        
+        if not isinstance(products, list) or not products:
+            return jsonify({
+                'success': False,
+                'error': 'En az bir ürün gerekli'
+            }), 400
+        
+        uncertainty = simulate_collection(
+            products,
+            draws=int(data.get('draws', DEFAULT_DRAWS)),
+            seed=data.get('seed'),
+            distribution=data.get('distribution', 'uniform')
+        )
+        
+        return jsonify({
+            'success': True,
+            'uncertainty': uncertainty
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -757,8 +1136,9 @@ def get_master_konfeksiyon():
     try:
         category = request.args.get('category')
         name = request.args.get('name')
+        match = match_arg()
         
-        data = db_manager.get_master_konfeksiyon_data(category, name)
+        data = db_manager.get_master_konfeksiyon_data(category, name, match)
         
         return jsonify({
             'success': True,
@@ -766,6 +1146,8 @@ def get_master_konfeksiyon():
             'count': len(data)
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -777,8 +1159,9 @@ def get_fabric_co2():
         category = request.args.get('category')
         product = request.args.get('product')
         fabric_type = request.args.get('fabric_type')
+        match = match_arg()
         
-        data = db_manager.get_product_fabric_co2_data(gender, category, product, fabric_type)
+        data = db_manager.get_product_fabric_co2_data(gender, category, product, fabric_type, match)
         
         return jsonify({
             'success': True,
@@ -786,9 +1169,31 @@ def get_fabric_co2():
             'count': len(data)
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/emission-factors')
+def get_emission_factors():
+    """Kompozisyon ("%95 Pamuk / %5 Elastan") ve işlem için emisyon faktörü"""
+    try:
+        composition = request.args.get('composition')
+        process = request.args.get('process')
+        
+        result = {'success': True, 'stats': emission_factors.get_stats()}
+        if composition:
+            result['composition'] = emission_factors.lookup_text(composition)
+        if process:
+            result['process'] = emission_factors.process_factor(process)
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/fabric-types')
 def get_fabric_types():
     """Kumaş tiplerini getirir"""
@@ -917,7 +1322,8 @@ def get_all_styles():
 def get_co2_range(category):
     """Kategoriye göre CO2 aralığını getirir"""
     try:
-        co2_range = db_manager.get_co2_range_by_category(category)
+        match = match_arg()
+        co2_range = db_manager.get_co2_range_by_category(category, match)
         
         return jsonify({
             'success': True,
@@ -925,6 +1331,8 @@ def get_co2_range(category):
             'co2_range': co2_range
         })
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -933,8 +1341,31 @@ def get_co2_range(category):
 dpp_generator = DPPGenerator()
 nft_integration = NFTIntegration()
 dpp_storage = DPPStorage()
-blockchain_integration = BlockchainDPPIntegration()
 blockchain_storage = DPPBlockchainStorage()
+blockchain_integration = BlockchainDPPIntegration(storage=blockchain_storage)
+
+# DPP'ler Merkle batch'leri halinde zincire sabitlenir (boyut veya süre penceresi)
+anchor_service = MerkleAnchorService(blockchain_integration, blockchain_storage)
+
+# Kayıt işleri kalıcı kuyrukta tutulur; worker'lar yeniden deneme ve
+# backoff ile işler (süreç yeniden başlasa da iş kaybolmaz)
+registration_queue = RegistrationQueue(os.path.join(DATA_DIR, 'registration_queue.db'))
+registration_workers = RegistrationWorkerPool(registration_queue, dpp_storage, anchor_service)
+bulk_dpp_creator = BulkDPPCreator(dpp_generator, nft_integration, dpp_storage, blockchain_storage,
+                                  anchor_service, registration_queue)
+# app.py doğrudan çalıştırıldığında optimizasyon havuzunun worker süreçleri
+# (forkserver) bu dosyayı __mp_main__ olarak yeniden yükler; kayıt worker'ları
+# yalnızca ana süreçte başlatılır
+if __name__ != '__mp_main__':
+    registration_workers.start()
+    atexit.register(registration_workers.stop)
+
+# Büyük koleksiyon optimizasyonları süreç havuzunda arka plan işi olarak çalışır
+optimization_jobs = OptimizationJobManager(ai_agent.collection_optimizer)
+atexit.register(optimization_jobs.shutdown)
+
+# What-if ızgarası agent ile aynı vektörel motoru kullanır
+scenario_sweep = ScenarioSweep(ai_agent.co2_engine)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -5,30 +5,59 @@ Zero@Design projesi - DPP blockchain kaydı
 
 import json
 import hashlib
+import os
+import threading
 import requests
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
 
+from local_ledger import LocalLedger
+from merkle_anchor import MerkleAnchorService, verify_merkle_proof
+from sharded_storage import PackedJSONStore, ShardedJSONStore
+
 # Logging ayarları
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tek bir kontrat çağrısı için tahmini gas kullanımı
+ESTIMATED_GAS_PER_TX = 150000
+
+# Doğrulanmış DPP sonuçları önbelleğinin boyutu (metadata hash → sonuç)
+VERIFICATION_CACHE_SIZE = 4096
+
 class BlockchainDPPIntegration:
     """DPP'leri blockchain'e kaydetmek için entegrasyon sınıfı"""
     
-    def __init__(self, contract_address: str = None, rpc_url: str = None):
+    def __init__(self, contract_address: str = None, rpc_url: str = None,
+                 storage: Optional['DPPBlockchainStorage'] = None,
+                 ledger: Optional[LocalLedger] = None):
         """
         Blockchain entegrasyonu başlatıcı
         
         Args:
             contract_address: ink! smart contract adresi
             rpc_url: Substrate RPC endpoint URL'i
+            storage: Kanıt ve batch kayıtlarının okunduğu yerel storage
+            ledger: İşlemlerin yazıldığı yerel defter (varsayılan:
+                    storage klasöründeki ledger/)
         """
         self.contract_address = contract_address or "5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY"
         self.rpc_url = rpc_url or "ws://127.0.0.1:9944"
         self.chain_id = "development"
         
+        # Simüle zincir: canlı düğüm yerine hash zincirli yerel defter
+        if ledger is None:
+            root = storage.storage_path if storage else "data/blockchain"
+            ledger = LocalLedger(os.path.join(root, 'ledger'), gas_per_tx=ESTIMATED_GAS_PER_TX)
+        self.ledger = ledger
+        self.stats = {'verified_dpps': 0}
+        
+        self.storage = storage
+        self._verification_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._verification_lock = threading.Lock()
+        
     def register_dpp_on_blockchain(self, dpp_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         DPP'yi blockchain'e kaydet
@@ -44,18 +73,22 @@ class BlockchainDPPIntegration:
             blockchain_data = self._prepare_blockchain_data(dpp_data)
             
             # Simülasyon: Gerçek blockchain entegrasyonu için substrate-interface kullanılacak
-            # Şimdilik mock response döndürüyoruz
-            transaction_hash = self._simulate_blockchain_transaction(blockchain_data)
+            # Şimdilik işlem yerel deftere yazılıyor
+            blockchain_id = self._generate_blockchain_id(dpp_data)
+            blockchain_data['blockchain_id'] = blockchain_id
+            receipt = self.ledger.submit('register_dpp', blockchain_data,
+                                         keys=(dpp_data.get('dpp_id'), blockchain_id),
+                                         dpp_count=1)
             
             result = {
                 'success': True,
-                'transaction_hash': transaction_hash,
-                'block_number': self._get_current_block_number(),
+                'transaction_hash': receipt['transaction_hash'],
+                'block_number': receipt['block_number'],
                 'contract_address': self.contract_address,
                 'dpp_id': dpp_data.get('dpp_id'),
-                'blockchain_id': self._generate_blockchain_id(dpp_data),
-                'timestamp': datetime.now().isoformat(),
-                'gas_used': 150000,  # Tahmini gas kullanımı
+                'blockchain_id': blockchain_id,
+                'timestamp': receipt['timestamp'],
+                'gas_used': receipt['gas_used'],
                 'status': 'confirmed'
             }
             
@@ -70,35 +103,88 @@ class BlockchainDPPIntegration:
                 'dpp_id': dpp_data.get('dpp_id')
             }
     
-    def verify_dpp_on_blockchain(self, dpp_id: str) -> Dict[str, Any]:
+    def anchor_merkle_root(self, merkle_root: str, leaf_count: int, batch_id: str) -> Dict[str, Any]:
+        """
+        Bir DPP batch'inin Merkle kökünü tek işlemle blockchain'e yaz
+        
+        Args:
+            merkle_root: Batch Merkle kökü (hex)
+            leaf_count: Batch'teki DPP sayısı
+            batch_id: Batch kimliği
+            
+        Returns:
+            İşlem sonucu
+        """
+        try:
+            receipt = self.ledger.submit('anchor_merkle_root', {
+                'merkle_root': merkle_root,
+                'leaf_count': leaf_count,
+                'batch_id': batch_id,
+                'creator': 'Zero@Design'
+            }, keys=(merkle_root, batch_id), dpp_count=leaf_count)
+            
+            return {
+                'success': True,
+                'transaction_hash': receipt['transaction_hash'],
+                'block_number': receipt['block_number'],
+                'contract_address': self.contract_address,
+                'merkle_root': merkle_root,
+                'leaf_count': leaf_count,
+                'timestamp': receipt['timestamp'],
+                'gas_used': receipt['gas_used'],
+                'status': 'confirmed'
+            }
+            
+        except Exception as e:
+            logger.error(f"Merkle kökü kayıt hatası: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'merkle_root': merkle_root
+            }
+    
+    def verify_dpp_on_blockchain(self, dpp_id: str,
+                                 dpp_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         DPP'nin blockchain'deki durumunu doğrula
         
+        DPP'nin metadata hash'i yeniden hesaplanır, kayıttaki Merkle kanıtıyla
+        köke kadar (O(log n)) doğrulanır ve kökün zincire sabitlendiği kontrol
+        edilir. Başarılı sonuçlar metadata hash'iyle önbelleğe alınır; içerik
+        değişirse hash de değişeceği için önbellek kendiliğinden geçersizleşir.
+        
         Args:
             dpp_id: DPP kimliği
+            dpp_data: Doğrulanacak yerel DPP verisi
             
         Returns:
-            Doğrulama sonucu
+            Doğrulama sonucu (verified ve durum kodu: verified, pending,
+            not_registered, hash_mismatch, invalid_proof, root_not_anchored,
+            unverifiable)
         """
         try:
-            # Simülasyon: Blockchain'den DPP verilerini çek
-            blockchain_data = self._simulate_blockchain_query(dpp_id)
+            if dpp_data is None:
+                return self._verification_result(dpp_id, 'unverifiable',
+                                                 message='Doğrulama için DPP verisi gerekli')
             
-            if blockchain_data:
-                return {
-                    'success': True,
-                    'verified': True,
-                    'dpp_id': dpp_id,
-                    'blockchain_data': blockchain_data,
-                    'verification_timestamp': datetime.now().isoformat()
-                }
-            else:
-                return {
-                    'success': True,
-                    'verified': False,
-                    'dpp_id': dpp_id,
-                    'message': 'DPP blockchain\'de bulunamadı'
-                }
+            metadata_hash = self._generate_metadata_hash(dpp_data)
+            with self._verification_lock:
+                cached = self._verification_cache.get(metadata_hash)
+                if cached is not None and cached['dpp_id'] == dpp_id:
+                    self._verification_cache.move_to_end(metadata_hash)
+                    return dict(cached, cached=True,
+                                verification_timestamp=datetime.now().isoformat())
+            
+            record = self.storage.load_blockchain_record(dpp_id) if self.storage else None
+            result = self._verify_against_record(dpp_id, metadata_hash, record)
+            
+            if result['verified']:
+                with self._verification_lock:
+                    self.stats['verified_dpps'] += 1
+                    self._verification_cache[metadata_hash] = result
+                    while len(self._verification_cache) > VERIFICATION_CACHE_SIZE:
+                        self._verification_cache.popitem(last=False)
+            return result
                 
         except Exception as e:
             logger.error(f"Blockchain doğrulama hatası: {str(e)}")
@@ -108,6 +194,73 @@ class BlockchainDPPIntegration:
                 'dpp_id': dpp_id
             }
     
+    def _verify_against_record(self, dpp_id: str, metadata_hash: str,
+                               record: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Yeniden hesaplanan hash'i kayıttaki kanıt ve sabitlenmiş kökle karşılaştırır"""
+        if record is None:
+            return self._verification_result(dpp_id, 'not_registered', metadata_hash,
+                                             message='DPP blockchain\'de bulunamadı')
+        if record.get('status') == 'pending':
+            return self._verification_result(dpp_id, 'pending', metadata_hash,
+                                             message='DPP bir sonraki Merkle batch\'inde sabitlenecek')
+        if 'anchor' not in record:
+            return self._verification_result(dpp_id, 'unverifiable', metadata_hash,
+                                             message='Kayıtta kapsama kanıtı yok')
+        if record.get('metadata_hash') != metadata_hash:
+            return self._verification_result(dpp_id, 'hash_mismatch', metadata_hash,
+                                             message='DPP içeriği kaydedilen hash ile uyuşmuyor')
+        
+        root = record['anchor']['merkle_root']
+        proof = record.get('merkle_proof', [])
+        if not verify_merkle_proof(metadata_hash, proof, root):
+            return self._verification_result(dpp_id, 'invalid_proof', metadata_hash,
+                                             message='Merkle kanıtı kökü üretmiyor')
+        
+        anchored = self._query_anchored_root(root, record['anchor'].get('batch_id'))
+        if anchored is None or anchored['transaction_hash'] != record.get('transaction_hash'):
+            return self._verification_result(dpp_id, 'root_not_anchored', metadata_hash,
+                                             message='Merkle kökü zincirde bulunamadı')
+        
+        return self._verification_result(
+            dpp_id, 'verified', metadata_hash,
+            merkle_root=root,
+            transaction_hash=anchored['transaction_hash'],
+            block_number=anchored['block_number'],
+            batch_id=record['anchor'].get('batch_id'),
+            proof_length=len(proof)
+        )
+    
+    def _verification_result(self, dpp_id: str, status: str, metadata_hash: Optional[str] = None,
+                             **details) -> Dict[str, Any]:
+        result = {
+            'success': True,
+            'verified': status == 'verified',
+            'status': status,
+            'dpp_id': dpp_id,
+            'metadata_hash': metadata_hash,
+            'cached': False,
+            'verification_timestamp': datetime.now().isoformat()
+        }
+        result.update(details)
+        return result
+    
+    def _query_anchored_root(self, merkle_root: str, batch_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Merkle kökünün sabitlendiği işlemi getir (simülasyon)
+        
+        Gerçek implementasyonda kontrat durumundan okunacak; simüle zincirde
+        kök yerel defterin indeksinden aranır.
+        """
+        tx = self.ledger.get_transaction(merkle_root)
+        if tx is None or tx['kind'] != 'anchor_merkle_root' \
+                or tx['payload'].get('merkle_root') != merkle_root:
+            return None
+        return {
+            'transaction_hash': tx['hash'],
+            'block_number': tx['block_number'],
+            'batch_id': tx['payload'].get('batch_id', batch_id)
+        }
+    
     def get_dpp_from_blockchain(self, blockchain_id: str) -> Dict[str, Any]:
         """
         Blockchain'den DPP verilerini getir
@@ -175,79 +328,107 @@ class BlockchainDPPIntegration:
         base_string = f"{dpp_data.get('dpp_id')}_{datetime.now().timestamp()}"
         return hashlib.md5(base_string.encode()).hexdigest()
     
-    def _simulate_blockchain_transaction(self, data: Dict[str, Any]) -> str:
-        """Blockchain transaction simülasyonu"""
-        # Gerçek implementasyonda substrate-interface kullanılacak
-        transaction_data = json.dumps(data, sort_keys=True)
-        return hashlib.sha256(transaction_data.encode()).hexdigest()
-    
     def _simulate_blockchain_query(self, query_id: str) -> Optional[Dict[str, Any]]:
-        """Blockchain query simülasyonu"""
+        """Blockchain query simülasyonu (yerel defterdeki kayıt işlemi)"""
         # Gerçek implementasyonda blockchain'den veri çekilecek
-        # Şimdilik mock data döndürüyoruz
-        return {
-            'dpp_id': query_id,
-            'product_name': 'Sustainable T-Shirt',
-            'co2_footprint': 5,
-            'sustainability_score': 85,
-            'verified': True,
-            'block_number': self._get_current_block_number(),
-            'timestamp': datetime.now().isoformat()
-        }
+        tx = self.ledger.get_transaction(query_id)
+        if tx is None or tx['kind'] != 'register_dpp':
+            return None
+        return dict(tx['payload'],
+                    verified=True,
+                    transaction_hash=tx['hash'],
+                    block_number=tx['block_number'],
+                    block_hash=tx['block_hash'])
     
     def _get_current_block_number(self) -> int:
         """Mevcut block numarasını getir (simülasyon)"""
         # Gerçek implementasyonda blockchain'den alınacak
-        return 12345
+        return self.ledger.current_block()
     
     def get_blockchain_stats(self) -> Dict[str, Any]:
-        """Blockchain istatistiklerini getir"""
+        """Blockchain istatistiklerini getir (defter sayaçlarından, O(1))"""
+        ledger_stats = self.ledger.get_stats()
         return {
             'contract_address': self.contract_address,
             'chain_id': self.chain_id,
             'rpc_url': self.rpc_url,
-            'current_block': self._get_current_block_number(),
-            'total_dpps': 0,  # Gerçek implementasyonda contract'tan alınacak
-            'verified_dpps': 0,
+            'current_block': ledger_stats['current_block'],
+            'total_dpps': ledger_stats['dpps'],  # Gerçek implementasyonda contract'tan alınacak
+            'transactions': ledger_stats['transactions'],
+            'gas_used': ledger_stats['gas_used'],
+            'verified_dpps': self.stats['verified_dpps'],
+            'ledger': ledger_stats,
             'last_update': datetime.now().isoformat()
         }
 
 class DPPBlockchainStorage:
-    """DPP blockchain kayıtları için yerel storage"""
+    """
+    DPP blockchain kayıtları için yerel storage
+    
+    Kayıtlar hash önekli alt klasörlerde (<önek>/<dpp_id>_blockchain.json)
+    atomik olarak yazılır; düz klasördeki eski kayıtlar okunmaya devam eder.
+    Toplu kayıtlar tek paket dosyasında tutulur (bkz. PackedJSONStore).
+    """
     
     def __init__(self, storage_path: str = "data/blockchain"):
         self.storage_path = storage_path
-        import os
-        if not os.path.exists(storage_path):
-            os.makedirs(storage_path)
+        os.makedirs(storage_path, exist_ok=True)
+        self.records = PackedJSONStore(storage_path, suffix='_blockchain.json')
+        self.anchors = ShardedJSONStore(os.path.join(storage_path, 'anchors'), suffix='_anchor.json')
     
     def save_blockchain_record(self, dpp_id: str, blockchain_result: Dict[str, Any]) -> bool:
         """Blockchain kayıt sonucunu yerel olarak sakla"""
         try:
-            import os
-            file_path = os.path.join(self.storage_path, f"{dpp_id}_blockchain.json")
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(blockchain_result, f, indent=2, ensure_ascii=False)
-            
+            self.records.write(dpp_id, blockchain_result)
             return True
         except Exception as e:
             logger.error(f"Blockchain kayıt saklama hatası: {str(e)}")
             return False
     
+    def save_blockchain_records(self, records: List[Dict[str, Any]]) -> bool:
+        """Blockchain kayıtlarını tek paket dosyasında sakla (dpp_id alanına göre)"""
+        try:
+            self.records.write_pack([(record['dpp_id'], record) for record in records])
+            return True
+        except Exception as e:
+            logger.error(f"Blockchain toplu kayıt saklama hatası: {str(e)}")
+            return False
+    
     def load_blockchain_record(self, dpp_id: str) -> Optional[Dict[str, Any]]:
         """Blockchain kaydını yerel olarak yükle"""
         try:
-            import os
-            file_path = os.path.join(self.storage_path, f"{dpp_id}_blockchain.json")
-            
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return None
+            return self.records.read(dpp_id)
         except Exception as e:
             logger.error(f"Blockchain kayıt yükleme hatası: {str(e)}")
             return None
+    
+    def save_anchor_record(self, batch_id: str, anchor: Dict[str, Any]) -> bool:
+        """Merkle batch (kök) kaydını sakla"""
+        try:
+            self.anchors.write(batch_id, anchor)
+            return True
+        except Exception as e:
+            logger.error(f"Anchor kayıt saklama hatası: {str(e)}")
+            return False
+    
+    def load_anchor_record(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Merkle batch (kök) kaydını yükle"""
+        try:
+            return self.anchors.read(batch_id)
+        except Exception as e:
+            logger.error(f"Anchor kayıt yükleme hatası: {str(e)}")
+            return None
+    
+    def list_records(self) -> List[str]:
+        """Kaydı bulunan DPP ID'lerini listele"""
+        return list(self.records.iter_keys())
+    
+    def migrate_layout(self) -> Dict[str, int]:
+        """Düz klasördeki kayıtları önek klasörlerine taşı"""
+        result = self.records.migrate_flat()
+        logger.info(f"Blockchain kayıtları taşındı: {result['moved']} kayıt, "
+                    f"{result['skipped']} zaten taşınmış")
+        return result
 
 # Test fonksiyonu
 def test_blockchain_integration():
@@ -267,20 +448,39 @@ def test_blockchain_integration():
         'issuer': 'Zero@Design'
     }
     
-    # Blockchain entegrasyonu test et
-    blockchain = BlockchainDPPIntegration()
+    import tempfile
     
-    # DPP'yi blockchain'e kaydet
-    result = blockchain.register_dpp_on_blockchain(test_dpp)
-    print("Blockchain kayıt sonucu:", json.dumps(result, indent=2))
-    
-    # DPP'yi doğrula
-    verification = blockchain.verify_dpp_on_blockchain(test_dpp['dpp_id'])
-    print("Blockchain doğrulama sonucu:", json.dumps(verification, indent=2))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Blockchain entegrasyonu test et
+        storage = DPPBlockchainStorage(tmp_dir)
+        blockchain = BlockchainDPPIntegration(storage=storage)
+        anchor_service = MerkleAnchorService(blockchain, storage)
+        
+        # DPP'yi Merkle batch'i ile blockchain'e kaydet
+        receipt = anchor_service.make_receipt(test_dpp)
+        storage.save_blockchain_record(test_dpp['dpp_id'], receipt)
+        anchor_service.anchor_batch([receipt])
+        result = storage.load_blockchain_record(test_dpp['dpp_id'])
+        print("Blockchain kayıt sonucu:", json.dumps(result, indent=2))
+        
+        # DPP'yi doğrula
+        verification = blockchain.verify_dpp_on_blockchain(test_dpp['dpp_id'], test_dpp)
+        print("Blockchain doğrulama sonucu:", json.dumps(verification, indent=2))
     
     # İstatistikleri getir
     stats = blockchain.get_blockchain_stats()
     print("Blockchain istatistikleri:", json.dumps(stats, indent=2))
 
 if __name__ == "__main__":
-    test_blockchain_integration()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Zero@Design blockchain araçları")
+    parser.add_argument('--storage', default='data/blockchain', help='Blockchain kayıt klasörü')
+    parser.add_argument('--migrate-layout', action='store_true',
+                        help='Düz klasördeki kayıtları parçalı düzene taşı')
+    args = parser.parse_args()
+    
+    if args.migrate_layout:
+        DPPBlockchainStorage(args.storage).migrate_layout()
+    else:
+        test_blockchain_integration()
\ No newline at end of file
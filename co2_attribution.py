@@ -0,0 +1,306 @@
+"""
+Zero@Design - CO₂ Atıf ve Duyarlılık Analizi
+Ürün ayak izini lif ve işlem katkılarına ayırır; ağırlık ve lif yüzdesine
+göre türevleri ve koleksiyon genelinde en büyük etkenleri hesaplar
+"""
+
+import time
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from co2_engine import CO2Engine, CollectionMatrix, PROCESS_FLAGS, REFERENCE_WEIGHT
+
+# Kütüphane modunda sonlu fark adımı (yüzde puanı)
+FD_STEP = 1.0
+
+# Varsayılan döndürülen etken sayısı
+DEFAULT_TOP_DRIVERS = 10
+
+PROCESS_GROUPS = ('dyeing', 'finishing')
+
+class CO2Attribution:
+    """
+    CO2Engine hesabının toplamsal ayrışımı ve türevleri
+
+    Agent formülü C = (lif + boyama + finishing) x ağırlık / 200 olduğundan
+    katkılar yuvarlamadan önce tam toplamsaldır: her lif yuvasının katkısı
+    katsayı x yüzde / 100 x ölçek, boyama ve finishing katkıları ise seçili
+    işlem değerleri x ölçektir. Türevler:
+      - dC/dağırlık = (lif + boyama + finishing) / 200 (kg CO₂ / g)
+      - dC/dyüzde = katsayı / 100 x ölçek (kg CO₂ / yüzde puanı)
+    Emisyon faktörü kütüphanesi bağlıysa lif toplamı kompozisyonun doğrusal
+    olmayan fonksiyonudur; lif katkıları kütüphanenin doğrusal lif
+    faktörleri oranında paylaştırılır ve yüzde türevleri tüm koleksiyon için
+    yuva başına toplu merkezi sonlu farkla hesaplanır.
+
+    İşlem bayrakları ikili olduğundan türev yerine bayrağın tersine
+    çevrilmesinin CO₂ farkı (flag_toggles) verilir.
+    """
+
+    def __init__(self, engine: CO2Engine, fd_step: float = FD_STEP):
+        """
+        Args:
+            engine: Vektörel CO₂ motoru
+            fd_step: Sonlu fark adımı (yüzde puanı)
+        """
+        self.engine = engine
+        self.fd_step = fd_step
+
+    def _finite_difference(self, matrix: CollectionMatrix) -> np.ndarray:
+        """
+        Kütüphane modunda yuva başına d(lif CO₂)/d(yüzde) (200 g referans birimi)
+
+        Tüm yuvaların ± adım noktaları ürün ekseninde art arda dizilip tek
+        _fabric_co2 çağrısıyla hesaplanır. Bu yapay kompozisyonlar kütüphane
+        önbelleğine yazılmaz (memoize=False); aksi halde büyük bir koleksiyon
+        önbelleği gerçek kompozisyonlar yerine sonlu fark noktalarıyla doldurur.
+        """
+        percentages = matrix.slot_percentages
+        slots, count = percentages.shape
+        # Yüzde adımdan küçükse aşağı adım kısaltılır (negatif yüzde olmaz)
+        down = np.minimum(percentages, self.fd_step)
+        # (yuva, +/-, yuva satırı, ürün) → (yuva satırı, yuva x +/- x ürün)
+        probes = np.broadcast_to(percentages, (slots, 2, slots, count)).copy()
+        for slot in range(slots):
+            probes[slot, 0, slot] += self.fd_step
+            probes[slot, 1, slot] -= down[slot]
+        probes = probes.transpose(2, 0, 1, 3).reshape(slots, -1)
+        probe_matrix = CollectionMatrix(matrix.fibers, np.tile(matrix.slot_fibers, (1, 2 * slots)), probes,
+                                        {}, np.ones(probes.shape[1]))
+        values = self.engine._fabric_co2(probe_matrix, memoize=False).reshape(slots, 2, count)
+        return (values[:, 0] - values[:, 1]) / (self.fd_step + down)
+
+    def attribute(self, matrix: CollectionMatrix) -> Dict[str, Any]:
+        """
+        Kodlanmış koleksiyonun katkı ve türev dizileri
+
+        Returns:
+            co2 (yuvarlanmamış toplam), current_co2 (analyze ile aynı),
+            fiber ve d_percentage (yuva x ürün), dyeing, finishing, d_weight
+            ve flag_toggles (bayrak → ürün başına CO₂ farkı)
+        """
+        engine = self.engine
+        library = engine.emission_factors
+        scale = matrix.weights / REFERENCE_WEIGHT
+        dyeing, finishing = engine._process_co2(matrix.flags)
+        dyeing = np.broadcast_to(dyeing, scale.shape)
+        finishing = np.broadcast_to(finishing, scale.shape)
+
+        if library is None:
+            factors = engine._fiber_vector(matrix.fibers)
+            slot_factors = factors[matrix.slot_fibers]
+            fiber_slots = slot_factors * matrix.slot_percentages / 100
+            fiber_total = engine._fiber_co2(matrix, factors)
+            slope = slot_factors / 100
+        else:
+            fiber_total = engine._fabric_co2(matrix)
+            linear = np.array([library.fiber_factor(fiber) for fiber in matrix.fibers])[matrix.slot_fibers] \
+                * matrix.slot_percentages
+            linear_total = linear.sum(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                share = np.where(linear_total > 0, linear / linear_total, 0.0)
+            fiber_slots = share * fiber_total
+            slope = self._finite_difference(matrix)
+        # Boş yuvalar (dolgu) türev taşımaz
+        slope = np.where(matrix.slot_percentages == 0, 0.0, slope)
+
+        base = fiber_total + dyeing + finishing
+        toggles = {}
+        for _, field in PROCESS_FLAGS:
+            flipped = dict(matrix.flags)
+            flipped[field] = ~matrix.flags[field]
+            flipped_dyeing, flipped_finishing = engine._process_co2(flipped)
+            toggles[field] = (flipped_dyeing + flipped_finishing - dyeing - finishing) * scale
+
+        return {
+            'co2': base * scale,
+            'current_co2': engine._co2(fiber_total, (dyeing, finishing), matrix.weights),
+            'fiber': fiber_slots * scale,
+            'dyeing': dyeing * scale,
+            'finishing': finishing * scale,
+            'd_weight': base / REFERENCE_WEIGHT,
+            'd_percentage': slope * scale,
+            'flag_toggles': toggles
+        }
+
+    def explain(self, product: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Tek ürünün katkıları, türevleri ve etken sıralaması
+
+        Args:
+            product: analyze_product biçiminde ürün
+
+        Returns:
+            current_co2, total_co2 (yuvarlanmamış), fibers, processes,
+            process_flags, weight ve katkıya göre sıralı drivers
+        """
+        matrix = self.engine.encode([product])
+        result = self.attribute(matrix)
+        total = float(result['co2'][0])
+
+        def share(value: float) -> float:
+            return round(value / total * 100, 1) if total else 0.0
+
+        fibers = []
+        for slot in range(matrix.slot_percentages.shape[0]):
+            percentage = float(matrix.slot_percentages[slot, 0])
+            if not percentage:
+                continue
+            contribution = float(result['fiber'][slot, 0])
+            fibers.append({
+                'type': matrix.fibers[matrix.slot_fibers[slot, 0]],
+                'percentage': percentage,
+                'contribution': round(contribution, 3),
+                'share': share(contribution),
+                'd_percentage': round(float(result['d_percentage'][slot, 0]), 4)
+            })
+
+        processes = [{'process': group, 'contribution': round(float(result[group][0]), 3),
+                      'share': share(float(result[group][0]))} for group in PROCESS_GROUPS]
+
+        drivers = [{'driver': f"fiber:{fiber['type']}", 'contribution': fiber['contribution'],
+                    'share': fiber['share']} for fiber in fibers] \
+            + [{'driver': f"process:{process['process']}", 'contribution': process['contribution'],
+                'share': process['share']} for process in processes]
+        drivers.sort(key=lambda driver: driver['contribution'], reverse=True)
+
+        return {
+            'current_co2': float(result['current_co2'][0]),
+            'total_co2': round(total, 3),
+            'fibers': fibers,
+            'processes': processes,
+            'process_flags': [{
+                'group': group,
+                'flag': field,
+                'enabled': bool(matrix.flags[field][0]),
+                'delta': round(float(result['flag_toggles'][field][0]), 3)
+            } for group, field in PROCESS_FLAGS],
+            'weight': {
+                'weight': float(matrix.weights[0]),
+                'd_weight': round(float(result['d_weight'][0]), 5)
+            },
+            'drivers': drivers
+        }
+
+    def top_drivers(self, products: Sequence[Dict[str, Any]], top: int = DEFAULT_TOP_DRIVERS) -> Dict[str, Any]:
+        """
+        Koleksiyon genelinde en büyük CO₂ etkenleri ve kaldıraçlar
+
+        Lif katkıları lif türüne göre, işlem katkıları işlem grubuna göre
+        toplanır. Kaldıraçlar: kapalı olduğu ürünlerde açıldığında bayrağın
+        toplam CO₂ tasarrufu.
+
+        Args:
+            products: Koleksiyon ürünleri
+            top: Döndürülecek en fazla etken / kaldıraç / ürün
+
+        Returns:
+            total_co2, drivers, levers ve en yüksek CO₂'li ürünler (indeksle)
+        """
+        matrix = self.engine.encode(products)
+        result = self.attribute(matrix)
+        total = float(result['co2'].sum())
+
+        def share(value: float) -> float:
+            return round(value / total * 100, 1) if total else 0.0
+
+        present = matrix.slot_percentages > 0
+        fiber_totals = np.bincount(matrix.slot_fibers.ravel(), weights=result['fiber'].ravel(),
+                                   minlength=len(matrix.fibers))
+        fiber_products = np.bincount(matrix.slot_fibers.ravel(), weights=present.ravel(),
+                                     minlength=len(matrix.fibers))
+        drivers = [{'driver': f'fiber:{fiber}', 'co2': round(float(fiber_totals[i]), 2),
+                    'share': share(float(fiber_totals[i])), 'products': int(fiber_products[i])}
+                   for i, fiber in enumerate(matrix.fibers) if fiber_products[i]]
+        drivers += [{'driver': f'process:{group}', 'co2': round(float(result[group].sum()), 2),
+                     'share': share(float(result[group].sum())), 'products': len(matrix)}
+                    for group in PROCESS_GROUPS]
+        drivers.sort(key=lambda driver: driver['co2'], reverse=True)
+
+        levers = []
+        for group, field in PROCESS_FLAGS:
+            savings = np.where(~matrix.flags[field], -result['flag_toggles'][field], 0.0)
+            savings = np.clip(savings, 0, None)
+            if savings.any():
+                levers.append({'lever': f'{group}.{field}', 'saving': round(float(savings.sum()), 2),
+                               'share': share(float(savings.sum())), 'products': int((savings > 0).sum())})
+        levers.sort(key=lambda lever: lever['saving'], reverse=True)
+
+        co2 = result['current_co2']
+        top_products = np.argsort(-co2, kind='stable')[:top]
+        return {
+            'products': len(matrix),
+            'total_co2': round(total, 1),
+            'drivers': drivers[:top],
+            'levers': levers[:top],
+            'top_products': [{'index': int(i), 'co2': float(co2[i])} for i in top_products]
+        }
+
+def benchmark_attribution(count: int = 20000, check: int = 200) -> Dict[str, Any]:
+    """
+    Vektörel atfı ürün ve lif başına what-if çağrılarıyla karşılaştırır
+
+    What-if döngüsü her lif için yüzdeyi bir puan artırıp agent hesabını
+    tekrarlar. Ayrıca katkıların toplamının yuvarlandığında analyze_product
+    sonucunu verdiği doğrulanır. Motor app.py ile aynı yapılandırmada
+    (veritabanı faktör kütüphanesi bağlı, sonlu farklı türevler) ölçülür.
+
+    Returns:
+        Mod, süreler, döngü tahmini, tutarsız ürün sayısı ve atıf sonrası
+        kütüphane önbelleğindeki kompozisyon sayısı
+    """
+    from ai_agent import ai_agent
+    from co2_engine import _attach_emission_factors, _random_collection
+
+    mode = _attach_emission_factors(ai_agent)
+    products = _random_collection(count)
+    attribution = CO2Attribution(ai_agent.co2_engine)
+
+    started = time.perf_counter()
+    matrix = ai_agent.co2_engine.encode(products)
+    result = attribution.attribute(matrix)
+    vector_seconds = time.perf_counter() - started
+    library = ai_agent.co2_engine.emission_factors
+    memo_size = library.get_stats()['memo_size'] if library is not None else 0
+
+    sample = products[:check]
+    started = time.perf_counter()
+    for product in sample:
+        composition = product['fiberComposition']
+        for slot in range(len(composition)):
+            changed = [dict(fiber) for fiber in composition]
+            changed[slot]['percentage'] += 1
+            ai_agent._calculate_co2(changed, product['processes'], product['weight'])
+    loop_seconds = (time.perf_counter() - started) / len(sample) * count
+
+    parts = result['fiber'].sum(axis=0) + result['dyeing'] + result['finishing']
+    mismatches = 0
+    for i, product in enumerate(sample):
+        if ai_agent.analyze_product(product)['current_co2'] != float(result['current_co2'][i]) \
+                or abs(parts[i] - result['co2'][i]) > 1e-9:
+            mismatches += 1
+
+    return {
+        'mode': mode,
+        'skus': count,
+        'vector_seconds': round(vector_seconds, 3),
+        'loop_estimate_seconds': round(loop_seconds, 2),
+        'checked': len(sample),
+        'mismatches': mismatches,
+        'memo_size': memo_size
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design CO₂ atıf ve duyarlılık analizi")
+    parser.add_argument('--benchmark', type=int, metavar='COUNT', default=20000,
+                        help='COUNT SKU ile atıf hesabını ölç')
+    args = parser.parse_args()
+
+    result = benchmark_attribution(args.benchmark)
+    print(f"📊 {result['skus']:,} SKU ({result['mode']}): vektörel atıf {result['vector_seconds']} s "
+          f"(what-if döngüsü tahmini {result['loop_estimate_seconds']} s)")
+    print(f"✅ {result['checked']} üründe tekil hesapla fark: {result['mismatches']}, "
+          f"atıf sonrası önbellek: {result['memo_size']} kompozisyon")
@@ -0,0 +1,472 @@
+"""
+Zero@Design - Vektörel CO₂ Motoru
+Koleksiyonları lif x ürün yüzde matrisi olarak kodlayıp CO₂, skor ve
+what-if senaryolarını NumPy dizi işlemleriyle hesaplar
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Varsayılan değerler (ZeroDesignAIAgent ile aynı)
+DEFAULT_FIBER = 'Pamuk'
+UNKNOWN_FIBER_CO2 = 5.0
+DEFAULT_WEIGHT = 200
+REFERENCE_WEIGHT = 200
+
+# Senaryo 1: lif → sürdürülebilir alternatif
+SUSTAINABLE_SUBSTITUTES = {
+    'Pamuk': 'Organik Pamuk',
+    'Polyester': 'Geri Dönüştürülmüş Polyester',
+    'Elastan': 'Tencel',
+    'Naylon': 'Tencel'
+}
+
+# Senaryo 2: düşük etkili işlemler
+ECO_PROCESSES = {
+    'dyeing': {
+        'naturalDye': True,
+        'lowImpactDye': False,
+        'waterBasedDye': True
+    },
+    'finishing': {
+        'enzymaticWash': True,
+        'ozoneTreatment': True,
+        'laserTreatment': True
+    }
+}
+
+# Senaryo 3: ağırlık azaltma oranı
+WEIGHT_OPTIMIZATION_FACTOR = 0.8
+
+# İşlem bayrakları: (işlem grubu, alan)
+PROCESS_FLAGS = (
+    ('dyeing', 'naturalDye'),
+    ('dyeing', 'lowImpactDye'),
+    ('dyeing', 'waterBasedDye'),
+    ('finishing', 'enzymaticWash'),
+    ('finishing', 'ozoneTreatment'),
+    ('finishing', 'laserTreatment')
+)
+
+SCENARIO_NAMES = ('sustainable_fibers', 'eco_processes', 'weight_optimization')
+
+def round1(values: np.ndarray) -> np.ndarray:
+    """Python round(x, 1) ile aynı sonucu veren vektörel yuvarlama"""
+    # np.round(x, 1) x*10'u yuvarlar; ikili kayan noktada ...x5 değerlerinde
+    # Python'un doğru yuvarlamasından ayrılabilir. Sınırdaki değerler
+    # Python'a bırakılır (çok azdır).
+    rounded = np.round(values, 1)
+    scaled = values * 10
+    boundary = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-9
+    if boundary.any():
+        rounded[boundary] = [round(float(v), 1) for v in values[boundary]]
+    return rounded
+
+class CollectionMatrix:
+    """
+    Kodlanmış koleksiyon
+
+    percentages: (lif sayısı x ürün sayısı) yüzde matrisi
+    slot_fibers, slot_percentages: (en fazla lif sayısı x ürün sayısı)
+        kompozisyon sırasındaki lif indeksleri ve yüzdeleri (boş yuvada 0)
+    flags: işlem bayrağı adı → (ürün sayısı,) bool dizisi
+    weights: (ürün sayısı,) ağırlık dizisi
+    """
+
+    def __init__(self, fibers: List[str], slot_fibers: np.ndarray, slot_percentages: np.ndarray,
+                 flags: Dict[str, np.ndarray], weights: np.ndarray):
+        self.fibers = fibers
+        self.slot_fibers = slot_fibers
+        self.slot_percentages = slot_percentages
+        self.flags = flags
+        self.weights = weights
+        self._percentages: Optional[np.ndarray] = None
+
+    @property
+    def percentages(self) -> np.ndarray:
+        """Lif x ürün yüzde matrisi (aynı lif birden fazla geçerse toplanır)"""
+        if self._percentages is None:
+            n = len(self)
+            flat = (self.slot_fibers * n + np.arange(n)).ravel()
+            self._percentages = np.bincount(
+                flat, weights=self.slot_percentages.ravel(), minlength=len(self.fibers) * n
+            ).reshape(len(self.fibers), n)
+        return self._percentages
+
+    def __len__(self) -> int:
+        return self.weights.shape[0]
+
+class CO2Engine:
+    """
+    Koleksiyon düzeyinde vektörel CO₂ ve sürdürülebilirlik hesabı
+
+    ZeroDesignAIAgent'ın ürün başına döngüyle yaptığı hesabı (lif CO₂'si,
+    boyama ve finishing katkısı, ağırlık ölçeği, skor ve üç what-if
+    senaryosu) tüm koleksiyon için birkaç dizi işlemine indirir. Toplamlar
+    kompozisyon yuvaları üzerinden agent ile aynı sırada yapılır; böylece
+    yuvarlama sınırındaki değerlerde bile sonuçlar tekil hesapla birebir
+    aynıdır.
+    """
+
+    def __init__(self, fiber_co2_values: Dict[str, float], sustainable_fibers: Sequence[str],
+                 high_impact_fibers: Sequence[str], process_co2_impact: Dict[str, float],
+                 emission_factors=None):
+        """
+        Args:
+            fiber_co2_values: Lif → kg CO₂ katsayısı
+            sustainable_fibers: Skor bonusu alan lifler
+            high_impact_fibers: Skor cezası alan lifler
+            process_co2_impact: İşlem → kg CO₂ katkısı
+            emission_factors: Kompozisyon faktör kütüphanesi (EmissionFactorLibrary);
+                              verilirse lif katkısı katsayı tablosu yerine buradan gelir
+        """
+        self.fiber_co2_values = dict(fiber_co2_values)
+        self.sustainable_fibers = set(sustainable_fibers)
+        self.high_impact_fibers = set(high_impact_fibers)
+        self.process_co2_impact = dict(process_co2_impact)
+        self.emission_factors = emission_factors
+
+    @classmethod
+    def from_agent(cls, agent) -> 'CO2Engine':
+        """ZeroDesignAIAgent tablolarından motor oluşturur"""
+        return cls(agent.fiber_co2_values, agent.sustainable_fibers,
+                   agent.high_impact_fibers, agent.process_co2_impact,
+                   getattr(agent, 'emission_factors', None))
+
+    # --- Kodlama ---------------------------------------------------------
+
+    def encode(self, products: Sequence[Dict[str, Any]]) -> CollectionMatrix:
+        """
+        Ürün listesini lif x ürün matrisine ve işlem bayrak dizilerine çevirir
+
+        Args:
+            products: analyze_product ile aynı biçimde ürünler
+                      (fiberComposition, processes, weight)
+
+        Returns:
+            CollectionMatrix
+        """
+        fiber_index = {fiber: i for i, fiber in enumerate(self.fiber_co2_values)}
+        fibers = list(self.fiber_co2_values)
+        slots: List[int] = []
+        columns: List[int] = []
+        rows: List[int] = []
+        values: List[float] = []
+        flags = {field: np.zeros(len(products), dtype=bool) for _, field in PROCESS_FLAGS}
+        weights = np.empty(len(products), dtype=np.float64)
+
+        for column, product in enumerate(products):
+            for slot, fiber in enumerate(product.get('fiberComposition', [])):
+                fiber_type = fiber.get('type', DEFAULT_FIBER)
+                row = fiber_index.get(fiber_type)
+                if row is None:
+                    row = fiber_index[fiber_type] = len(fibers)
+                    fibers.append(fiber_type)
+                slots.append(slot)
+                columns.append(column)
+                rows.append(row)
+                values.append(fiber.get('percentage', 0))
+
+            processes = product.get('processes', {})
+            for group, field in PROCESS_FLAGS:
+                if processes.get(group, {}).get(field):
+                    flags[field][column] = True
+            weights[column] = product.get('weight', DEFAULT_WEIGHT)
+
+        depth = max(slots) + 1 if slots else 0
+        slot_fibers = np.zeros((depth, len(products)), dtype=np.int64)
+        slot_percentages = np.zeros((depth, len(products)), dtype=np.float64)
+        slot_fibers[slots, columns] = rows
+        slot_percentages[slots, columns] = values
+        return CollectionMatrix(fibers, slot_fibers, slot_percentages, flags, weights)
+
+    # --- Hesap -----------------------------------------------------------
+
+    def _fiber_vector(self, fibers: List[str], mapping=None) -> np.ndarray:
+        mapping = mapping or {}
+        return np.array([self.fiber_co2_values.get(mapping.get(f, f), UNKNOWN_FIBER_CO2)
+                         for f in fibers], dtype=np.float64)
+
+    def _fiber_co2(self, matrix: CollectionMatrix, factors: np.ndarray) -> np.ndarray:
+        """Lif katkısı: yuva yuva (katsayı x yüzde / 100) toplamı"""
+        total = np.zeros(len(matrix))
+        for fibers, percentages in zip(matrix.slot_fibers, matrix.slot_percentages):
+            total += factors[fibers] * percentages / 100
+        return total
+
+    def _fabric_co2(self, matrix: CollectionMatrix, mapping=None, memoize: bool = True) -> np.ndarray:
+        """
+        Lif katkısı (mapping: lif değişimi, ör. sürdürülebilir alternatifler)
+
+        Kütüphane bağlıysa koleksiyondaki farklı kompozisyonlar bir kez,
+        tek bir toplu sorguyla (reference_co2_many) hesaplanır; ürünler
+        sonuçları indeksle paylaşır. memoize=False kütüphanenin önbelleğini
+        ve istatistiklerini değiştirmez (yapay kompozisyonlar için).
+        """
+        if self.emission_factors is None:
+            return self._fiber_co2(matrix, self._fiber_vector(matrix.fibers, mapping))
+
+        mapping = mapping or {}
+        mapped = [mapping.get(f, f) for f in matrix.fibers]
+        fibers = list(dict.fromkeys(mapped))
+        percentages = np.zeros((len(fibers), len(matrix)))
+        for row, fiber in zip(matrix.percentages, mapped):
+            percentages[fibers.index(fiber)] += row
+
+        # Ürün satırları bayt dizisi olarak karşılaştırılır (np.unique(axis=0)'dan hızlı)
+        rows = np.ascontiguousarray(percentages.T)
+        keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * len(fibers)))).reshape(-1)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        values = self.emission_factors.reference_co2_many(fibers, rows[first], memoize)
+        return values[inverse] if len(values) else np.zeros(len(matrix))
+
+    def _process_co2(self, flags: Dict[str, np.ndarray]):
+        """Boyama ve finishing katkıları"""
+        impact = self.process_co2_impact
+        dyeing = np.where(flags['naturalDye'], impact['natural_dyeing'],
+                          np.where(flags['lowImpactDye'], impact['low_impact_dyeing'],
+                                   impact['conventional_dyeing']))
+        finishing = impact['conventional_finishing'] \
+            * np.where(flags['enzymaticWash'], 0.8, 1.0) \
+            * np.where(flags['ozoneTreatment'], 0.7, 1.0) \
+            * np.where(flags['laserTreatment'], 0.6, 1.0)
+        return dyeing, finishing
+
+    def _eco_process_co2(self):
+        impact = self.process_co2_impact
+        return impact['natural_dyeing'], impact['conventional_finishing'] * 0.8 * 0.7 * 0.6
+
+    def _co2(self, fiber_co2: np.ndarray, process_co2, weights: np.ndarray) -> np.ndarray:
+        dyeing, finishing = process_co2
+        return round1((fiber_co2 + dyeing + finishing) * (weights / REFERENCE_WEIGHT))
+
+    def _scores(self, matrix: CollectionMatrix, co2: np.ndarray) -> np.ndarray:
+        sustainable = np.array([f in self.sustainable_fibers for f in matrix.fibers])
+        high_impact = np.array([f in self.high_impact_fibers for f in matrix.fibers])
+        flags = matrix.flags
+
+        score = 100.0 - np.select([co2 > 10, co2 > 7, co2 > 5], [30.0, 20.0, 10.0], 0.0)
+        for fibers, percentages in zip(matrix.slot_fibers, matrix.slot_percentages):
+            score += np.where(sustainable[fibers], (percentages / 100) * 15, 0.0)
+            score -= np.where(high_impact[fibers], (percentages / 100) * 10, 0.0)
+        score += np.where(flags['naturalDye'], 10.0, np.where(flags['lowImpactDye'], 5.0, 0.0))
+        for field in ('waterBasedDye', 'enzymaticWash', 'ozoneTreatment', 'laserTreatment'):
+            score += np.where(flags[field], 5.0, 0.0)
+        return np.clip(np.round(score), 0, 100).astype(np.int64)
+
+    def _reduction(self, before: np.ndarray, after: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reduction = np.where(before != 0, (before - after) / before * 100, 0.0)
+        return round1(reduction)
+
+    def analyze(self, matrix: CollectionMatrix) -> Dict[str, Any]:
+        """
+        Kodlanmış koleksiyonun CO₂, skor ve senaryo sonuçları
+
+        Args:
+            matrix: encode çıktısı
+
+        Returns:
+            current_co2, sustainability_score ve senaryo başına co2_after ile
+            reduction_percentage dizileri
+        """
+        fiber_co2 = self._fabric_co2(matrix)
+        sustainable_fiber_co2 = self._fabric_co2(matrix, SUSTAINABLE_SUBSTITUTES)
+        process_co2 = self._process_co2(matrix.flags)
+
+        co2 = self._co2(fiber_co2, process_co2, matrix.weights)
+        after = {
+            'sustainable_fibers': self._co2(sustainable_fiber_co2, process_co2, matrix.weights),
+            'eco_processes': self._co2(fiber_co2, self._eco_process_co2(), matrix.weights),
+            'weight_optimization': self._co2(fiber_co2, process_co2,
+                                             matrix.weights * WEIGHT_OPTIMIZATION_FACTOR)
+        }
+        return {
+            'current_co2': co2,
+            'sustainability_score': self._scores(matrix, co2),
+            'scenarios': {
+                name: {'co2_after': values, 'reduction_percentage': self._reduction(co2, values)}
+                for name, values in after.items()
+            }
+        }
+
+    def analyze_collection(self, products: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Ürün listesini kodlayıp analiz eder (encode + analyze)"""
+        return self.analyze(self.encode(products))
+
+    # --- Koleksiyon optimizasyonu ---------------------------------------
+
+    def _scenario_changes(self, name: str, product: Dict[str, Any]) -> Any:
+        """Seçilen senaryonun ürün için değişiklik listesi (agent ile aynı biçim)"""
+        if name == 'sustainable_fibers':
+            changes = []
+            for fiber in product.get('fiberComposition', []):
+                fiber_type = fiber.get('type', DEFAULT_FIBER)
+                changes.append({
+                    'type': SUSTAINABLE_SUBSTITUTES.get(fiber_type, fiber_type),
+                    'percentage': fiber.get('percentage', 0)
+                })
+            return changes
+        if name == 'eco_processes':
+            return {group: dict(fields) for group, fields in ECO_PROCESSES.items()}
+        return {'weight': product.get('weight', DEFAULT_WEIGHT) * WEIGHT_OPTIMIZATION_FACTOR}
+
+    def optimize_collection(self, products: Sequence[Dict[str, Any]],
+                            target_reduction: float = 15.0) -> Dict[str, Any]:
+        """
+        Her ürün için en çok azaltım sağlayan senaryoyu seçer
+
+        ZeroDesignAIAgent.optimize_collection ile aynı çıktıyı üretir.
+
+        Args:
+            products: Koleksiyon ürünleri
+            target_reduction: Hedef toplam azaltım (%)
+
+        Returns:
+            Koleksiyon optimizasyon sonucu
+        """
+        analysis = self.analyze_collection(products)
+        scenarios = analysis['scenarios']
+        reductions = np.vstack([scenarios[name]['reduction_percentage'] for name in SCENARIO_NAMES])
+        co2_after = np.vstack([scenarios[name]['co2_after'] for name in SCENARIO_NAMES])
+
+        # Eşitlikte ilk senaryo seçilir (max() ile aynı)
+        best = reductions.argmax(axis=0)
+        columns = np.arange(len(products))
+        best_co2 = co2_after[best, columns]
+        best_reduction = reductions[best, columns]
+
+        total_co2_before = float(analysis['current_co2'].sum())
+        total_co2_after = float(best_co2.sum())
+        actual_reduction = (total_co2_before - total_co2_after) / total_co2_before * 100 \
+            if total_co2_before else 0.0
+
+        optimized_products = [{
+            'original': product,
+            'optimized_co2': float(best_co2[i]),
+            'reduction': float(best_reduction[i]),
+            'changes': self._scenario_changes(SCENARIO_NAMES[best[i]], product)
+        } for i, product in enumerate(products)]
+
+        return {
+            'target_reduction': target_reduction,
+            'actual_reduction': round(actual_reduction, 1),
+            'total_co2_before': round(total_co2_before, 1),
+            'total_co2_after': round(total_co2_after, 1),
+            'products': optimized_products,
+            'success': actual_reduction >= target_reduction
+        }
+
+def _random_collection(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Benchmark için rastgele koleksiyon üretir"""
+    from ai_agent import ai_agent
+
+    rng = np.random.default_rng(seed)
+    fiber_names = list(ai_agent.fiber_co2_values) + ['Kaşmir']
+    products = []
+    for _ in range(count):
+        n = int(rng.integers(1, 4))
+        chosen = rng.choice(len(fiber_names), size=n, replace=False)
+        split = rng.dirichlet(np.ones(n)) * 100
+        products.append({
+            'fiberComposition': [{'type': fiber_names[f], 'percentage': round(float(p))}
+                                 for f, p in zip(chosen, split)],
+            'processes': {
+                'dyeing': {'naturalDye': bool(rng.random() < 0.2),
+                           'lowImpactDye': bool(rng.random() < 0.3),
+                           'waterBasedDye': bool(rng.random() < 0.3)},
+                'finishing': {'enzymaticWash': bool(rng.random() < 0.4),
+                              'ozoneTreatment': bool(rng.random() < 0.3),
+                              'laserTreatment': bool(rng.random() < 0.2)}
+            },
+            'weight': int(rng.integers(100, 800))
+        })
+    return products
+
+def _attach_emission_factors(agent) -> str:
+    """
+    app.py'deki gibi veritabanı faktör kütüphanesini ajana bağlar
+
+    Benchmark'lar böylece yayındaki yapılandırmayı ölçer.
+
+    Returns:
+        'library' (kütüphane bağlandı) veya 'table' (tablolar boş, yerleşik lif tablosu)
+    """
+    from database_manager import db_manager
+    from emission_factors import EmissionFactorLibrary
+
+    library = EmissionFactorLibrary.from_database(db_manager, agent.fiber_co2_values)
+    if not len(library):
+        return 'table'
+    agent.set_emission_factors(library)
+    return 'library'
+
+def benchmark_engine(count: int = 100000, check: int = 2000) -> Dict[str, Any]:
+    """
+    Vektörel motoru ürün başına analiz döngüsüyle karşılaştırır
+
+    Motor app.py ile aynı yapılandırmada (veritabanı faktör kütüphanesi
+    bağlı) ölçülür. İlk analiz kütüphane önbelleği boşken, ikincisi aynı
+    koleksiyonla tekrar yapılır.
+
+    Args:
+        count: Koleksiyon boyutu (SKU)
+        check: Tekil hesapla karşılaştırılacak ürün sayısı
+
+    Returns:
+        Mod, kodlama ve hesap süreleri, döngü tahmini ve tutarlılık sonucu
+    """
+    from ai_agent import ai_agent
+
+    mode = _attach_emission_factors(ai_agent)
+    products = _random_collection(count)
+    engine = CO2Engine.from_agent(ai_agent)
+
+    started = time.perf_counter()
+    matrix = engine.encode(products)
+    encoded = time.perf_counter()
+    analysis = engine.analyze(matrix)
+    finished = time.perf_counter()
+    engine.analyze(matrix)
+    repeated = time.perf_counter()
+
+    sample = products[:check]
+    started_loop = time.perf_counter()
+    expected = [ai_agent.analyze_product(product) for product in sample]
+    loop_seconds = (time.perf_counter() - started_loop) / len(sample) * count
+
+    mismatches = 0
+    for i, result in enumerate(expected):
+        scenarios = [s['co2_after'] for s in result['scenarios']]
+        vector_scenarios = [float(analysis['scenarios'][name]['co2_after'][i]) for name in SCENARIO_NAMES]
+        if result['current_co2'] != float(analysis['current_co2'][i]) \
+                or result['sustainability_score'] != int(analysis['sustainability_score'][i]) \
+                or scenarios != vector_scenarios:
+            mismatches += 1
+
+    return {
+        'skus': count,
+        'mode': mode,
+        'encode_seconds': round(encoded - started, 3),
+        'analyze_seconds': round(finished - encoded, 3),
+        'repeat_analyze_seconds': round(repeated - finished, 3),
+        'loop_estimate_seconds': round(loop_seconds, 1),
+        'checked': len(sample),
+        'mismatches': mismatches
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design vektörel CO₂ motoru")
+    parser.add_argument('--benchmark', type=int, metavar='COUNT', default=100000,
+                        help='COUNT SKU ile koleksiyon analizini ölç')
+    args = parser.parse_args()
+
+    result = benchmark_engine(args.benchmark)
+    print(f"📊 {result['skus']:,} SKU ({result['mode']}): kodlama {result['encode_seconds']} s, "
+          f"analiz {result['analyze_seconds']} s, tekrar {result['repeat_analyze_seconds']} s "
+          f"(ürün başına döngü tahmini {result['loop_estimate_seconds']} s)")
+    print(f"✅ {result['checked']} üründe tekil hesapla fark: {result['mismatches']}")
@@ -0,0 +1,323 @@
+"""
+Zero@Design - CO₂ Belirsizlik Analizi
+Referans tablolardaki CO₂ aralıklarından (co2_min/co2_max,
+min_co2_kg/max_co2_kg) Monte Carlo ile p5/p50/p95 ayak izi bantları üretir
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Varsayılan çekiliş sayısı
+DEFAULT_DRAWS = 10000
+
+# İstek başına en fazla çekiliş
+MAX_DRAWS = 100000
+
+# İstek başına en fazla ürün
+MAX_PRODUCTS = 10000
+
+# İstek başına en fazla çekiliş x ürün (sonuç dizisi float32; ~80 MB, sıralı
+# kopyasıyla birlikte ~160 MB)
+MAX_SIMULATION_VALUES = 20_000_000
+
+# Tek parçada örneklenen en fazla değer (çekiliş x işlem); ~12 MB float32 tampon
+MAX_CHUNK_VALUES = 3_000_000
+
+DISTRIBUTIONS = ('uniform', 'triangular')
+
+PERCENTILES = (5, 50, 95)
+
+def operation_range(operation: Dict[str, Any]) -> Tuple[float, float, float]:
+    """
+    İşlemin CO₂ aralığı ve tepe değeri
+
+    master_co2_data / işlem tabloları co2_min-co2_max, master_konfeksiyon
+    min_co2_kg-max_co2_kg (ve avg_co2_kg) kullanır. Tek değer verilmişse
+    aralık o değere daralır.
+
+    Returns:
+        (alt sınır, üst sınır, tepe değeri)
+    """
+    low = operation.get('co2_min', operation.get('min_co2_kg'))
+    high = operation.get('co2_max', operation.get('max_co2_kg'))
+    low = float(low) if low is not None else None
+    high = float(high) if high is not None else None
+    if low is None and high is None:
+        low = high = 0.0
+    elif low is None:
+        low = high
+    elif high is None:
+        high = low
+    if low > high:
+        low, high = high, low
+
+    mode = operation.get('avg_co2_kg')
+    mode = float(mode) if mode is not None else (low + high) / 2
+    return low, high, min(max(mode, low), high)
+
+def validate_simulation(draws: int, seed: Optional[int], distribution: str, products: int = 1):
+    """
+    Monte Carlo parametrelerini doğrular
+
+    Args:
+        draws: Çekiliş sayısı
+        seed: Tohum
+        distribution: Dağılım adı
+        products: Simüle edilecek ürün sayısı
+
+    Raises:
+        ValueError: Dağılım, çekiliş sayısı, ürün sayısı veya tohum geçersizse
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Geçersiz dağılım: {distribution} (seçenekler: {', '.join(DISTRIBUTIONS)})")
+    if draws < 1:
+        raise ValueError("Çekiliş sayısı en az 1 olmalı")
+    if draws > MAX_DRAWS:
+        raise ValueError(f"Çekiliş sayısı en fazla {MAX_DRAWS} olabilir")
+    if products > MAX_PRODUCTS:
+        raise ValueError(f"Ürün sayısı en fazla {MAX_PRODUCTS} olabilir")
+    if draws * products > MAX_SIMULATION_VALUES:
+        raise ValueError(f"Çekiliş x ürün en fazla {MAX_SIMULATION_VALUES:,} olabilir "
+                         f"({products} ürün için en fazla {MAX_SIMULATION_VALUES // max(products, 1)} çekiliş)")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+        raise ValueError("Tohum (seed) negatif olmayan bir tamsayı olmalı")
+
+class CO2UncertaintyModel:
+    """
+    Vektörel Monte Carlo CO₂ modeli
+
+    Koleksiyondaki tüm işlem aralıkları tek bir dizide tutulur; ürünler
+    örneklenen işlem sayılarına (k) göre gruplanır, her ürünün işlemleri
+    bitişiktir. Her çekilişte tüm işlemler tek dizi işlemiyle örneklenir;
+    her grubun (çekiliş x ürün x k) görünümü aralıklarla çarpılıp tek
+    np.einsum ile ürün toplamlarına indirgenir (np.add.reduceat'in ürün
+    başına döngüsünden belirgin şekilde hızlı). Aralığı sıfır olan işlemler
+    örneklenmez, sabit olarak eklenir. Çekilişler bellek sınırı için
+    parça parça üretilir; Generator değerleri satır sırasıyla ürettiğinden
+    sonuç parça boyutundan bağımsızdır ve aynı seed aynı bantları verir.
+    """
+
+    def __init__(self, products: Sequence[Dict[str, Any]]):
+        """
+        Args:
+            products: {'product_name': str, 'operations': [işlem, ...]} listesi
+        """
+        self.product_names: List[str] = []
+        low: List[float] = []
+        high: List[float] = []
+        mode: List[float] = []
+        owners: List[int] = []
+
+        for index, product in enumerate(products):
+            self.product_names.append(product.get('product_name', f'Ürün {index + 1}'))
+            for operation in product.get('operations', []):
+                op_low, op_high, op_mode = operation_range(operation)
+                low.append(op_low)
+                high.append(op_high)
+                mode.append(op_mode)
+                owners.append(index)
+
+        low_values = np.array(low, dtype=np.float64)
+        high_values = np.array(high, dtype=np.float64)
+        owner_values = np.array(owners, dtype=np.int64)
+        count = len(self.product_names)
+
+        # Sabit kısım: her ürünün alt sınırlar toplamı
+        self.base = np.bincount(owner_values, weights=low_values, minlength=count)
+        self.total_min = self.base.copy()
+        self.total_max = np.bincount(owner_values, weights=high_values, minlength=count)
+
+        # Yalnızca aralığı olan işlemler örneklenir (alt sınırdan sapma olarak).
+        # İşlemler ürün başına örneklenen işlem sayısına göre kararlı sıralanır;
+        # ürün içi ve grup içi sıra korunur.
+        varying = high_values > low_values
+        varying_owners = owner_values[varying]
+        per_product = np.bincount(varying_owners, minlength=count)
+        order = np.argsort(per_product[varying_owners], kind='stable')
+        self.spans = (high_values - low_values)[varying][order].astype(np.float32)
+        self.modes = ((np.array(mode, dtype=np.float64) - low_values)[varying]
+                      / (high_values - low_values)[varying])[order].astype(np.float32)
+
+        # Grup sırasıyla örneklenen ürünler ve (ilk işlem, son işlem, k) grupları
+        sampled = np.flatnonzero(per_product)
+        self.sampled_products = sampled[np.argsort(per_product[sampled], kind='stable')]
+        self.groups: List[Tuple[int, int, int]] = []
+        start = 0
+        for k in np.unique(per_product[sampled]):
+            stop = start + int(k) * int((per_product == k).sum())
+            self.groups.append((start, stop, int(k)))
+            start = stop
+
+    def __len__(self) -> int:
+        return len(self.product_names)
+
+    def _sample(self, rng: np.random.Generator, buffer: np.ndarray, distribution: str) -> np.ndarray:
+        """Tek parça çekiliş: (parça x örneklenen ürün) sapma toplamları"""
+        rng.random(out=buffer, dtype=np.float32)
+        if distribution == 'triangular':
+            # Ters dağılım fonksiyonu; tepe noktası [0, 1] aralığına ölçeklenmiş
+            c = self.modes
+            buffer[:] = np.where(buffer < c, np.sqrt(buffer * c), 1 - np.sqrt((1 - buffer) * (1 - c)))
+        rows = len(buffer)
+        sums = [np.einsum('rgk,gk->rg', buffer[:, start:stop].reshape(rows, -1, k),
+                          self.spans[start:stop].reshape(-1, k))
+                for start, stop, k in self.groups]
+        return sums[0] if len(sums) == 1 else np.concatenate(sums, axis=1)
+
+    def simulate(self, draws: int = DEFAULT_DRAWS, seed: Optional[int] = None,
+                 distribution: str = 'uniform') -> np.ndarray:
+        """
+        Monte Carlo çekilişleri
+
+        Örnekler float32 olarak tek bir yeniden kullanılan tamponda üretilir
+        (bellek bant genişliği yarıya iner); ürün toplamları da float32
+        tutulur (birkaç düzine işlemin toplamında hassasiyet yeterli).
+
+        Args:
+            draws: Çekiliş sayısı
+            seed: Tekrarlanabilirlik için tohum
+            distribution: 'uniform' veya 'triangular' (tepe avg_co2_kg ya da orta nokta)
+
+        Returns:
+            (draws x ürün) ürün toplamları
+        """
+        validate_simulation(draws, seed, distribution, len(self))
+
+        totals = np.empty((draws, len(self)), dtype=np.float32)
+        totals[:] = self.base
+        if not len(self.spans):
+            return totals
+
+        rng = np.random.default_rng(seed)
+        chunk = max(1, min(draws, MAX_CHUNK_VALUES // len(self.spans)))
+        buffer = np.empty((chunk, len(self.spans)), dtype=np.float32)
+        # Tüm ürünler sırasıyla örnekleniyorsa kopyasız dilim kullanılır
+        in_order = np.array_equal(self.sampled_products, np.arange(len(self)))
+        columns = slice(None) if in_order else self.sampled_products
+        for start in range(0, draws, chunk):
+            stop = min(start + chunk, draws)
+            totals[start:stop, columns] += self._sample(rng, buffer[:stop - start], distribution)
+        return totals
+
+    def summarize(self, draws: int = DEFAULT_DRAWS, seed: Optional[int] = None,
+                  distribution: str = 'uniform') -> Dict[str, Any]:
+        """
+        Ürün ve koleksiyon düzeyinde p5/p50/p95 bantları
+
+        Ürün bantları, ürün başına sıralanmış float32 çekilişlerden
+        np.percentile'ın doğrusal interpolasyonuyla okunur; float32 sıralama
+        (SIMD), np.percentile'ın partition tabanlı yolundan belirgin şekilde
+        hızlıdır. Ortalama ve koleksiyon toplamı float64 biriktirilir.
+
+        Returns:
+            products: ürün başına bantlar, collection: koleksiyon toplamı bandı
+        """
+        totals = self.simulate(draws, seed, distribution)
+        means = totals.mean(axis=0, dtype=np.float64)
+        collection = totals.sum(axis=1, dtype=np.float64)
+        bands = _sorted_percentiles(totals)
+
+        products = [{
+            'product_name': name,
+            'mean': round(float(means[i]), 4),
+            'p5': round(float(bands[0, i]), 4),
+            'p50': round(float(bands[1, i]), 4),
+            'p95': round(float(bands[2, i]), 4),
+            'min': round(float(self.total_min[i]), 4),
+            'max': round(float(self.total_max[i]), 4)
+        } for i, name in enumerate(self.product_names)]
+
+        p5, p50, p95 = np.percentile(collection, PERCENTILES)
+        return {
+            'draws': draws,
+            'seed': seed,
+            'distribution': distribution,
+            'products': products,
+            'collection': {
+                'mean': round(float(collection.mean()), 4),
+                'p5': round(float(p5), 4),
+                'p50': round(float(p50), 4),
+                'p95': round(float(p95), 4),
+                'min': round(float(self.total_min.sum()), 4),
+                'max': round(float(self.total_max.sum()), 4)
+            }
+        }
+
+def _sorted_percentiles(totals: np.ndarray) -> np.ndarray:
+    """
+    (çekiliş x ürün) dizisinden ürün başına PERCENTILES değerleri
+
+    np.percentile(totals, PERCENTILES, axis=0) ile aynı (doğrusal
+    interpolasyon) sonucu, ürün satırlarını yerinde sıralayarak üretir.
+
+    Returns:
+        (len(PERCENTILES) x ürün) float64 dizi
+    """
+    ordered = np.ascontiguousarray(totals.T)
+    ordered.sort(axis=1)
+    last = ordered.shape[1] - 1
+    positions = np.array(PERCENTILES, dtype=np.float64) / 100 * last
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, last)
+    low_values = ordered[:, lower].astype(np.float64)
+    high_values = ordered[:, upper].astype(np.float64)
+    return (low_values + (high_values - low_values) * (positions - lower)).T
+
+def simulate_collection(products: Sequence[Dict[str, Any]], draws: int = DEFAULT_DRAWS,
+                        seed: Optional[int] = None, distribution: str = 'uniform') -> Dict[str, Any]:
+    """Ürün listesinin Monte Carlo belirsizlik bantları (CO2UncertaintyModel.summarize)"""
+    # Model kurulmadan önce sınırlar kontrol edilir (çok büyük istekler 400 döner)
+    validate_simulation(draws, seed, distribution, len(products))
+    return CO2UncertaintyModel(products).summarize(draws, seed, distribution)
+
+def benchmark_uncertainty(skus: int = 1000, draws: int = DEFAULT_DRAWS,
+                          operations: int = 12, seed: int = 42) -> Dict[str, Any]:
+    """
+    Rastgele aralıklı işlemlerle koleksiyon simülasyonunu ölçer
+
+    Returns:
+        Model kurma ve simülasyon süreleri, tekrarlanabilirlik sonucu
+    """
+    rng = np.random.default_rng(seed)
+    products = []
+    for i in range(skus):
+        low = rng.uniform(0.01, 2.0, operations)
+        products.append({
+            'product_name': f'SKU {i}',
+            'operations': [{'co2_min': float(a), 'co2_max': float(a * b)}
+                           for a, b in zip(low, rng.uniform(1.0, 3.0, operations))]
+        })
+
+    started = time.perf_counter()
+    model = CO2UncertaintyModel(products)
+    built = time.perf_counter()
+    first = model.summarize(draws, seed)
+    finished = time.perf_counter()
+    second = model.summarize(draws, seed)
+
+    return {
+        'skus': skus,
+        'draws': draws,
+        'build_seconds': round(built - started, 3),
+        'simulate_seconds': round(finished - built, 3),
+        'reproducible': first == second,
+        'collection': first['collection']
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design CO₂ belirsizlik analizi")
+    parser.add_argument('--benchmark', type=int, metavar='SKUS', default=1000,
+                        help='SKUS ürünlük koleksiyonu simüle et')
+    parser.add_argument('--draws', type=int, default=DEFAULT_DRAWS, help='Çekiliş sayısı')
+    args = parser.parse_args()
+
+    result = benchmark_uncertainty(args.benchmark, args.draws)
+    band = result['collection']
+    print(f"📊 {result['skus']:,} SKU x {result['draws']:,} çekiliş: "
+          f"{result['simulate_seconds']} s (kurulum {result['build_seconds']} s)")
+    print(f"📊 Koleksiyon p5/p50/p95: {band['p5']:,} / {band['p50']:,} / {band['p95']:,} kg CO₂ "
+          f"(tekrarlanabilir: {result['reproducible']})")
@@ -0,0 +1,382 @@
+"""
+Zero@Design - Kısıtlı Koleksiyon Optimizasyonu
+Koleksiyon düzeyindeki CO₂ azaltım hedefine en düşük maliyet ve zorlukla
+ulaşan ürün başına müdahaleleri seçer
+"""
+
+import time
+from itertools import product as combinations
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from co2_engine import (CO2Engine, CollectionMatrix, SCENARIO_NAMES, SUSTAINABLE_SUBSTITUTES,
+                        WEIGHT_OPTIMIZATION_FACTOR)
+
+# Suggestion alanlarının sayısal karşılıkları
+COST_LEVELS = {'low': 1.0, 'medium': 2.0, 'high': 3.0}
+DIFFICULTY_LEVELS = {'easy': 1.0, 'medium': 2.0, 'hard': 3.0}
+
+# Müdahale → (cost_impact, implementation_difficulty); ilgili Suggestion'larla aynı
+INTERVENTIONS = {
+    'sustainable_fibers': ('medium', 'easy'),   # Organik Pamuk / Geri Dönüştürülmüş Polyester
+    'eco_processes': ('medium', 'medium'),      # Düşük Etkili Boyama + düşük etkili finishing
+    'weight_optimization': ('low', 'hard')      # Tasarım değişikliği ile hafifletme
+}
+
+# Yanıtta döndürülen en fazla Pareto noktası
+FRONTIER_POINTS = 50
+
+# Bu kadar ürüne kadar kesin (dinamik programlama) çözüm kullanılır
+EXACT_MAX_PRODUCTS = 200
+
+# Kesin çözümde ürün başına tutulan en fazla Pareto durumu; aşılırsa zarf
+# açgözlü çözümüne dönülür (tamsayı olmayan zorluk ağırlıklarında durum
+# sayısı hızla büyüyebilir)
+EXACT_MAX_STATES = 5000
+
+def intervention_cost(name: str, difficulty_weight: float = 1.0) -> float:
+    """Müdahalenin ürün başına maliyet puanı (maliyet + ağırlıklı zorluk)"""
+    cost_impact, difficulty = INTERVENTIONS[name]
+    return COST_LEVELS[cost_impact] + difficulty_weight * DIFFICULTY_LEVELS[difficulty]
+
+class CollectionOptimizer:
+    """
+    Çoktan seçmeli sırt çantası (multiple-choice knapsack) çözücüsü
+
+    Her ürün için üç müdahalenin (lif değişimi, düşük etkili işlemler, ağırlık
+    azaltma) 8 kombinasyonu seçenektir; maliyetler Suggestion üzerindeki
+    cost_impact ve implementation_difficulty düzeylerinden gelir.
+
+    EXACT_MAX_PRODUCTS ürüne kadar koleksiyonlar kesin çözülür: ürünler
+    sırayla eklenirken yalnızca baskın olmayan (maliyet, azaltım) durumları
+    tutulur; hedefi sağlayan en ucuz durum en düşük maliyetli plandır ve
+    durumların kendisi gerçek Pareto sınırıdır.
+
+    Büyük koleksiyonlarda her ürünün (maliyet, azaltım) seçeneklerinin üst
+    dışbükey zarfı çıkarılır; zarf adımları tüm koleksiyonda azaltım/maliyet
+    oranına göre sıralanıp birikimli toplanır ve hedefi geçen ilk önek alınır.
+    Bu önek LP gevşetmesine dayandığından hedefi gereğinden fazla aşabilir;
+    ardından hedef korunduğu sürece ürünler daha ucuz seçeneklere indirilir.
+    Sonuç optimuma yakındır ama kesin değildir; döndürülen sınır zarf
+    öneklerinin eğrisidir. Hesap O(n log n) dizi işlemidir; on binlerce SKU
+    saniyenin altında çözülür.
+    """
+
+    def __init__(self, engine: CO2Engine, difficulty_weight: float = 1.0):
+        """
+        Args:
+            engine: Vektörel CO₂ motoru
+            difficulty_weight: Zorluğun maliyete göre ağırlığı
+        """
+        self.engine = engine
+        self.difficulty_weight = difficulty_weight
+
+        # Seçenekler maliyete göre artan sırada; ilki "değişiklik yok"
+        options = [tuple(name for name, used in zip(SCENARIO_NAMES, mask) if used)
+                   for mask in combinations((False, True), repeat=len(SCENARIO_NAMES))]
+        costs = [sum(intervention_cost(name, difficulty_weight) for name in option)
+                 for option in options]
+        order = sorted(range(len(options)), key=lambda i: (costs[i], len(options[i])))
+        self.options = [options[i] for i in order]
+        self.option_costs = np.array([costs[i] for i in order], dtype=np.float64)
+
+    def option_co2(self, matrix: CollectionMatrix) -> np.ndarray:
+        """
+        Her seçenek için ürün CO₂ değerleri
+
+        Returns:
+            (seçenek sayısı x ürün sayısı) dizi
+        """
+        engine = self.engine
+        fiber_co2 = {
+            False: engine._fabric_co2(matrix),
+            True: engine._fabric_co2(matrix, SUSTAINABLE_SUBSTITUTES)
+        }
+        process_co2 = {False: engine._process_co2(matrix.flags), True: engine._eco_process_co2()}
+        weights = {False: matrix.weights, True: matrix.weights * WEIGHT_OPTIMIZATION_FACTOR}
+        return np.vstack([
+            engine._co2(fiber_co2['sustainable_fibers' in option],
+                        process_co2['eco_processes' in option],
+                        weights['weight_optimization' in option])
+            for option in self.options
+        ])
+
+    def _hull_steps(self, savings: np.ndarray):
+        """
+        Ürün başına üst dışbükey zarf adımları
+
+        Args:
+            savings: (seçenek x ürün) kg CO₂ azaltımı
+
+        Returns:
+            (ürün, hedef seçenek, maliyet artışı, azaltım artışı, oran) dizileri
+        """
+        costs = self.option_costs[:, None]
+        n = savings.shape[1]
+        columns = np.arange(n)
+        current = np.zeros(n, dtype=np.int64)
+        active = np.ones(n, dtype=bool)
+        steps = []
+
+        # Her turda her ürün zarfta bir sonraki noktaya ilerler (en fazla seçenek-1 tur)
+        while active.any():
+            delta_cost = costs - self.option_costs[current]
+            delta_saving = savings - savings[current, columns]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slopes = np.where(delta_cost > 0, delta_saving / delta_cost, -np.inf)
+            # Eşit oranda daha ucuz seçenek (argmax ilkini seçer)
+            best = slopes.argmax(axis=0)
+            best_slope = slopes[best, columns]
+            active &= best_slope > 0
+            if not active.any():
+                break
+            skus = columns[active]
+            targets = best[active]
+            steps.append((skus, targets,
+                          delta_cost[targets, skus], delta_saving[targets, skus], best_slope[active]))
+            current[active] = targets
+
+        if not steps:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, np.array([]), np.array([]), np.array([])
+        return tuple(np.concatenate(parts) for parts in zip(*steps))
+
+    def _exact_plan(self, savings: np.ndarray, required: float):
+        """
+        Baskın olmayan durumlarla kesin çözüm
+
+        Args:
+            savings: (seçenek x ürün) kg CO₂ azaltımı
+            required: Gereken toplam azaltım (kg)
+
+        Returns:
+            (seçim, Pareto maliyetleri, Pareto azaltımları); durum sayısı
+            EXACT_MAX_STATES'i aşarsa None
+        """
+        option_count, n = savings.shape
+        state_cost = np.zeros(1)
+        state_saving = np.zeros(1)
+        parents, picks = [], []
+
+        for i in range(n):
+            cost = (state_cost[:, None] + self.option_costs[None, :]).ravel()
+            saving = (state_saving[:, None] + savings[:, i][None, :]).ravel()
+            # Maliyet artan, eşit maliyette azaltım azalan; yalnızca azaltımı
+            # kendinden ucuz tüm durumları geçenler kalır
+            order = np.lexsort((-saving, cost))
+            sorted_saving = saving[order]
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = sorted_saving[1:] > np.maximum.accumulate(sorted_saving)[:-1] + 1e-9
+            kept = order[keep]
+            if len(kept) > EXACT_MAX_STATES:
+                return None
+            parents.append(kept // option_count)
+            picks.append(kept % option_count)
+            state_cost, state_saving = cost[kept], saving[kept]
+
+        # Durumlar maliyet ve azaltımda artan; hedefi sağlayan ilki en ucuzudur
+        feasible = np.flatnonzero(state_saving >= required - 1e-9)
+        state = int(feasible[0]) if len(feasible) else len(state_saving) - 1
+        choice = np.zeros(n, dtype=np.int64)
+        for i in range(n - 1, -1, -1):
+            choice[i] = picks[i][state]
+            state = int(parents[i][state])
+        return choice, state_cost[1:], state_saving[1:]
+
+    def _trim(self, choice: np.ndarray, savings: np.ndarray, required: float) -> np.ndarray:
+        """
+        Hedef korunduğu sürece seçimleri daha ucuz seçeneklere indirir
+
+        Her turda fazla azaltımın (slack) karşıladığı en büyük maliyet düşüşü
+        uygulanır (eşitlikte en az azaltım kaybı).
+
+        Args:
+            choice: Açgözlü önekten gelen ürün başına seçenek
+            savings: (seçenek x ürün) kg CO₂ azaltımı
+            required: Gereken toplam azaltım (kg)
+        """
+        choice = choice.copy()
+        columns = np.arange(savings.shape[1])
+        costs = self.option_costs[:, None]
+        while True:
+            current_saving = savings[choice, columns]
+            slack = current_saving.sum() - required
+            loss = current_saving - savings
+            gain = self.option_costs[choice] - costs
+            allowed = (gain > 0) & (loss <= slack + 1e-9)
+            if not allowed.any():
+                return choice
+            # En büyük maliyet düşüşü, eşitlikte en az kayıp
+            score = np.where(allowed, gain - loss * 1e-9, -np.inf)
+            option, sku = np.unravel_index(int(score.argmax()), score.shape)
+            choice[sku] = option
+
+    def _greedy_plan(self, savings: np.ndarray, required: float):
+        """
+        Zarf açgözlü çözümü ve ardından fazla azaltımın budanması
+
+        Returns:
+            (seçim, birikimli zarf maliyetleri, birikimli zarf azaltımları)
+        """
+        skus, targets, delta_cost, delta_saving, slopes = self._hull_steps(savings)
+
+        # Oran azalan; eşitlikte ürün sırası korunur
+        order = np.lexsort((skus, -slopes))
+        skus, targets = skus[order], targets[order]
+        cumulative_cost = np.cumsum(delta_cost[order])
+        cumulative_saving = np.cumsum(delta_saving[order])
+
+        if required > 0:
+            taken = int(np.searchsorted(cumulative_saving, required - 1e-9))
+            taken = min(taken + 1, len(skus))
+        else:
+            taken = 0
+
+        # Önek sırası zarf sırasını korur; son atama ürünün seçeneğidir
+        choice = np.zeros(savings.shape[1], dtype=np.int64)
+        choice[skus[:taken]] = targets[:taken]
+        if taken and cumulative_saving[taken - 1] >= required - 1e-9:
+            choice = self._trim(choice, savings, required)
+        return choice, cumulative_cost, cumulative_saving
+
+    def _frontier(self, cost: np.ndarray, saving: np.ndarray, total_before: float,
+                  points: int) -> List[Dict[str, float]]:
+        """Birikimli eğriden eşit aralıklı en fazla points Pareto noktası"""
+        if total_before <= 0:
+            return [{'cost': 0.0, 'reduction': 0.0, 'co2_after': 0.0}]
+        count = len(cost)
+        picks = np.unique(np.linspace(0, count, min(points, count + 1)).round().astype(np.int64))
+        frontier = []
+        for k in picks:
+            spent = float(cost[k - 1]) if k else 0.0
+            saved = float(saving[k - 1]) if k else 0.0
+            frontier.append({
+                'cost': round(spent, 1),
+                'reduction': round(saved / total_before * 100, 1),
+                'co2_after': round(total_before - saved, 1)
+            })
+        return frontier
+
+    def optimize(self, products: Sequence[Dict[str, Any]], target_reduction: float = 15.0,
+                 frontier_points: int = FRONTIER_POINTS) -> Dict[str, Any]:
+        """
+        Hedef azaltıma en düşük maliyetle ulaşan müdahaleleri seçer
+
+        Args:
+            products: Koleksiyon ürünleri (analyze_product biçimi)
+            target_reduction: Hedef toplam azaltım (%)
+            frontier_points: Döndürülecek en fazla Pareto noktası
+
+        Returns:
+            Seçilen müdahaleler, toplam maliyet ve maliyet-azaltım Pareto sınırı.
+            Hedefe ulaşılamıyorsa mümkün olan en yüksek azaltım döner
+            (success False).
+        """
+        return self.solve(products, self.option_co2(self.engine.encode(products)),
+                          target_reduction, frontier_points)
+
+    def solve(self, products: Sequence[Dict[str, Any]], co2: np.ndarray,
+              target_reduction: float = 15.0, frontier_points: int = FRONTIER_POINTS) -> Dict[str, Any]:
+        """
+        Seçenek CO₂ matrisi hazır koleksiyonu çözer
+
+        Kodlama ve seçenek hesabı ürün başına bağımsızdır; parçalar halinde
+        (ör. ayrı süreçlerde) hesaplanıp sütun sırasıyla birleştirilen matris
+        optimize ile birebir aynı sonucu verir.
+
+        Args:
+            products: Koleksiyon ürünleri
+            co2: option_co2 çıktısı (seçenek x ürün)
+            target_reduction: Hedef toplam azaltım (%)
+            frontier_points: Döndürülecek en fazla Pareto noktası
+        """
+        total_before = float(co2[0].sum())
+        savings = co2[0] - co2
+        required = total_before * target_reduction / 100 \
+            if total_before > 0 and target_reduction > 0 else 0.0
+
+        plan = self._exact_plan(savings, required) if len(products) <= EXACT_MAX_PRODUCTS else None
+        if plan is not None:
+            choice, frontier_cost, frontier_saving = plan
+        else:
+            choice, frontier_cost, frontier_saving = self._greedy_plan(savings, required)
+
+        columns = np.arange(len(products))
+        chosen_co2 = co2[choice, columns]
+        reductions = self.engine._reduction(co2[0], chosen_co2)
+
+        total_after = float(chosen_co2.sum())
+        actual_reduction = (total_before - total_after) / total_before * 100 if total_before else 0.0
+        total_cost = float(self.option_costs[choice].sum())
+
+        optimized_products = []
+        for i, product in enumerate(products):
+            option = self.options[choice[i]]
+            optimized_products.append({
+                'original': product,
+                'optimized_co2': float(chosen_co2[i]),
+                'reduction': float(reductions[i]),
+                'interventions': list(option),
+                'cost': float(self.option_costs[choice[i]]),
+                'changes': {name: self.engine._scenario_changes(name, product) for name in option}
+            })
+
+        return {
+            'target_reduction': target_reduction,
+            'actual_reduction': round(actual_reduction, 1),
+            'max_reduction': round(float(frontier_saving[-1]) / total_before * 100, 1)
+            if len(frontier_saving) and total_before else 0.0,
+            'total_co2_before': round(total_before, 1),
+            'total_co2_after': round(total_after, 1),
+            'total_cost': round(total_cost, 1),
+            'changed_products': int((choice > 0).sum()),
+            'products': optimized_products,
+            'frontier': self._frontier(frontier_cost, frontier_saving, total_before, frontier_points),
+            'success': actual_reduction >= target_reduction
+        }
+
+def benchmark_optimizer(count: int = 20000, target_reduction: float = 15.0) -> Dict[str, Any]:
+    """
+    Optimizasyonu rastgele koleksiyonda ölçer ve ürün başına en iyi senaryo
+    seçimiyle (eski optimize_collection) maliyet olarak karşılaştırır
+    """
+    from ai_agent import ai_agent
+    from co2_engine import _random_collection
+
+    products = _random_collection(count)
+    optimizer = CollectionOptimizer(ai_agent.co2_engine)
+
+    started = time.perf_counter()
+    result = optimizer.optimize(products, target_reduction)
+    elapsed = time.perf_counter() - started
+
+    # Eski yöntem: her ürün en çok azaltan tek senaryoyu uygular
+    greedy = ai_agent.co2_engine.optimize_collection(products, target_reduction)
+    scenarios = ai_agent.co2_engine.analyze_collection(products)['scenarios']
+    best = np.vstack([scenarios[name]['reduction_percentage'] for name in SCENARIO_NAMES]).argmax(axis=0)
+    greedy_cost = sum(intervention_cost(SCENARIO_NAMES[i]) for i in best)
+
+    return {
+        'skus': count,
+        'seconds': round(elapsed, 3),
+        'actual_reduction': result['actual_reduction'],
+        'total_cost': result['total_cost'],
+        'best_scenario_reduction': greedy['actual_reduction'],
+        'best_scenario_cost': round(greedy_cost, 1)
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design koleksiyon optimizasyonu")
+    parser.add_argument('--benchmark', type=int, metavar='COUNT', default=20000,
+                        help='COUNT SKU ile optimizasyonu ölç')
+    parser.add_argument('--target', type=float, default=15.0, help='Hedef azaltım (%%)')
+    args = parser.parse_args()
+
+    result = benchmark_optimizer(args.benchmark, args.target)
+    print(f"📊 {result['skus']:,} SKU: {result['seconds']} s, "
+          f"%{result['actual_reduction']} azaltım, maliyet {result['total_cost']:,}")
+    print(f"📊 Ürün başına en iyi senaryo: %{result['best_scenario_reduction']} azaltım, "
+          f"maliyet {result['best_scenario_cost']:,}")
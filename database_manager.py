@@ -4,26 +4,193 @@ SQLite veritabanı ile etkileşim için yardımcı sınıflar
 """
 
 import sqlite3
+import os
+import re
+import time
+import atexit
+import threading
+import weakref
 import pandas as pd
 from typing import Dict, List, Optional, Tuple, Any
 import json
 from datetime import datetime
 
+import co2_uncertainty
+import query_cache
+import search_index
+
+# Metin filtreleri için eşleşme modları
+MATCH_MODES = ('contains', 'exact', 'prefix')
+
+# Prefix aralık sorgusunun üst sınırı (UTF-8 sıralamasında en büyük karakter)
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+# EXPLAIN QUERY PLAN çıktısında indekssiz tablo taraması
+FULL_SCAN_RE = re.compile(r'^SCAN (TABLE )?\w+$')
+
+# execute_insert sorgusundan hedef tabloyu çıkarır (sürüm sayacı için)
+INSERT_TABLE_RE = re.compile(r'^\s*(?:INSERT|REPLACE)\s+(?:OR\s+\w+\s+)?INTO\s+(\w+)', re.IGNORECASE)
+
+# Her bağlantı açıldığında uygulanan PRAGMA ayarları
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',       # Okuyucular yazıcıyı beklemez (çoklu gunicorn worker)
+    'synchronous': 'NORMAL',     # WAL ile güvenli, FULL'dan belirgin şekilde hızlı
+    'foreign_keys': 'ON',
+    'busy_timeout': 5000,        # ms - kilitli veritabanında hemen hata verme
+    'cache_size': -16000,        # ~16 MB sayfa önbelleği
+    'temp_store': 'MEMORY',
+}
+
+class _ConnectionHolder:
+    """Thread'e ait bağlantı ve son sağlık kontrolü zamanı"""
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.pid = os.getpid()
+        self.checked_at = time.monotonic()
+        self.finalizer = None
+
+class ConnectionPool:
+    """
+    Thread-local SQLite bağlantı havuzu
+    
+    Her thread kendi bağlantısını bir kez açar ve tekrar kullanır. Bağlantılar
+    belirli aralıklarla sağlık kontrolünden geçirilir, fork sonrası (gunicorn
+    preload) ebeveyn süreçten kalan bağlantılar kullanılmaz ve close_all ile
+    tüm bağlantılar temiz şekilde kapatılır.
+    """
+    
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, Any]] = None,
+                 health_check_interval: float = 30.0):
+        """
+        Args:
+            db_path: SQLite veritabanı dosya yolu
+            pragmas: Bağlantı başına uygulanacak PRAGMA ayarları
+            health_check_interval: Sağlık kontrolleri arası süre (saniye)
+        """
+        self.db_path = db_path
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.health_check_interval = health_check_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._closed = False
+        self.stats = {'opened': 0, 'reused': 0, 'health_failures': 0}
+    
+    def _open(self) -> sqlite3.Connection:
+        """Yeni bağlantı açar ve PRAGMA ayarlarını uygular"""
+        # Bağlantı yalnızca sahibi thread tarafından kullanılır; kapatma ise
+        # close_all veya thread sonlandığında başka bir thread'den yapılabilir
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.pragmas.get('busy_timeout', 5000) / 1000,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row  # Dict-like access
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        
+        with self._lock:
+            self._connections.add(conn)
+            self.stats['opened'] += 1
+        
+        # Thread sonlandığında thread-local veri silinir, bağlantı da kapanır
+        holder = _ConnectionHolder(conn)
+        holder.finalizer = weakref.finalize(holder, self._release, conn)
+        self._local.holder = holder
+        return conn
+    
+    def _release(self, conn: sqlite3.Connection):
+        """Bağlantıyı havuzdan çıkarır ve kapatır"""
+        with self._lock:
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Bağlantının hâlâ kullanılabilir olduğunu doğrular"""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Mevcut thread'in bağlantısını döndürür, gerekirse yenisini açar"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Bağlantı havuzu kapatıldı")
+        
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            return self._open()
+        
+        # Fork edilmiş süreçte ebeveynin bağlantısı kullanılmamalı ve
+        # kapatılmamalı (kapatmak ebeveynin dosya kilitlerini bozabilir)
+        if holder.pid != os.getpid():
+            holder.finalizer.detach()
+            with self._lock:
+                self._connections.discard(holder.conn)
+            self._local.holder = None
+            return self._open()
+        
+        now = time.monotonic()
+        if now - holder.checked_at >= self.health_check_interval:
+            if not self._is_healthy(holder.conn):
+                with self._lock:
+                    self.stats['health_failures'] += 1
+                self._local.holder = None
+                self._release(holder.conn)
+                return self._open()
+            holder.checked_at = now
+        
+        with self._lock:
+            self.stats['reused'] += 1
+        return holder.conn
+    
+    def close_all(self):
+        """Havuzdaki tüm bağlantıları kapatır"""
+        with self._lock:
+            self._closed = True
+            connections = list(self._connections)
+            self._connections.clear()
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Havuz istatistiklerini döndürür"""
+        with self._lock:
+            return dict(self.stats, open_connections=len(self._connections))
+
 class DatabaseManager:
-    def __init__(self, db_path: str = "zero_design.db"):
+    def __init__(self, db_path: str = "zero_design.db", pragmas: Optional[Dict[str, Any]] = None,
+                 cache_size: int = 512, cache_ttl: Optional[float] = 300.0):
         """
         Veritabanı yönetici sınıfı
         
         Args:
             db_path: SQLite veritabanı dosya yolu
+            pragmas: Bağlantı PRAGMA ayarları (varsayılan: DEFAULT_PRAGMAS)
+            cache_size: Sorgu önbelleğindeki en fazla kayıt sayısı
+            cache_ttl: Önbellek kayıt ömrü (saniye)
         """
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pragmas)
+        self.cache = query_cache.QueryCache(cache_size, cache_ttl)
+        self.table_versions = query_cache.TableVersions()
     
     def get_connection(self):
-        """Veritabanı bağlantısı oluşturur"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Dict-like access
-        return conn
+        """Thread'e ait havuzlanmış veritabanı bağlantısını döndürür"""
+        return self.pool.acquire()
+    
+    def close(self):
+        """Havuzdaki bağlantıları kapatır (uygulama kapanışında)"""
+        self.pool.close_all()
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
         """
@@ -37,16 +204,52 @@ class DatabaseManager:
             Sorgu sonuçları listesi
         """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return results
+        cursor = conn.execute(query, params)
+        try:
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    
+    def execute_cached_query(self, query: str, params: tuple = (),
+                             tables: Tuple[str, ...] = ()) -> List[Dict]:
+        """
+        SQL sorgusunu önbellek üzerinden çalıştırır
+        
+        Args:
+            query: SQL sorgusu
+            params: Sorgu parametreleri
+            tables: Sorgunun okuduğu tablolar (sürümü değişince kayıt geçersizleşir)
+            
+        Returns:
+            Sorgu sonuçları listesi
+        """
+        return self._cached((query, params), tables, lambda: self.execute_query(query, params))
+    
+    def _cached(self, key: Any, tables: Tuple[str, ...], loader) -> Any:
+        """loader sonucunu tablo sürümlerine bağlı olarak önbellekten döndürür"""
+        versions = self.table_versions.current(self.get_connection(), tables)
+        return self.cache.get_or_load((key, tables), versions, loader)
+    
+    def bump_table_versions(self, conn: sqlite3.Connection, tables: List[str]):
+        """
+        Tabloların sürüm sayacını artırır (commit çağırana aittir)
+        
+        Args:
+            conn: Yazma işleminin bağlantısı
+            tables: Değişen tablolar
+        """
+        query_cache.bump_table_versions(conn, tables)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Sorgu önbelleği istatistiklerini ve bilinen tablo sürümlerini döndürür"""
+        return dict(self.cache.get_stats(), table_versions=self.table_versions.snapshot())
     
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """
         INSERT sorgusu çalıştırır ve yeni kaydın ID'sini döndürür
         
+        Hedef tablonun sürüm sayacı aynı transaction içinde artırılır.
+        
         Args:
             query: INSERT sorgusu
             params: Sorgu parametreleri
@@ -55,33 +258,133 @@ class DatabaseManager:
             Yeni kaydın ID'si
         """
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        last_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        table = INSERT_TABLE_RE.match(query)
+        try:
+            cursor = conn.execute(query, params)
+            last_id = cursor.lastrowid
+            cursor.close()
+            if table:
+                self.bump_table_versions(conn, [table.group(1)])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.table_versions.invalidate()
         return last_id
     
+    # Filtre Yardımcıları
+    def _filter_clause(self, column: str, value: str, match: str) -> Tuple[str, List[Any]]:
+        """
+        Metin filtresi için WHERE parçası üretir
+        
+        Args:
+            column: Filtrelenecek kolon
+            value: Filtre değeri
+            match: 'contains' (LIKE '%x%', indeks kullanamaz), 'exact' veya
+                   'prefix' (normalize edilmiş <column>_norm indeksini kullanır)
+            
+        Returns:
+            (SQL parçası, parametreler)
+        """
+        if match == 'contains':
+            return f"{column} LIKE ?", [f"%{value}%"]
+        if match == 'equals':
+            # Normalize edilmemiş kolon üzerinde birebir eşleşme (iç kullanım)
+            return f"{column} = ?", [value]
+        
+        normalized = search_index.normalize_tr(value)
+        if match == 'exact':
+            return f"{column}_norm = ?", [normalized]
+        if match == 'prefix':
+            # Aralık sorgusu: LIKE 'x%' yerine indeks üzerinde doğrudan arama
+            return f"{column}_norm >= ? AND {column}_norm < ?", [normalized, normalized + PREFIX_UPPER_BOUND]
+        
+        raise ValueError(f"Geçersiz eşleşme modu: {match} ({', '.join(MATCH_MODES)})")
+    
+    def _filtered_query(self, base_query: str, filters: List[Tuple], match: str,
+                        order_by: str = '') -> Tuple[str, tuple]:
+        """
+        Boş olmayan filtreleri base_query'ye AND ile ekler
+        
+        Filtreler (kolon, değer) veya eşleşme modunu ezen (kolon, değer, mod)
+        biçimindedir.
+        """
+        query = base_query + " WHERE 1=1"
+        params = []
+        
+        for column, value, *override in filters:
+            if value:
+                clause, clause_params = self._filter_clause(column, value, override[0] if override else match)
+                query += f" AND {clause}"
+                params.extend(clause_params)
+        
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        return query, tuple(params)
+    
+    def explain_query(self, query: str, params: tuple = ()) -> List[str]:
+        """Sorgunun EXPLAIN QUERY PLAN çıktısını döndürür"""
+        rows = self.execute_query(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row['detail'] for row in rows]
+    
+    def check_query_plans(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Sık kullanılan filtre sorgularının exact/prefix modlarında tam tablo
+        taraması yapmadığını EXPLAIN QUERY PLAN ile doğrular
+        
+        Returns:
+            Sorgu adına göre plan ve full_scan bayrağı
+        """
+        hot_queries = {}
+        for match in ('exact', 'prefix'):
+            hot_queries.update({
+                f'finished_product_operations[{match}]':
+                    self._finished_product_operations_query('baski', match),
+                f'garment_processes[{match}]':
+                    self._garment_processes_query('kesim', match),
+                f'master_co2_data[{match}]':
+                    self._master_co2_data_query('baski', 'serigrafi', match),
+                f'master_konfeksiyon[{match}]':
+                    self._master_konfeksiyon_query('aksesuar', 'boncuk', match),
+                f'product_fabric_co2[{match}]':
+                    self._product_fabric_co2_query('women', 'tops', 'tisort', 'orme', match),
+                f'product_fabric_co2.category[{match}]':
+                    self._product_fabric_co2_query(None, 'tops', None, None, match),
+            })
+            for name, (query, params) in zip(('konfeksiyon', 'fabric'),
+                                             self._co2_range_queries('tops', match)):
+                hot_queries[f'co2_range.{name}[{match}]'] = (query, params)
+        
+        report = {}
+        for name, (query, params) in hot_queries.items():
+            plan = self.explain_query(query, params)
+            report[name] = {
+                'plan': plan,
+                'full_scan': any(FULL_SCAN_RE.match(detail) for detail in plan)
+            }
+        return report
+    
     # Bitmiş Ürün İşlemleri Sorguları
-    def get_finished_product_operations(self, category: Optional[str] = None) -> List[Dict]:
+    def _finished_product_operations_query(self, category: Optional[str], match: str) -> Tuple[str, tuple]:
+        return self._filtered_query(
+            "SELECT * FROM finished_product_operations",
+            [('category', category)], match, "category, operation_type"
+        )
+    
+    def get_finished_product_operations(self, category: Optional[str] = None,
+                                        match: str = 'contains') -> List[Dict]:
         """
         Bitmiş ürün işlemlerini getirir
         
         Args:
             category: Kategori filtresi (opsiyonel)
+            match: Eşleşme modu ('contains', 'exact', 'prefix')
             
         Returns:
             İşlem listesi
         """
-        query = "SELECT * FROM finished_product_operations"
-        params = ()
-        
-        if category:
-            query += " WHERE category LIKE ?"
-            params = (f"%{category}%",)
-        
-        query += " ORDER BY category, operation_type"
-        return self.execute_query(query, params)
+        return self.execute_query(*self._finished_product_operations_query(category, match))
     
     def get_operations_by_product_group(self, product_group: str) -> List[Dict]:
         """
@@ -101,52 +404,50 @@ class DatabaseManager:
         return self.execute_query(query, (f"%{product_group}%",))
     
     # Konfeksiyon Süreçleri Sorguları
-    def get_garment_processes(self, category: Optional[str] = None) -> List[Dict]:
+    def _garment_processes_query(self, category: Optional[str], match: str) -> Tuple[str, tuple]:
+        return self._filtered_query(
+            "SELECT * FROM garment_processes",
+            [('category', category)], match, "category, process_step"
+        )
+    
+    def get_garment_processes(self, category: Optional[str] = None,
+                              match: str = 'contains') -> List[Dict]:
         """
         Konfeksiyon süreçlerini getirir
         
         Args:
             category: Kategori filtresi (opsiyonel)
+            match: Eşleşme modu ('contains', 'exact', 'prefix')
             
         Returns:
             Süreç listesi
         """
-        query = "SELECT * FROM garment_processes"
-        params = ()
-        
-        if category:
-            query += " WHERE category LIKE ?"
-            params = (f"%{category}%",)
-        
-        query += " ORDER BY category, process_step"
-        return self.execute_query(query, params)
+        return self.execute_query(*self._garment_processes_query(category, match))
     
     # Master CO2 Verileri Sorguları
+    def _master_co2_data_query(self, category: Optional[str], operation: Optional[str],
+                               match: str) -> Tuple[str, tuple]:
+        return self._filtered_query(
+            "SELECT * FROM master_co2_data",
+            [('category', category), ('operation', operation)], match,
+            "upper_category, category, operation"
+        )
+    
     def get_master_co2_data(self, category: Optional[str] = None, 
-                           operation: Optional[str] = None) -> List[Dict]:
+                           operation: Optional[str] = None,
+                           match: str = 'contains') -> List[Dict]:
         """
         Master CO2 verilerini getirir
         
         Args:
             category: Kategori filtresi (opsiyonel)
             operation: İşlem filtresi (opsiyonel)
+            match: Eşleşme modu ('contains', 'exact', 'prefix')
             
         Returns:
             CO2 veri listesi
         """
-        query = "SELECT * FROM master_co2_data WHERE 1=1"
-        params = []
-        
-        if category:
-            query += " AND category LIKE ?"
-            params.append(f"%{category}%")
-        
-        if operation:
-            query += " AND operation LIKE ?"
-            params.append(f"%{operation}%")
-        
-        query += " ORDER BY upper_category, category, operation"
-        return self.execute_query(query, tuple(params))
+        return self.execute_query(*self._master_co2_data_query(category, operation, match))
     
     # Ürün Kategorileri Sorguları
     def get_product_categories(self) -> List[Dict]:
@@ -157,7 +458,7 @@ class DatabaseManager:
             Kategori listesi
         """
         query = "SELECT * FROM product_categories ORDER BY name"
-        return self.execute_query(query)
+        return self.execute_cached_query(query, tables=('product_categories',))
     
     def search_categories(self, search_term: str) -> List[Dict]:
         """
@@ -173,17 +474,31 @@ class DatabaseManager:
         return self.execute_query(query, (f"%{search_term}%",))
     
     # CO2 Hesaplama İşlemleri
-    def calculate_product_co2(self, product_name: str, selected_operations: List[Dict]) -> Dict:
+    def calculate_product_co2(self, product_name: str, selected_operations: List[Dict],
+                              draws: int = 0, seed: Optional[int] = None,
+                              distribution: str = 'uniform', attribution: bool = False) -> Dict:
         """
         Ürün için CO2 hesaplaması yapar
         
         Args:
             product_name: Ürün adı
             selected_operations: Seçilen işlemler listesi
+            draws: Monte Carlo çekiliş sayısı (0 ise yalnızca min/max toplamı)
+            seed: Monte Carlo tohumu (tekrarlanabilir sonuç için)
+            distribution: 'uniform' veya 'triangular'
+            attribution: True ise işlemlerin ortalama katkı ve belirsizlik
+                         payına göre sıralı 'attribution' listesi eklenir
             
         Returns:
-            Hesaplama sonucu
+            Hesaplama sonucu (draws verilirse p5/p50/p95 'uncertainty' bandı ile)
+            
+        Raises:
+            ValueError: Monte Carlo parametreleri geçersizse (kayıt yapılmaz)
         """
+        # Geçersiz parametrelerle yarım hesap kaydı oluşmasın
+        if draws:
+            co2_uncertainty.validate_simulation(draws, seed, distribution)
+        
         total_co2_min = 0
         total_co2_max = 0
         calculation_details = []
@@ -210,7 +525,7 @@ class DatabaseManager:
             calculation_details
         )
         
-        return {
+        result = {
             'calculation_id': calculation_id,
             'product_name': product_name,
             'total_co2_min': total_co2_min,
@@ -219,6 +534,37 @@ class DatabaseManager:
             'operation_count': len(selected_operations),
             'calculation_details': calculation_details
         }
+        
+        if attribution:
+            # Toplam işlem değerlerinin toplamı olduğundan her işlemin kısmi
+            # türevi 1'dir; katkı doğrudan işlemin ortalaması, belirsizlik payı
+            # ise min-max aralığının toplam aralıktaki payıdır
+            total_avg = (total_co2_min + total_co2_max) / 2
+            total_range = total_co2_max - total_co2_min
+            result['attribution'] = sorted(({
+                'operation': detail['operation'],
+                'category': detail['category'],
+                'co2_avg': (detail['co2_min'] + detail['co2_max']) / 2,
+                'share': round((detail['co2_min'] + detail['co2_max']) / 2 / total_avg * 100, 1)
+                if total_avg else 0.0,
+                'range_share': round((detail['co2_max'] - detail['co2_min']) / total_range * 100, 1)
+                if total_range else 0.0
+            } for detail in calculation_details), key=lambda item: item['co2_avg'], reverse=True)
+        
+        if draws:
+            simulation = co2_uncertainty.simulate_collection(
+                [{'product_name': product_name, 'operations': selected_operations}],
+                draws, seed, distribution
+            )
+            band = simulation['products'][0]
+            result['uncertainty'] = {
+                'draws': draws,
+                'seed': seed,
+                'distribution': distribution,
+                **{key: band[key] for key in ('mean', 'p5', 'p50', 'p95')}
+            }
+        
+        return result
     
     def save_co2_calculation(self, product_name: str, co2_min: float, 
                            co2_max: float, details: List[Dict]) -> int:
@@ -263,54 +609,70 @@ class DatabaseManager:
         return self.execute_query(query, (limit,))
     
     # Arama ve Filtreleme
-    def search_operations(self, search_term: str) -> Dict[str, List[Dict]]:
+    def search_operations(self, search_term: str, limit: int = 50, offset: int = 0,
+                          tables: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Tüm tablolarda işlem arama yapar
+        Referans tablolarda FTS5 indeksi üzerinden sıralı arama yapar
         
         Args:
             search_term: Arama terimi
+            limit: Sayfa boyutu
+            offset: Atlanacak kayıt sayısı
+            tables: Aranacak tablolar (varsayılan: indeksteki tüm tablolar)
             
         Returns:
-            Arama sonuçları
+            Sıralı sonuçlar (ranked), tablo bazında kayıtlar (results) ve toplamlar
         """
-        results = {
-            'finished_product_operations': [],
-            'garment_processes': [],
-            'master_co2_data': []
+        try:
+            return search_index.search(self.get_connection(), search_term, limit, offset, tables)
+        except sqlite3.OperationalError:
+            # İndeks henüz oluşturulmamış eski veritabanları için LIKE taraması
+            return self._search_operations_like(search_term, limit, offset, tables)
+    
+    def _search_operations_like(self, search_term: str, limit: int, offset: int,
+                                tables: Optional[List[str]] = None) -> Dict[str, Any]:
+        """FTS5 indeksi olmayan veritabanları için LIKE tabanlı arama"""
+        queries = {
+            # Bitmiş ürün işlemleri arama
+            'finished_product_operations': """
+                SELECT * FROM finished_product_operations 
+                WHERE operation_type LIKE ? OR description LIKE ? OR category LIKE ?
+                ORDER BY category, operation_type
+            """,
+            # Konfeksiyon süreçleri arama
+            'garment_processes': """
+                SELECT * FROM garment_processes 
+                WHERE process_step LIKE ? OR description LIKE ? OR category LIKE ?
+                ORDER BY category, process_step
+            """,
+            # Master CO2 verileri arama
+            'master_co2_data': """
+                SELECT * FROM master_co2_data 
+                WHERE operation LIKE ? OR description LIKE ? OR category LIKE ?
+                ORDER BY upper_category, category, operation
+            """
         }
         
-        # Bitmiş ürün işlemleri arama
-        query1 = """
-            SELECT * FROM finished_product_operations 
-            WHERE operation_type LIKE ? OR description LIKE ? OR category LIKE ?
-            ORDER BY category, operation_type
-        """
+        # FTS5 araması gibi yalnızca istenen (bilinen) tablolar aranır
         search_param = f"%{search_term}%"
-        results['finished_product_operations'] = self.execute_query(
-            query1, (search_param, search_param, search_param)
-        )
-        
-        # Konfeksiyon süreçleri arama
-        query2 = """
-            SELECT * FROM garment_processes 
-            WHERE process_step LIKE ? OR description LIKE ? OR category LIKE ?
-            ORDER BY category, process_step
-        """
-        results['garment_processes'] = self.execute_query(
-            query2, (search_param, search_param, search_param)
-        )
-        
-        # Master CO2 verileri arama
-        query3 = """
-            SELECT * FROM master_co2_data 
-            WHERE operation LIKE ? OR description LIKE ? OR category LIKE ?
-            ORDER BY upper_category, category, operation
-        """
-        results['master_co2_data'] = self.execute_query(
-            query3, (search_param, search_param, search_param)
-        )
+        results = {
+            table: self.execute_query(query, (search_param, search_param, search_param))
+            for table, query in queries.items() if not tables or table in tables
+        }
         
-        return results
+        # Sıralama olmadan tüm eşleşmeler tek sayfada döner
+        ranked = [
+            {'table': table, 'score': 0.0, 'record': record}
+            for table, records in results.items() for record in records
+        ]
+        return {
+            'ranked': ranked[offset:offset + limit],
+            'results': results,
+            'total': len(ranked),
+            'totals_by_table': {table: len(records) for table, records in results.items()},
+            'limit': limit,
+            'offset': offset
+        }
     
     # İstatistikler
     def get_database_stats(self) -> Dict:
@@ -352,11 +714,15 @@ class DatabaseManager:
     
     def get_categories_by_table(self) -> Dict[str, List[str]]:
         """
-        Her tablo için kategori listesini getirir
+        Her tablo için kategori listesini getirir (önbellekli)
         
         Returns:
             Tablo bazında kategori listeleri
         """
+        tables = ('finished_product_operations', 'garment_processes', 'master_co2_data')
+        return self._cached('get_categories_by_table', tables, self._load_categories_by_table)
+    
+    def _load_categories_by_table(self) -> Dict[str, List[str]]:
         categories = {}
         
         # Bitmiş ürün işlemleri kategorileri
@@ -379,82 +745,74 @@ class DatabaseManager:
         
         return categories
     
+    def _master_konfeksiyon_query(self, category: Optional[str], name: Optional[str],
+                                  match: str) -> Tuple[str, tuple]:
+        return self._filtered_query(
+            "SELECT * FROM master_konfeksiyon",
+            [('category', category), ('name', name)], match, "category, name"
+        )
+    
     def get_master_konfeksiyon_data(self, category: Optional[str] = None, 
-                                   name: Optional[str] = None) -> List[Dict]:
+                                   name: Optional[str] = None,
+                                   match: str = 'contains') -> List[Dict]:
         """
         Master konfeksiyon verilerini getirir
         
         Args:
             category: Kategori filtresi
             name: İsim filtresi
+            match: Eşleşme modu ('contains', 'exact', 'prefix')
             
         Returns:
             Master konfeksiyon verileri listesi
         """
-        query = "SELECT * FROM master_konfeksiyon WHERE 1=1"
-        params = []
-        
-        if category:
-            query += " AND category LIKE ?"
-            params.append(f"%{category}%")
-            
-        if name:
-            query += " AND name LIKE ?"
-            params.append(f"%{name}%")
-            
-        query += " ORDER BY category, name"
-        
-        return self.execute_query(query, tuple(params))
+        return self.execute_query(*self._master_konfeksiyon_query(category, name, match))
+    
+    def _product_fabric_co2_query(self, gender: Optional[str], category: Optional[str],
+                                  product: Optional[str], fabric_type: Optional[str],
+                                  match: str) -> Tuple[str, tuple]:
+        # Cinsiyet her modda tam eşleşmedir; indeksli modlarda bileşik
+        # (gender, category, product, fabric_type) indeksinin ilk kolonudur
+        gender_match = 'equals' if match == 'contains' else 'exact'
+        return self._filtered_query(
+            "SELECT * FROM product_fabric_co2",
+            [('gender', gender, gender_match), ('category', category),
+             ('product', product), ('fabric_type', fabric_type)],
+            match, "gender, category, product"
+        )
     
     def get_product_fabric_co2_data(self, gender: Optional[str] = None,
                                    category: Optional[str] = None,
                                    product: Optional[str] = None,
-                                   fabric_type: Optional[str] = None) -> List[Dict]:
+                                   fabric_type: Optional[str] = None,
+                                   match: str = 'contains') -> List[Dict]:
         """
         Ürün kumaş CO2 verilerini getirir
         
         Args:
-            gender: Cinsiyet filtresi
+            gender: Cinsiyet filtresi (her zaman tam eşleşme)
             category: Kategori filtresi  
             product: Ürün filtresi
             fabric_type: Kumaş tipi filtresi
+            match: Eşleşme modu ('contains', 'exact', 'prefix')
             
         Returns:
             Ürün kumaş CO2 verileri listesi
         """
-        query = "SELECT * FROM product_fabric_co2 WHERE 1=1"
-        params = []
-        
-        if gender:
-            query += " AND gender = ?"
-            params.append(gender)
-            
-        if category:
-            query += " AND category LIKE ?"
-            params.append(f"%{category}%")
-            
-        if product:
-            query += " AND product LIKE ?"
-            params.append(f"%{product}%")
-            
-        if fabric_type:
-            query += " AND fabric_type LIKE ?"
-            params.append(f"%{fabric_type}%")
-            
-        query += " ORDER BY gender, category, product"
-        
-        return self.execute_query(query, tuple(params))
+        return self.execute_query(
+            *self._product_fabric_co2_query(gender, category, product, fabric_type, match)
+        )
     
     def get_fabric_types(self) -> List[str]:
         """Tüm kumaş tiplerini getirir"""
         query = "SELECT DISTINCT fabric_type FROM product_fabric_co2 WHERE fabric_type IS NOT NULL ORDER BY fabric_type"
-        results = self.execute_query(query)
+        results = self.execute_cached_query(query, tables=('product_fabric_co2',))
         return [row['fabric_type'] for row in results]
     
     def get_compositions(self) -> List[str]:
         """Tüm kompozisyonları getirir"""
         query = "SELECT DISTINCT composition FROM product_fabric_co2 WHERE composition IS NOT NULL ORDER BY composition"
-        results = self.execute_query(query)
+        results = self.execute_cached_query(query, tables=('product_fabric_co2',))
         return [row['composition'] for row in results]
     
     def search_fabric_by_composition(self, composition_search: str) -> List[Dict]:
@@ -468,6 +826,7 @@ class DatabaseManager:
     
     def save_style_data(self, data):
         """Stil verilerini database'e kaydet"""
+        conn = self.get_connection()
         try:
             # Stil bilgilerini kaydet
             style_query = """
@@ -489,7 +848,7 @@ class DatabaseManager:
                 data.get('notes', '')
             )
             
-            cursor = self.conn.cursor()
+            cursor = conn.cursor()
             cursor.execute(style_query, style_values)
             style_id = cursor.lastrowid
             
@@ -524,12 +883,15 @@ class DatabaseManager:
                         process.get('unit', '')
                     ))
             
-            self.conn.commit()
+            self.bump_table_versions(conn, ['styles', 'style_fibers', 'style_processes'])
+            conn.commit()
             return style_id
             
         except Exception as e:
-            self.conn.rollback()
+            conn.rollback()
             raise e
+        finally:
+            self.table_versions.invalidate()
     
     def get_style_data(self, style_code):
         """Stil verilerini getir"""
@@ -578,24 +940,26 @@ class DatabaseManager:
         except Exception as e:
             raise e
     
-    def get_co2_range_by_category(self, category: str) -> Dict:
-        """Kategoriye göre CO2 aralığını getirir"""
+    def _co2_range_queries(self, category: str, match: str) -> List[Tuple[str, tuple]]:
         # Master konfeksiyon verilerinden
-        query1 = """
+        query1 = self._filtered_query("""
             SELECT MIN(min_co2_kg) as min_co2, MAX(max_co2_kg) as max_co2, AVG(avg_co2_kg) as avg_co2
-            FROM master_konfeksiyon 
-            WHERE category LIKE ?
-        """
+            FROM master_konfeksiyon
+        """, [('category', category)], match)
         
         # Kumaş verilerinden
-        query2 = """
+        query2 = self._filtered_query("""
             SELECT MIN(co2_kg_per_kg) as min_co2, MAX(co2_kg_per_kg) as max_co2, AVG(co2_kg_per_kg) as avg_co2
-            FROM product_fabric_co2 
-            WHERE category LIKE ?
-        """
+            FROM product_fabric_co2
+        """, [('category', category)], match)
         
-        konfeksiyon_data = self.execute_query(query1, (f"%{category}%",))
-        fabric_data = self.execute_query(query2, (f"%{category}%",))
+        return [query1, query2]
+    
+    def get_co2_range_by_category(self, category: str, match: str = 'contains') -> Dict:
+        """Kategoriye göre CO2 aralığını getirir"""
+        query1, query2 = self._co2_range_queries(category, match)
+        konfeksiyon_data = self.execute_query(*query1)
+        fabric_data = self.execute_query(*query2)
         
         return {
             'konfeksiyon': konfeksiyon_data[0] if konfeksiyon_data else {},
@@ -603,4 +967,5 @@ class DatabaseManager:
         }
 
 # Singleton instance
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
+atexit.register(db_manager.close)
\ No newline at end of file
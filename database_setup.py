@@ -7,7 +7,79 @@ import sqlite3
 import pandas as pd
 import os
 import re
-from typing import Dict, List, Tuple, Optional
+import time
+import hashlib
+from typing import Any, Dict, List, Tuple, Optional
+
+import query_cache
+import search_index
+
+# Filtre sorgularında indeksle kullanılan normalize (case-fold) kolonlar.
+# Her kolon için <kolon>_norm = search_index.normalize_tr(<kolon>) tutulur.
+NORMALIZED_COLUMNS = {
+    'finished_product_operations': ['category'],
+    'garment_processes': ['category'],
+    'master_co2_data': ['category', 'operation'],
+    'master_konfeksiyon': ['category', 'name'],
+    'product_fabric_co2': ['gender', 'category', 'product', 'fabric_type']
+}
+
+# İkincil indeksler: (indeks adı, tablo, kolonlar)
+INDEXES = [
+    ('idx_fpo_category', 'finished_product_operations', 'category_norm, operation_type'),
+    ('idx_gp_category', 'garment_processes', 'category_norm, process_step'),
+    ('idx_mcd_category_operation', 'master_co2_data', 'category_norm, operation_norm'),
+    ('idx_mcd_operation', 'master_co2_data', 'operation_norm'),
+    ('idx_mk_category_name', 'master_konfeksiyon', 'category_norm, name_norm'),
+    ('idx_mk_name', 'master_konfeksiyon', 'name_norm'),
+    ('idx_pfc_gender_category_product_fabric', 'product_fabric_co2',
+     'gender_norm, category_norm, product_norm, fabric_type_norm'),
+    ('idx_pfc_category', 'product_fabric_co2', 'category_norm, product_norm'),
+    ('idx_pfc_product', 'product_fabric_co2', 'product_norm')
+]
+
+# Referans CSV kaynakları (csv_dir'e göre göreli yol)
+REFERENCE_SOURCES = {
+    'finished_product_operations': {
+        'file': 'bitmis_urun_islemleri_co2.csv',
+        'label': 'Bitmiş ürün işlemleri'
+    },
+    'garment_processes': {
+        'file': 'konfeksiyon_surecleri_co2.csv',
+        'label': 'Konfeksiyon süreçleri'
+    },
+    'master_co2_data': {
+        'file': 'hazir_giyim_master_co2.csv',
+        'label': 'Master CO2 verileri'
+    },
+    'master_konfeksiyon': {
+        'file': os.path.join('Final_Dosyalar', 'Master_Konfeksiyon copy.csv'),
+        'label': 'Master Konfeksiyon'
+    },
+    'product_fabric_co2': {
+        'file': os.path.join('Final_Dosyalar', 'Urun_Kumas_CO2_Listesi.csv'),
+        'label': 'Ürün Kumaş CO2',
+        'read_csv': {'delimiter': ';'}
+    }
+}
+
+# Artımlı güncellemede kayıtları eşleştiren kararlı doğal anahtarlar
+NATURAL_KEYS = {
+    'finished_product_operations': ['category', 'operation_type'],
+    'garment_processes': ['category', 'process_step'],
+    'master_co2_data': ['upper_category', 'category', 'operation'],
+    'master_konfeksiyon': ['category', 'name', 'unit', 'source_file'],
+    'product_fabric_co2': ['gender', 'category', 'product', 'fabric_type', 'composition']
+}
+
+# Kategori tablosunun türetildiği kaynaklar
+CATEGORY_SOURCE_TABLES = ['finished_product_operations', 'garment_processes', 'master_co2_data']
+
+# Toplu import: executemany parça boyutu ve hedef hız (kayıt/saniye).
+# Hedef, 100x büyüklükteki bir kataloğun (~180k kumaş satırı) saniyeler
+# içinde yeniden yüklenebilmesine göre belirlenmiştir.
+IMPORT_CHUNK_SIZE = 10000
+IMPORT_THROUGHPUT_TARGET = 40000
 
 class DatabaseSetup:
     def __init__(self, db_path: str = "zero_design.db"):
@@ -37,6 +109,8 @@ class DatabaseSetup:
                 co2_max REAL,
                 co2_unit TEXT DEFAULT 'kgCO2e/ürün',
                 notes TEXT,
+                category_norm TEXT,
+                row_hash INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -53,6 +127,8 @@ class DatabaseSetup:
                 co2_max REAL,
                 co2_unit TEXT DEFAULT 'kgCO2e/ürün',
                 notes TEXT,
+                category_norm TEXT,
+                row_hash INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -71,6 +147,9 @@ class DatabaseSetup:
                 co2_max REAL,
                 co2_unit TEXT DEFAULT 'kgCO2e/ürün',
                 notes TEXT,
+                category_norm TEXT,
+                operation_norm TEXT,
+                row_hash INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -112,6 +191,9 @@ class DatabaseSetup:
                 avg_co2_kg REAL,
                 source TEXT,
                 source_file TEXT,
+                category_norm TEXT,
+                name_norm TEXT,
+                row_hash INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
@@ -127,13 +209,71 @@ class DatabaseSetup:
                 composition TEXT,
                 usage_hint TEXT,
                 co2_kg_per_kg REAL,
+                gender_norm TEXT,
+                category_norm TEXT,
+                product_norm TEXT,
+                fabric_type_norm TEXT,
+                row_hash INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        # Kaynak dosya takibi (artımlı güncelleme)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS import_metadata (
+                source_file TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                mtime REAL,
+                size INTEGER,
+                row_count INTEGER,
+                imported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Sorgu önbelleğinin geçersizleştirilmesi için tablo sürüm sayaçları
+        query_cache.create_version_table(conn)
+        
+        # Önceki sürümlerde oluşturulmuş tablolara yeni kolonları ekle
+        self.migrate_columns(conn)
+        
+        # İkincil indeksler
+        self.create_indexes(conn)
+        
+        # Tam metin arama indeksi (FTS5)
+        search_index.create_search_index(conn)
+        search_index.migrate_search_index(conn)
+        
         conn.commit()
         conn.close()
         print("✅ Veritabanı tabloları başarıyla oluşturuldu!")
+    
+    def migrate_columns(self, conn: sqlite3.Connection):
+        """Eksik <kolon>_norm ve row_hash kolonlarını ekler"""
+        for table, columns in NORMALIZED_COLUMNS.items():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            missing = [c for c in columns if f"{c}_norm" not in existing]
+            for column in missing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}_norm TEXT")
+            if missing:
+                self.refresh_normalized_columns(conn, table)
+            
+            # NULL row_hash'li kayıtlar ilk artımlı güncellemede yeniden yazılır
+            if 'row_hash' not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN row_hash INTEGER")
+    
+    def refresh_normalized_columns(self, conn: sqlite3.Connection, table: str):
+        """Tablonun normalize kolonlarını kaynak kolonlardan yeniden hesaplar"""
+        search_index.register_functions(conn)
+        assignments = ', '.join(
+            f"{column}_norm = tr_norm({column})" for column in NORMALIZED_COLUMNS[table]
+        )
+        conn.execute(f"UPDATE {table} SET {assignments}")
+    
+    def create_indexes(self, conn: sqlite3.Connection):
+        """Filtre sorguları için ikincil indeksleri oluşturur"""
+        for index_name, table, columns in INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({columns})")
         
     def parse_co2_range(self, co2_value: str) -> Tuple[Optional[float], Optional[float]]:
         """
@@ -167,125 +307,402 @@ class DatabaseSetup:
         except ValueError:
             return None, None
     
-    def import_finished_product_operations(self):
-        """Bitmiş ürün işlemleri CSV'sini import eder"""
-        csv_path = os.path.join(self.csv_dir, 'bitmis_urun_islemleri_co2.csv')
+    def parse_co2_ranges(self, co2_values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """
+        CO2 değer aralıklarını vektörel olarak parse eder (parse_co2_range'in
+        satır satır çağrılmayan karşılığı)
         
-        if not os.path.exists(csv_path):
-            print(f"❌ Dosya bulunamadı: {csv_path}")
-            return
+        Args:
+            co2_values: "0.35-0.50" veya "0.4" formatındaki değerler
             
+        Returns:
+            Tuple[min serisi, max serisi] - parse edilemeyen değerler NaN
+        """
+        values = co2_values.astype('string').str.strip()
+        parts = values.str.split('-', n=2, expand=True).reindex(columns=[0, 1])
+        has_range = values.str.contains('-', regex=False).fillna(False).astype(bool)
+        
+        range_min = pd.to_numeric(parts[0].str.strip(), errors='coerce')
+        range_max = pd.to_numeric(parts[1].str.strip(), errors='coerce')
+        single = pd.to_numeric(values, errors='coerce')
+        
+        # Aralıkta iki taraftan biri parse edilemezse ikisi de boş kalır
+        range_valid = range_min.notna() & range_max.notna()
+        co2_min = single.where(~has_range, range_min.where(range_valid))
+        co2_max = single.where(~has_range, range_max.where(range_valid))
+        return co2_min.astype(float), co2_max.astype(float)
+    
+    def _column(self, df: pd.DataFrame, name: str, default=''):
+        """CSV kolonunu döndürür; kolon yoksa varsayılan değerle doldurur"""
+        if name in df.columns:
+            return df[name]
+        return pd.Series(default, index=df.index, dtype=object)
+    
+    def _normalize_series(self, values: pd.Series) -> pd.Series:
+        """normalize_tr'yi yalnızca tekil değerler için çalıştırarak uygular"""
+        uniques = values.dropna().unique()
+        mapping = {value: search_index.normalize_tr(value) for value in uniques}
+        return values.map(mapping)
+    
+    def _row_hashes(self, records: pd.DataFrame) -> pd.Series:
+        """Kayıt içeriğinin değişiklik takibi için 64-bit özeti"""
+        hashes = pd.util.hash_pandas_object(records, index=False)
+        return pd.Series(hashes.values.view('int64'), index=records.index)
+    
+    def _prepare_records(self, table: str, records: pd.DataFrame) -> pd.DataFrame:
+        """Kayıtlara row_hash ve normalize filtre kolonlarını ekler"""
+        prepared = records.copy()
+        prepared['row_hash'] = self._row_hashes(records)
+        for column in NORMALIZED_COLUMNS.get(table, []):
+            prepared[f"{column}_norm"] = self._normalize_series(prepared[column])
+        return prepared
+    
+    def _sql_rows(self, records: pd.DataFrame):
+        """DataFrame satırlarını NaN → NULL dönüşümüyle tuple olarak üretir"""
+        return records.astype(object).where(records.notna(), None).itertuples(index=False, name=None)
+    
+    def _bulk_insert(self, conn: sqlite3.Connection, table: str, records: pd.DataFrame,
+                     chunk_size: int = IMPORT_CHUNK_SIZE) -> int:
+        """
+        DataFrame'i executemany ile parça parça tabloya ekler
+        
+        row_hash ve normalize filtre kolonları (NORMALIZED_COLUMNS) otomatik
+        doldurulur. NaN değerler NULL olarak yazılır. Transaction yönetimi
+        çağırana aittir.
+        """
+        records = self._prepare_records(table, records)
+        
+        columns = list(records.columns)
+        query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join('?' for _ in columns)})")
+        
+        for start in range(0, len(records), chunk_size):
+            conn.executemany(query, self._sql_rows(records.iloc[start:start + chunk_size]))
+        return len(records)
+    
+    def _bulk_replace(self, table: str, records: pd.DataFrame,
+                      source: Optional[Dict] = None) -> int:
+        """
+        Tablo içeriğini tek transaction'da records ile değiştirir ve arama
+        indeksini günceller
+        
+        Args:
+            table: Hedef tablo
+            records: Yeni tablo içeriği
+            source: Kaynak dosya durumu (verilirse import_metadata'ya yazılır)
+        
+        Returns:
+            Eklenen kayıt sayısı
+        """
+        started = time.perf_counter()
+        conn = sqlite3.connect(self.db_path)
         try:
-            df = pd.read_csv(csv_path, encoding='utf-8')
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("BEGIN")
+            conn.execute(f"DELETE FROM {table}")
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # İndeksleri satır satır güncellemek yerine yükleme sonrası tek
+            # seferde (sıralı) yeniden oluştur
+            table_indexes = [index for index in INDEXES if index[1] == table]
+            for index_name, _, _ in table_indexes:
+                conn.execute(f"DROP INDEX IF EXISTS {index_name}")
             
-            for _, row in df.iterrows():
-                co2_min, co2_max = self.parse_co2_range(row.get('CO2 (kgCO2e/ürün)', ''))
-                
-                cursor.execute('''
-                    INSERT INTO finished_product_operations 
-                    (category, operation_type, description, applicable_product_groups, 
-                     co2_min, co2_max, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row.get('Kategori', ''),
-                    row.get('İşlem Türü', ''),
-                    row.get('Açıklama', ''),
-                    row.get('Uygulanan Ürün Grupları', ''),
-                    co2_min,
-                    co2_max,
-                    row.get('Not', '')
-                ))
+            count = self._bulk_insert(conn, table, records)
+            
+            for index_name, _, columns in table_indexes:
+                conn.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
+            search_index.rebuild_search_index(conn, [table])
+            query_cache.bump_table_versions(conn, [table])
             
+            if source:
+                self._save_import_metadata(conn, table, source, count)
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
             conn.close()
-            print(f"✅ Bitmiş ürün işlemleri import edildi: {len(df)} kayıt")
-            
-        except Exception as e:
-            print(f"❌ Bitmiş ürün işlemleri import hatası: {e}")
+        
+        elapsed = time.perf_counter() - started
+        throughput = count / elapsed if elapsed > 0 else float('inf')
+        if count >= IMPORT_CHUNK_SIZE and throughput < IMPORT_THROUGHPUT_TARGET:
+            print(f"⚠️ {table} import hızı hedefin altında: "
+                  f"{throughput:,.0f} kayıt/sn (hedef {IMPORT_THROUGHPUT_TARGET:,})")
+        return count
     
-    def import_garment_processes(self):
-        """Konfeksiyon süreçleri CSV'sini import eder"""
-        csv_path = os.path.join(self.csv_dir, 'konfeksiyon_surecleri_co2.csv')
+    def _key_series(self, records: pd.DataFrame, keys: List[str]) -> pd.Series:
+        """Doğal anahtar kolonlarını tek karşılaştırılabilir string'e indirger"""
+        parts = [records[key].astype(object).where(records[key].notna(), '').astype(str)
+                 for key in keys]
+        return parts[0].str.cat(parts[1:], sep='\x1f') if len(parts) > 1 else parts[0]
+    
+    def _upsert_records(self, table: str, records: pd.DataFrame,
+                        source: Optional[Dict] = None) -> Dict[str, int]:
+        """
+        Kayıtları doğal anahtara (NATURAL_KEYS) göre tabloyla eşitler
         
-        if not os.path.exists(csv_path):
-            print(f"❌ Dosya bulunamadı: {csv_path}")
-            return
-            
+        Yalnızca yeni kayıtlar eklenir, row_hash'i değişen kayıtlar güncellenir
+        ve kaynakta artık bulunmayan kayıtlar silinir. Arama indeksi de yalnızca
+        bu kayıtlar için güncellenir.
+        
+        Returns:
+            inserted / updated / deleted / unchanged sayıları
+        """
+        keys = NATURAL_KEYS[table]
+        prepared = self._prepare_records(table, records)
+        prepared['_key'] = self._key_series(prepared, keys)
+        prepared = prepared.drop_duplicates('_key', keep='last')
+        
+        conn = sqlite3.connect(self.db_path)
         try:
-            df = pd.read_csv(csv_path, encoding='utf-8')
+            conn.execute("BEGIN")
+            # row_hash metin olarak okunur: NULL (eski kayıt) içeren INTEGER kolonu
+            # float64'e dönüşür ve 64 bit özetler yuvarlanır
+            existing = pd.read_sql_query(
+                f"SELECT id, CAST(row_hash AS TEXT) AS _old_hash, {', '.join(keys)} FROM {table}", conn
+            )
+            existing['_key'] = self._key_series(existing, keys)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # Satırlar doğal anahtarla eşlenir; outer merge int64 kolonları
+            # (row_hash, id ve veri kolonları) eksik değer yüzünden float'a çevirirdi
+            duplicates = existing['_key'].duplicated()
+            current = existing[~duplicates].set_index('_key')
+            data_columns = [c for c in prepared.columns if c != '_key']
             
-            for _, row in df.iterrows():
-                co2_min, co2_max = self.parse_co2_range(row.get('CO2 (kgCO2e/ürün)', ''))
-                
-                cursor.execute('''
-                    INSERT INTO garment_processes 
-                    (category, process_step, description, applicable_product_groups, 
-                     co2_min, co2_max, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row.get('Kategori', ''),
-                    row.get('İşlem Adımı', ''),
-                    row.get('Açıklama', ''),
-                    row.get('Uygulanan Ürün Grupları', ''),
-                    co2_min,
-                    co2_max,
-                    row.get('Not', '')
-                ))
+            matched = prepared['_key'].isin(current.index)
+            to_insert = prepared[~matched]
+            candidates = prepared[matched]
+            old = current.loc[candidates['_key']]
+            changed = candidates['row_hash'].astype(str).to_numpy() != old['_old_hash'].to_numpy()
+            to_update = candidates[changed]
+            updated_ids = old['id'][changed].astype(int).tolist()
+            to_delete = (existing.loc[duplicates, 'id'].astype(int).tolist()
+                         + current.loc[~current.index.isin(prepared['_key']), 'id'].astype(int).tolist())
+            
+            if updated_ids:
+                assignments = ', '.join(f"{column} = ?" for column in data_columns)
+                conn.executemany(
+                    f"UPDATE {table} SET {assignments} WHERE id = ?",
+                    (row + (row_id,) for row, row_id in zip(self._sql_rows(to_update[data_columns]), updated_ids))
+                )
+            
+            inserted_ids = []
+            if len(to_insert):
+                query = (f"INSERT INTO {table} ({', '.join(data_columns)}) "
+                         f"VALUES ({', '.join('?' for _ in data_columns)})")
+                for row in self._sql_rows(to_insert[data_columns]):
+                    inserted_ids.append(conn.execute(query, row).lastrowid)
+            
+            for start in range(0, len(to_delete), search_index.ID_BATCH_SIZE):
+                conn.executemany(f"DELETE FROM {table} WHERE id = ?",
+                                 [(i,) for i in to_delete[start:start + search_index.ID_BATCH_SIZE]])
             
+            search_index.update_search_index(conn, table, updated_ids + inserted_ids, to_delete)
+            if updated_ids or inserted_ids or to_delete:
+                query_cache.bump_table_versions(conn, [table])
+            
+            if source:
+                self._save_import_metadata(conn, table, source, len(prepared))
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
             conn.close()
-            print(f"✅ Konfeksiyon süreçleri import edildi: {len(df)} kayıt")
-            
-        except Exception as e:
-            print(f"❌ Konfeksiyon süreçleri import hatası: {e}")
+        
+        return {
+            'inserted': len(inserted_ids),
+            'updated': len(updated_ids),
+            'deleted': len(to_delete),
+            'unchanged': len(prepared) - len(inserted_ids) - len(updated_ids)
+        }
     
-    def import_master_co2_data(self):
-        """Master CO2 verilerini import eder"""
-        csv_path = os.path.join(self.csv_dir, 'hazir_giyim_master_co2.csv')
+    # Kaynak Dosya Takibi
+    def _source_path(self, table: str) -> str:
+        return os.path.join(self.csv_dir, REFERENCE_SOURCES[table]['file'])
+    
+    def _file_sha256(self, path: str) -> str:
+        """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _source_state(self, table: str) -> Dict:
+        """Kaynak CSV'nin göreli yolu, boyutu, mtime'ı ve özeti"""
+        path = self._source_path(table)
+        stat = os.stat(path)
+        return {
+            'source_file': REFERENCE_SOURCES[table]['file'],
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'sha256': self._file_sha256(path)
+        }
+    
+    def _get_import_metadata(self, source_file: str) -> Optional[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM import_metadata WHERE source_file = ?",
+                               (source_file,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    
+    def _save_import_metadata(self, conn: sqlite3.Connection, table: str,
+                              source: Dict, row_count: int):
+        conn.execute('''
+            INSERT INTO import_metadata
+            (source_file, table_name, sha256, mtime, size, row_count, imported_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(source_file) DO UPDATE SET
+                table_name = excluded.table_name,
+                sha256 = excluded.sha256,
+                mtime = excluded.mtime,
+                size = excluded.size,
+                row_count = excluded.row_count,
+                imported_at = excluded.imported_at
+        ''', (source['source_file'], table, source['sha256'], source['mtime'],
+              source['size'], row_count))
+    
+    def _source_unchanged(self, table: str) -> bool:
+        """
+        Kaynak dosya son importtan beri değişmemişse True döner
+        
+        Boyut ve mtime aynıysa dosya okunmaz; mtime değişip içerik aynıysa
+        (ör. git checkout) yalnızca metadata güncellenir.
+        """
+        path = self._source_path(table)
+        metadata = self._get_import_metadata(REFERENCE_SOURCES[table]['file'])
+        if not metadata:
+            return False
+        
+        stat = os.stat(path)
+        if stat.st_size == metadata['size'] and stat.st_mtime == metadata['mtime']:
+            return True
+        
+        source = self._source_state(table)
+        if source['sha256'] != metadata['sha256']:
+            return False
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._save_import_metadata(conn, table, source, metadata['row_count'])
+            conn.commit()
+        finally:
+            conn.close()
+        return True
+    
+    # CSV → Tablo Eşlemeleri
+    def _finished_product_operations_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        co2_min, co2_max = self.parse_co2_ranges(self._column(df, 'CO2 (kgCO2e/ürün)'))
+        return pd.DataFrame({
+            'category': self._column(df, 'Kategori'),
+            'operation_type': self._column(df, 'İşlem Türü'),
+            'description': self._column(df, 'Açıklama'),
+            'applicable_product_groups': self._column(df, 'Uygulanan Ürün Grupları'),
+            'co2_min': co2_min,
+            'co2_max': co2_max,
+            'notes': self._column(df, 'Not')
+        })
+    
+    def _garment_processes_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        co2_min, co2_max = self.parse_co2_ranges(self._column(df, 'CO2 (kgCO2e/ürün)'))
+        return pd.DataFrame({
+            'category': self._column(df, 'Kategori'),
+            'process_step': self._column(df, 'İşlem Adımı'),
+            'description': self._column(df, 'Açıklama'),
+            'applicable_product_groups': self._column(df, 'Uygulanan Ürün Grupları'),
+            'co2_min': co2_min,
+            'co2_max': co2_max,
+            'notes': self._column(df, 'Not')
+        })
+    
+    def _master_co2_data_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        co2_range = self._column(df, 'CO2 (kgCO2e/ürün)')
+        co2_min, co2_max = self.parse_co2_ranges(co2_range)
+        return pd.DataFrame({
+            'upper_category': self._column(df, 'Üst Kategori'),
+            'category': self._column(df, 'Kategori'),
+            'operation': self._column(df, 'İşlem'),
+            'description': self._column(df, 'Açıklama'),
+            'applicable_product_groups': self._column(df, 'Uygulanan Ürün Grupları'),
+            'co2_range': co2_range,
+            'co2_min': co2_min,
+            'co2_max': co2_max,
+            'notes': self._column(df, 'Not')
+        })
+    
+    def _master_konfeksiyon_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({
+            column: self._column(df, column, default)
+            for column, default in [
+                ('category', ''), ('name', ''), ('type', ''), ('unit', ''),
+                ('stage', ''), ('description', ''), ('min_co2_kg', None),
+                ('max_co2_kg', None), ('avg_co2_kg', None), ('source', ''),
+                ('source_file', '')
+            ]
+        })
+    
+    def _product_fabric_co2_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame({
+            column: self._column(df, column, default)
+            for column, default in [
+                ('gender', ''), ('category', ''), ('product', ''),
+                ('fabric_type', ''), ('composition', ''), ('usage_hint', ''),
+                ('co2_kg_per_kg', None)
+            ]
+        })
+    
+    def _import_reference_table(self, table: str, incremental: bool = False) -> Optional[Dict]:
+        """
+        REFERENCE_SOURCES'taki CSV'yi tabloya import eder
+        
+        Args:
+            table: Hedef tablo
+            incremental: True ise doğal anahtarla upsert, değilse tam yeniden yükleme
+            
+        Returns:
+            Import özeti veya hata durumunda None
+        """
+        spec = REFERENCE_SOURCES[table]
+        csv_path = self._source_path(table)
         
         if not os.path.exists(csv_path):
             print(f"❌ Dosya bulunamadı: {csv_path}")
-            return
+            return None
             
         try:
-            df = pd.read_csv(csv_path, encoding='utf-8')
+            source = self._source_state(table)
+            df = pd.read_csv(csv_path, encoding='utf-8', **spec.get('read_csv', {}))
+            records = getattr(self, f"_{table}_records")(df)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            for _, row in df.iterrows():
-                co2_range = row.get('CO2 (kgCO2e/ürün)', '')
-                co2_min, co2_max = self.parse_co2_range(co2_range)
-                
-                cursor.execute('''
-                    INSERT INTO master_co2_data 
-                    (upper_category, category, operation, description, applicable_product_groups, 
-                     co2_range, co2_min, co2_max, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row.get('Üst Kategori', ''),
-                    row.get('Kategori', ''),
-                    row.get('İşlem', ''),
-                    row.get('Açıklama', ''),
-                    row.get('Uygulanan Ürün Grupları', ''),
-                    co2_range,
-                    co2_min,
-                    co2_max,
-                    row.get('Not', '')
-                ))
+            if incremental:
+                summary = self._upsert_records(table, records, source)
+                print(f"✅ {spec['label']} güncellendi: {summary['inserted']} yeni, "
+                      f"{summary['updated']} değişen, {summary['deleted']} silinen kayıt")
+                return summary
             
-            conn.commit()
-            conn.close()
-            print(f"✅ Master CO2 verileri import edildi: {len(df)} kayıt")
+            count = self._bulk_replace(table, records, source)
+            print(f"✅ {spec['label']} import edildi: {count} kayıt")
+            return {'inserted': count, 'updated': 0, 'deleted': 0, 'unchanged': 0}
             
         except Exception as e:
-            print(f"❌ Master CO2 verileri import hatası: {e}")
+            print(f"❌ {spec['label']} import hatası: {e}")
+            return None
+    
+    def import_finished_product_operations(self):
+        """Bitmiş ürün işlemleri CSV'sini import eder"""
+        self._import_reference_table('finished_product_operations')
+    
+    def import_garment_processes(self):
+        """Konfeksiyon süreçleri CSV'sini import eder"""
+        self._import_reference_table('garment_processes')
+    
+    def import_master_co2_data(self):
+        """Master CO2 verilerini import eder"""
+        self._import_reference_table('master_co2_data')
     
     def extract_and_import_categories(self):
         """Tüm CSV dosyalarından ürün kategorilerini çıkarır ve kategoriler tablosuna ekler"""
@@ -332,6 +749,7 @@ class DatabaseSetup:
                     VALUES (?)
                 ''', (category.strip(),))
         
+        query_cache.bump_table_versions(conn, ['product_categories'])
         conn.commit()
         conn.close()
         print(f"✅ Ürün kategorileri çıkarıldı: {len(categories)} kategori")
@@ -420,91 +838,59 @@ class DatabaseSetup:
         
         print("🎉 Veritabanı kurulumu tamamlandı!")
     
-    def import_master_konfeksiyon(self):
-        """Master Konfeksiyon CSV'sini import eder"""
-        csv_path = os.path.join(self.csv_dir, 'Final_Dosyalar', 'Master_Konfeksiyon copy.csv')
+    def refresh_reference_data(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Referans verilerini artımlı olarak günceller
         
-        if not os.path.exists(csv_path):
-            print(f"❌ Dosya bulunamadı: {csv_path}")
-            return
-            
-        try:
-            df = pd.read_csv(csv_path, encoding='utf-8')
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Önce tabloyu temizle
-            cursor.execute('DELETE FROM master_konfeksiyon')
-            
-            for _, row in df.iterrows():
-                cursor.execute('''
-                    INSERT INTO master_konfeksiyon 
-                    (category, name, type, unit, stage, description, 
-                     min_co2_kg, max_co2_kg, avg_co2_kg, source, source_file)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row.get('category', ''),
-                    row.get('name', ''),
-                    row.get('type', ''),
-                    row.get('unit', ''),
-                    row.get('stage', ''),
-                    row.get('description', ''),
-                    row.get('min_co2_kg', None),
-                    row.get('max_co2_kg', None),
-                    row.get('avg_co2_kg', None),
-                    row.get('source', ''),
-                    row.get('source_file', '')
-                ))
-            
-            conn.commit()
-            conn.close()
-            print(f"✅ Master Konfeksiyon import edildi: {len(df)} kayıt")
+        Son importtan beri değişmemiş CSV'ler atlanır; değişenlerde yalnızca
+        eklenen, değişen ve silinen kayıtlar doğal anahtara göre yazılır.
+        
+        Args:
+            force: True ise dosya özetine bakmadan tüm kaynakları eşitle
             
-        except Exception as e:
-            print(f"❌ Master Konfeksiyon import hatası: {e}")
+        Returns:
+            Tablo bazında güncelleme özeti ('unchanged' veya sayılar)
+        """
+        print("🔄 Zero@Design Referans Veri Güncellemesi Başlıyor...")
+        started = time.perf_counter()
+        
+        self.create_database()
+        self.create_styles_tables()
+        
+        summary = {}
+        for table, spec in REFERENCE_SOURCES.items():
+            if not os.path.exists(self._source_path(table)):
+                print(f"❌ Dosya bulunamadı: {self._source_path(table)}")
+                continue
+            if not force and self._source_unchanged(table):
+                print(f"⏭️ {spec['label']} değişmedi, atlandı")
+                summary[table] = 'unchanged'
+                continue
+            summary[table] = self._import_reference_table(table, incremental=True)
+        
+        if any(isinstance(summary.get(table), dict) for table in CATEGORY_SOURCE_TABLES):
+            self.extract_and_import_categories()
+        
+        print(f"🎉 Referans veri güncellemesi tamamlandı ({time.perf_counter() - started:.2f} sn)")
+        return summary
+    
+    def import_master_konfeksiyon(self):
+        """Master Konfeksiyon CSV'sini import eder"""
+        self._import_reference_table('master_konfeksiyon')
     
     def import_product_fabric_co2(self):
         """Ürün Kumaş CO2 CSV'sini import eder"""
-        csv_path = os.path.join(self.csv_dir, 'Final_Dosyalar', 'Urun_Kumas_CO2_Listesi.csv')
-        
-        if not os.path.exists(csv_path):
-            print(f"❌ Dosya bulunamadı: {csv_path}")
-            return
-            
-        try:
-            df = pd.read_csv(csv_path, encoding='utf-8', delimiter=';')
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Önce tabloyu temizle
-            cursor.execute('DELETE FROM product_fabric_co2')
-            
-            for _, row in df.iterrows():
-                cursor.execute('''
-                    INSERT INTO product_fabric_co2 
-                    (gender, category, product, fabric_type, composition, 
-                     usage_hint, co2_kg_per_kg)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row.get('gender', ''),
-                    row.get('category', ''),
-                    row.get('product', ''),
-                    row.get('fabric_type', ''),
-                    row.get('composition', ''),
-                    row.get('usage_hint', ''),
-                    row.get('co2_kg_per_kg', None)
-                ))
-            
-            conn.commit()
-            conn.close()
-            print(f"✅ Ürün Kumaş CO2 import edildi: {len(df)} kayıt")
-            
-        except Exception as e:
-            print(f"❌ Ürün Kumaş CO2 import hatası: {e}")
+        self._import_reference_table('product_fabric_co2')
         self.show_database_stats()
     
+    def rebuild_search_index(self):
+        """Arama indeksini mevcut tablolardan yeniden oluşturur"""
+        conn = sqlite3.connect(self.db_path)
+        counts = search_index.rebuild_search_index(conn)
+        conn.commit()
+        conn.close()
+        print(f"✅ Arama indeksi yeniden oluşturuldu: {sum(counts.values())} kayıt")
+    
     def show_database_stats(self):
         """Veritabanı istatistiklerini gösterir"""
         conn = sqlite3.connect(self.db_path)
@@ -527,7 +913,134 @@ class DatabaseSetup:
         
         conn.close()
 
+def benchmark_import(scale: int = 100) -> Dict[str, float]:
+    """
+    Kumaş CO2 listesini scale kat büyütüp toplu import hızını ölçer
+    
+    Args:
+        scale: Kaynak CSV'nin kaç kez çoğaltılacağı (100 → ~180k satır)
+        
+    Returns:
+        Kayıt sayısı, süre (sn) ve saniyedeki kayıt sayısı
+    """
+    import tempfile
+    
+    source = DatabaseSetup()
+    df = pd.read_csv(os.path.join(source.csv_dir, 'Final_Dosyalar', 'Urun_Kumas_CO2_Listesi.csv'),
+                     encoding='utf-8', delimiter=';')
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, 'Final_Dosyalar'))
+        pd.concat([df] * scale, ignore_index=True).to_csv(
+            os.path.join(tmp_dir, 'Final_Dosyalar', 'Urun_Kumas_CO2_Listesi.csv'),
+            sep=';', index=False, encoding='utf-8'
+        )
+        
+        db_setup = DatabaseSetup(os.path.join(tmp_dir, 'benchmark.db'))
+        db_setup.csv_dir = tmp_dir
+        db_setup.create_database()
+        
+        started = time.perf_counter()
+        db_setup.import_product_fabric_co2()
+        elapsed = time.perf_counter() - started
+    
+    rows = len(df) * scale
+    return {
+        'rows': rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed)
+    }
+
+def check_incremental_refresh() -> Dict[str, Any]:
+    """
+    Artımlı güncellemenin kararlı olduğunu doğrular
+    
+    Kumaş listesi geçici veritabanına yüklenir; ardından bir kayıt eklenip
+    biri değiştirilip biri silinerek eşitlenir ve aynı veriyle bir kez daha
+    eşitlenir. Son eşitlemede hiçbir kayıt yazılmamalıdır (row_hash'lerin
+    kayıpsız saklandığını gösterir).
+    
+    Returns:
+        Eşitleme özetleri ve stable (son eşitleme değişikliksiz mi)
+    """
+    import tempfile
+    
+    source = DatabaseSetup()
+    table = 'product_fabric_co2'
+    relative_path = REFERENCE_SOURCES[table]['file']
+    df = pd.read_csv(os.path.join(source.csv_dir, relative_path), encoding='utf-8', delimiter=';')
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, relative_path)
+        os.makedirs(os.path.dirname(csv_path))
+        db_setup = DatabaseSetup(os.path.join(tmp_dir, 'check.db'))
+        db_setup.csv_dir = tmp_dir
+        db_setup.create_database()
+        
+        def refresh(records: pd.DataFrame) -> Dict[str, int]:
+            records.to_csv(csv_path, sep=';', index=False, encoding='utf-8')
+            return db_setup._import_reference_table(table, incremental=True)
+        
+        changed = df.iloc[:-1].copy()
+        changed.iloc[0, changed.columns.get_loc('co2_kg_per_kg')] += 1
+        added = df.iloc[[0]].assign(product=lambda rows: rows['product'] + ' (yeni)')
+        changed = pd.concat([changed, added], ignore_index=True)
+        
+        runs = [refresh(df), refresh(changed), refresh(changed)]
+    
+    last = runs[-1]
+    return {
+        'runs': runs,
+        'stable': last['inserted'] == last['updated'] == last['deleted'] == 0
+    }
+
 if __name__ == "__main__":
-    # Veritabanı kurulumunu çalıştır
-    db_setup = DatabaseSetup()
-    db_setup.setup_complete_database()
\ No newline at end of file
+    import argparse
+    import sys
+    
+    parser = argparse.ArgumentParser(description="Zero@Design veritabanı kurulumu")
+    parser.add_argument('--db', default="zero_design.db", help="SQLite veritabanı dosyası")
+    parser.add_argument('--rebuild-search-index', action='store_true',
+                        help="Yalnızca arama indeksini yeniden oluştur")
+    parser.add_argument('--check-query-plans', action='store_true',
+                        help="Filtre sorgularının indeks kullandığını EXPLAIN ile doğrula")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Yalnızca değişen CSV'leri ve kayıtları güncelle")
+    parser.add_argument('--force', action='store_true',
+                        help="--incremental ile: değişmemiş görünen dosyaları da eşitle")
+    parser.add_argument('--check-incremental', action='store_true',
+                        help="Aynı veriyle ikinci artımlı güncellemenin değişikliksiz olduğunu doğrula")
+    parser.add_argument('--benchmark-import', type=int, metavar='SCALE',
+                        help="Kumaş listesini SCALE kat büyütüp import hızını ölç")
+    args = parser.parse_args()
+    
+    db_setup = DatabaseSetup(args.db)
+    
+    if args.benchmark_import:
+        result = benchmark_import(args.benchmark_import)
+        print(f"\n⏱️ {result['rows']:,} kayıt {result['seconds']} sn içinde import edildi "
+              f"({result['rows_per_second']:,} kayıt/sn, hedef {IMPORT_THROUGHPUT_TARGET:,})")
+        sys.exit(0 if result['rows_per_second'] >= IMPORT_THROUGHPUT_TARGET else 1)
+    elif args.check_incremental:
+        result = check_incremental_refresh()
+        for run in result['runs']:
+            print(f"   {run}")
+        print(f"{'✅' if result['stable'] else '❌'} Aynı veriyle ikinci güncelleme "
+              f"{'değişikliksiz' if result['stable'] else 'kayıt yazdı'}")
+        sys.exit(0 if result['stable'] else 1)
+    elif args.incremental:
+        db_setup.refresh_reference_data(force=args.force)
+    elif args.rebuild_search_index:
+        db_setup.rebuild_search_index()
+    elif args.check_query_plans:
+        from database_manager import DatabaseManager
+        
+        report = DatabaseManager(args.db).check_query_plans()
+        full_scans = [name for name, result in report.items() if result['full_scan']]
+        for name, result in report.items():
+            status = "❌" if result['full_scan'] else "✅"
+            print(f"{status} {name}: {' | '.join(result['plan'])}")
+        sys.exit(1 if full_scans else 0)
+    else:
+        # Veritabanı kurulumunu çalıştır
+        db_setup.setup_complete_database()
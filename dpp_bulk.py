@@ -0,0 +1,208 @@
+"""
+Toplu DPP oluşturma
+Zero@Design projesi - sezon boyu stil kartlarını tek istekte pasaporta çevirme
+"""
+
+import json
+import os
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Tek paket dosyasında ve tek transaction'da kaydedilen stil kartı sayısı
+BULK_CHUNK_SIZE = 256
+
+def iter_ndjson(lines: Iterable[bytes]) -> Iterator[Any]:
+    """
+    NDJSON satırlarını ayrıştırır
+
+    Boş satırlar atlanır; hatalı satır yerine ValueError nesnesi döner ki
+    toplu işlem o kalemi hata olarak raporlayıp devam edebilsin.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Geçersiz JSON satırı: {e}")
+
+class BulkDPPCreator:
+    """
+    Stil kartlarından toplu DPP oluşturucu
+
+    Kartlar chunk_size'lık parçalar halinde işlenir. Her parçanın DPP'leri
+    ve bekleyen blockchain makbuzları birer boşluksuz paket dosyasına
+    yazılır (kalem başına iki dosya yerine parça başına iki dosya ve iki
+    fsync); katalog ve kayıt kuyruğu tek transaction'da güncellenir.
+    Oluşturma ve hash hesapları GIL'e bağlı olduğundan thread havuzu
+    kullanılmaz. Sonuçlar giriş sırasıyla parça parça döner, böylece yanıt
+    akış (stream) olarak gönderilebilir.
+    """
+
+    def __init__(self, generator, nft_integration, dpp_storage, blockchain_storage,
+                 anchor_service, registration_queue,
+                 chunk_size: int = BULK_CHUNK_SIZE):
+        """
+        Args:
+            generator: DPPGenerator
+            nft_integration: NFTIntegration
+            dpp_storage: DPPStorage
+            blockchain_storage: DPPBlockchainStorage (bekleyen makbuzlar)
+            anchor_service: MerkleAnchorService (metadata hash makbuzu)
+            registration_queue: RegistrationQueue
+            chunk_size: Parça boyutu
+        """
+        self.generator = generator
+        self.nft_integration = nft_integration
+        self.dpp_storage = dpp_storage
+        self.blockchain_storage = blockchain_storage
+        self.anchor_service = anchor_service
+        self.registration_queue = registration_queue
+        self.chunk_size = chunk_size
+
+    def _build(self, item: Any) -> Dict[str, Any]:
+        """Tek kart için DPP, doğrulama, NFT metadata ve makbuz üretir"""
+        if isinstance(item, Exception):
+            return {'success': False, 'error': str(item)}
+        if not isinstance(item, dict):
+            return {'success': False, 'error': 'Stil kartı JSON nesnesi olmalı'}
+        try:
+            dpp = self.generator.create_dpp(item)
+            validation = self.generator.validate_dpp(dpp)
+            if not validation['valid']:
+                return {'success': False, 'error': 'DPP doğrulama başarısız',
+                        'validation': validation}
+            return {
+                'success': True,
+                'dpp': dpp,
+                'validation': validation,
+                'nft_metadata': self.nft_integration.prepare_nft_metadata(dpp),
+                'receipt': self.anchor_service.make_receipt(dpp)
+            }
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
+    def _process_chunk(self, chunk: List[Any]) -> List[Dict[str, Any]]:
+        built = [self._build(item) for item in chunk]
+        ready = [item for item in built if item['success']]
+
+        if ready and not self.dpp_storage.save_dpps([item['dpp'] for item in ready]):
+            for item in ready:
+                item.update(success=False, error='DPP kaydedilemedi')
+            ready = []
+
+        # Makbuz yazılamasa da kuyruk işi makbuzu sabitleme sırasında yeniden üretir
+        if ready:
+            self.blockchain_storage.save_blockchain_records([item['receipt'] for item in ready])
+            self.registration_queue.enqueue_many([item['dpp']['dpp_id'] for item in ready])
+
+        results = []
+        for item in built:
+            if item['success']:
+                dpp = item['dpp']
+                results.append({
+                    'success': True,
+                    'dpp_id': dpp['dpp_id'],
+                    'product_hash': dpp['product_hash'],
+                    'validation': item['validation'],
+                    'nft_metadata': item['nft_metadata'],
+                    'blockchain': {
+                        'status': 'pending',
+                        'metadata_hash': item['receipt']['metadata_hash']
+                    }
+                })
+            else:
+                results.append({key: item[key] for key in ('success', 'error', 'validation') if key in item})
+        return results
+
+    def process(self, style_cards: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stil kartlarını işler ve her kalemin sonucunu giriş sırasıyla döndürür
+
+        Args:
+            style_cards: Stil kartları (iter_ndjson'dan gelen hata nesneleri dahil)
+
+        Yields:
+            index alanı eklenmiş kalem sonucu
+        """
+        cards = iter(style_cards)
+        index = 0
+        while True:
+            chunk = list(islice(cards, self.chunk_size))
+            if not chunk:
+                return
+            for result in self._process_chunk(chunk):
+                result['index'] = index
+                index += 1
+                yield result
+
+def benchmark_bulk(count: int = 2000) -> Dict[str, float]:
+    """
+    Tekil /api/create-dpp yolunu (kalem başına kayıt, makbuz ve kuyruk
+    commit'i) toplu oluşturmayla (parça başına paket dosyası) karşılaştırır
+
+    Returns:
+        Her iki yol için DPP/saniye ve hızlanma oranı
+    """
+    import tempfile
+
+    from blockchain_integration import BlockchainDPPIntegration, DPPBlockchainStorage
+    from dpp_nft import DPPGenerator, DPPStorage, NFTIntegration
+    from merkle_anchor import MerkleAnchorService
+    from registration_queue import RegistrationQueue
+
+    cards = [{
+        'product_name': f'Benchmark Ürün {i}',
+        'product_type': ['T-shirt', 'Denim', 'Sweatshirt'][i % 3],
+        'total_co2': round(3 + (i % 70) / 10, 2),
+        'sustainability_score': i % 100,
+        'fiber_composition': [{'fiber': 'Organic Cotton', 'percentage': 95},
+                              {'fiber': 'Elastane', 'percentage': 5}],
+        'weight': 150 + i % 50,
+        'processes': ['Dyeing', 'Finishing']
+    } for i in range(count)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in ('single', 'bulk'):
+            root = os.path.join(tmp_dir, name)
+            generator, nft = DPPGenerator(), NFTIntegration()
+            dpp_storage = DPPStorage(os.path.join(root, 'dpp'))
+            blockchain_storage = DPPBlockchainStorage(os.path.join(root, 'blockchain'))
+            anchor_service = MerkleAnchorService(
+                BlockchainDPPIntegration(storage=blockchain_storage), blockchain_storage)
+            queue = RegistrationQueue(os.path.join(root, 'queue.db'))
+
+            started = time.perf_counter()
+            if name == 'single':
+                for card in cards:
+                    dpp = generator.create_dpp(card)
+                    generator.validate_dpp(dpp)
+                    dpp_storage.save_dpp(dpp)
+                    nft.prepare_nft_metadata(dpp)
+                    receipt = anchor_service.make_receipt(dpp)
+                    blockchain_storage.save_blockchain_record(dpp['dpp_id'], receipt)
+                    queue.enqueue(dpp['dpp_id'])
+            else:
+                creator = BulkDPPCreator(generator, nft, dpp_storage, blockchain_storage,
+                                         anchor_service, queue)
+                for _ in creator.process(cards):
+                    pass
+            results[f'{name}_per_second'] = round(count / (time.perf_counter() - started), 1)
+
+    results['speedup'] = round(results['bulk_per_second'] / results['single_per_second'], 2)
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design toplu DPP araçları")
+    parser.add_argument('--benchmark', type=int, metavar='COUNT', default=2000,
+                        help='COUNT stil kartı ile tekil ve toplu oluşturmayı karşılaştır')
+    args = parser.parse_args()
+
+    result = benchmark_bulk(args.benchmark)
+    print(f"📊 Tekil: {result['single_per_second']:,} DPP/s  "
+          f"Toplu: {result['bulk_per_second']:,} DPP/s  ({result['speedup']}x)")
@@ -5,11 +5,33 @@ Zero@Design projesi - Faz 4 hazırlık
 
 import json
 import hashlib
+import os
+import base64
+import sqlite3
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
 import requests
 
+from database_manager import ConnectionPool
+from sharded_storage import PackedJSONStore, ShardedJSONStore, content_digest, file_signature
+
+# Katalogda sıralanabilir kolonlar
+CATALOG_SORT_COLUMNS = ('created_at', 'product_name', 'category', 'co2_footprint', 'sustainability_score')
+
+# İçerik adresli modda nesneden ayrı, referans dosyasında tutulan alanlar
+DPP_INSTANCE_FIELDS = ('dpp_id', 'created_at')
+
+# Bellekte tutulan en fazla ayrıştırılmış DPP sayısı
+DPP_CACHE_SIZE = 1024
+
+# Katalog sayfa boyutu sınırları
+CATALOG_DEFAULT_PAGE_SIZE = 50
+CATALOG_MAX_PAGE_SIZE = 500
+
 class DPPGenerator:
     """Digital Product Passport oluşturucu"""
     
@@ -212,45 +234,448 @@ class NFTIntegration:
             "sustainabilityScore": metadata['attributes'][2]['value']
         }
 
+class DPPCatalog:
+    """
+    DPP katalog indeksi
+
+    Listeleme için gereken özet alanları (ad, kategori, CO2, skor, tarih)
+    SQLite tablosunda tutar. Kayıt save_dpp ile birlikte güncellenir; liste
+    sorguları JSON dosyalarını açmadan tek bir indeksli sorguyla yapılır.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Katalog veritabanı dosya yolu
+        """
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path)
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = self.pool.acquire()
+        if not self._ready:
+            self._create_table(conn)
+            self._ready = True
+        return conn
+
+    def _create_table(self, conn: sqlite3.Connection):
+        """Katalog tablosunu ve sıralama indekslerini oluşturur"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS dpp_catalog (
+                dpp_id TEXT PRIMARY KEY,
+                product_name TEXT NOT NULL DEFAULT '',
+                category TEXT NOT NULL DEFAULT '',
+                co2_footprint REAL NOT NULL DEFAULT 0,
+                sustainability_score REAL NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL DEFAULT '',
+                product_hash TEXT
+            )
+        ''')
+        for column in CATALOG_SORT_COLUMNS:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_dpp_catalog_{column} "
+                         f"ON dpp_catalog ({column}, dpp_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_dpp_catalog_category_created "
+                     "ON dpp_catalog (category, created_at, dpp_id)")
+        conn.commit()
+
+    def _number(self, value: Any) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _entry(self, dpp: Dict[str, Any]) -> tuple:
+        """DPP'den katalog satırı üretir"""
+        product_info = dpp.get('product_info', {})
+        sustainability = dpp.get('sustainability', {})
+        return (
+            dpp['dpp_id'],
+            product_info.get('name') or '',
+            product_info.get('category') or '',
+            self._number(sustainability.get('co2_footprint', {}).get('total_kg')),
+            self._number(sustainability.get('sustainability_score')),
+            dpp.get('created_at') or '',
+            dpp.get('product_hash')
+        )
+
+    def _upsert(self, conn: sqlite3.Connection, entries: List[tuple]):
+        conn.executemany('''
+            INSERT OR REPLACE INTO dpp_catalog
+            (dpp_id, product_name, category, co2_footprint, sustainability_score, created_at, product_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', entries)
+
+    def upsert(self, dpp: Dict[str, Any]):
+        """DPP'nin katalog kaydını ekler veya günceller"""
+        self.upsert_many([dpp])
+    
+    def upsert_many(self, dpps: List[Dict[str, Any]]):
+        """DPP'lerin katalog kayıtlarını tek transaction'da ekler veya günceller"""
+        conn = self._connection()
+        try:
+            self._upsert(conn, [self._entry(dpp) for dpp in dpps])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def remove(self, dpp_id: str):
+        """DPP'nin katalog kaydını siler"""
+        conn = self._connection()
+        conn.execute("DELETE FROM dpp_catalog WHERE dpp_id = ?", (dpp_id,))
+        conn.commit()
+
+    def is_empty(self) -> bool:
+        return self._connection().execute("SELECT 1 FROM dpp_catalog LIMIT 1").fetchone() is None
+
+    def _encode_cursor(self, sort_value: Any, dpp_id: str) -> str:
+        raw = json.dumps([sort_value, dpp_id], ensure_ascii=False).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def _decode_cursor(self, cursor: str) -> Tuple[Any, str]:
+        try:
+            sort_value, dpp_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return sort_value, dpp_id
+        except (ValueError, TypeError):
+            raise ValueError(f"Geçersiz sayfa imleci: {cursor}")
+
+    def list_entries(self, sort: str = 'created_at', order: str = 'desc',
+                     category: Optional[str] = None,
+                     min_score: Optional[float] = None, max_score: Optional[float] = None,
+                     min_co2: Optional[float] = None, max_co2: Optional[float] = None,
+                     cursor: Optional[str] = None,
+                     limit: int = CATALOG_DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Katalogu sıralı, filtreli ve keyset sayfalı listeler
+
+        Args:
+            sort: Sıralama kolonu (CATALOG_SORT_COLUMNS)
+            order: 'asc' veya 'desc'
+            category: Kategori filtresi (tam eşleşme)
+            min_score / max_score: Sürdürülebilirlik skoru aralığı
+            min_co2 / max_co2: CO2 ayak izi aralığı (kg)
+            cursor: Önceki sayfanın next_cursor değeri
+            limit: Sayfa boyutu (en fazla CATALOG_MAX_PAGE_SIZE)
+
+        Returns:
+            dpps listesi ve sonraki sayfa için next_cursor (son sayfada None)
+        """
+        if sort not in CATALOG_SORT_COLUMNS:
+            raise ValueError(f"Geçersiz sıralama kolonu: {sort} ({', '.join(CATALOG_SORT_COLUMNS)})")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Geçersiz sıralama yönü: {order}")
+        limit = min(max(int(limit), 1), CATALOG_MAX_PAGE_SIZE)
+
+        query = "SELECT * FROM dpp_catalog WHERE 1=1"
+        params: List[Any] = []
+        for clause, value in (("category = ?", category),
+                              ("sustainability_score >= ?", min_score),
+                              ("sustainability_score <= ?", max_score),
+                              ("co2_footprint >= ?", min_co2),
+                              ("co2_footprint <= ?", max_co2)):
+            if value is not None and value != '':
+                query += f" AND {clause}"
+                params.append(value)
+
+        if cursor:
+            # (sıralama değeri, dpp_id) çifti üzerinden keyset sayfalama
+            query += f" AND ({sort}, dpp_id) {'<' if order == 'desc' else '>'} (?, ?)"
+            params.extend(self._decode_cursor(cursor))
+
+        query += f" ORDER BY {sort} {order.upper()}, dpp_id {order.upper()} LIMIT ?"
+        params.append(limit + 1)
+
+        rows = [dict(row) for row in self._connection().execute(query, params).fetchall()]
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = self._encode_cursor(page[-1][sort], page[-1]['dpp_id'])
+        return {'dpps': page, 'next_cursor': next_cursor}
+
+    def rebuild(self, dpps: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, int]:
+        """
+        Katalogu verilen DPP'lerden yeniden oluşturur
+
+        Args:
+            dpps: Diskteki DPP'ler (okunamayanlar için None)
+
+        Returns:
+            indexed (indekslenen) ve skipped (okunamayan) kayıt sayıları
+        """
+        entries = []
+        skipped = 0
+        for dpp in dpps:
+            try:
+                entries.append(self._entry(dpp))
+            except (KeyError, AttributeError, TypeError) as e:
+                print(f"⚠️ DPP kataloğa eklenemedi: {e}")
+                skipped += 1
+
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM dpp_catalog")
+            self._upsert(conn, entries)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return {'indexed': len(entries), 'skipped': skipped}
+
 class DPPStorage:
-    """DPP depolama ve erişim yönetimi"""
+    """
+    DPP depolama ve erişim yönetimi
+    
+    Dosyalar hash önekli alt klasörlerde (<önek>/<dpp_id>.json) atomik
+    olarak yazılır. content_addressed=True ile pasaport içeriği
+    objects/<önek>/<product_hash>_<özet>.json nesnesinde bir kez saklanır;
+    her DPP için refs/<önek>/<dpp_id>.json yalnızca kimlik alanlarını ve
+    nesne anahtarını tutar. Aynı içerikli pasaportlar tek nesneyi paylaşır.
+    save_dpps ile toplu kaydedilen DPP'ler parça başına tek paket dosyasında
+    (packs/<paket>.json) tutulur (bkz. PackedJSONStore).
+    
+    Yüklenen DPP'ler sınırlı bir LRU önbellekte tutulur. Önbellekteki kayıt
+    dosya imzası (inode, mtime, boyut) değişmedikçe kullanılır; böylece başka
+    bir worker'ın kaydettiği DPP de bir sonraki okumada yeniden yüklenir.
+    """
     
-    def __init__(self, storage_path: str = "data/dpp"):
+    def __init__(self, storage_path: str = "data/dpp", catalog_path: Optional[str] = None,
+                 content_addressed: bool = False, compact: bool = False,
+                 cache_size: int = DPP_CACHE_SIZE):
+        """
+        Args:
+            storage_path: DPP klasörü
+            catalog_path: Katalog veritabanı (varsayılan: <storage_path>/catalog.db)
+            content_addressed: product_hash tabanlı içerik adresli düzen
+            compact: Dosyaları girintisiz (minified) JSON olarak yaz; okuma
+                     her iki biçimi de destekler
+            cache_size: Önbellekte tutulacak en fazla DPP sayısı (0: kapalı)
+        """
         self.storage_path = storage_path
-        import os
-        if not os.path.exists(storage_path):
-            os.makedirs(storage_path)
+        self.content_addressed = content_addressed
+        indent = None if compact else 2
+        os.makedirs(storage_path, exist_ok=True)
+        self.files = PackedJSONStore(storage_path, indent=indent)
+        self.refs = ShardedJSONStore(os.path.join(storage_path, 'refs'), indent=None)
+        self.objects = ShardedJSONStore(os.path.join(storage_path, 'objects'), indent=indent)
+        
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Tuple[str, Tuple[int, int, int], Dict[str, Any]]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0, 'stale': 0}
+        
+        # Katalog ilk kez oluşturuluyorsa mevcut dosyalardan doldurulur
+        self.catalog = DPPCatalog(catalog_path or os.path.join(storage_path, 'catalog.db'))
+        if self.catalog.is_empty() and self.list_dpps():
+            self.rebuild_catalog()
+    
+    def _object_key(self, dpp: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """İçerik adresli nesne anahtarı ve kimlik alanları çıkarılmış içerik"""
+        body = {key: value for key, value in dpp.items() if key not in DPP_INSTANCE_FIELDS}
+        return f"{dpp.get('product_hash', 'nohash')}_{content_digest(body)}", body
+    
+    def _write(self, dpp: Dict[str, Any]):
+        if not self.content_addressed:
+            self.files.write(dpp['dpp_id'], dpp)
+            return
+        
+        object_key, body = self._object_key(dpp)
+        if not self.objects.exists(object_key):
+            self.objects.write(object_key, body)
+        ref = {field: dpp.get(field) for field in DPP_INSTANCE_FIELDS}
+        ref.update(product_hash=dpp.get('product_hash'), object=object_key)
+        self.refs.write(dpp['dpp_id'], ref)
     
     def save_dpp(self, dpp: Dict[str, Any]) -> bool:
-        """DPP'yi dosyaya kaydet"""
+        """DPP'yi dosyaya kaydet ve katalog kaydını güncelle"""
         try:
-            file_path = f"{self.storage_path}/{dpp['dpp_id']}.json"
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(dpp, f, ensure_ascii=False, indent=2)
+            self._write(dpp)
+            self._invalidate(dpp['dpp_id'])
+            self.catalog.upsert(dpp)
             return True
         except Exception as e:
             print(f"DPP kaydetme hatası: {e}")
             return False
     
+    def save_dpps(self, dpps: List[Dict[str, Any]]) -> bool:
+        """
+        DPP'leri toplu kaydeder
+        
+        DPP'ler tek bir boşluksuz paket dosyasına yazılıp bir kez fsync
+        edilir (PackedJSONStore.write_pack); katalog kayıtları tek
+        transaction'da güncellenir. İçerik adresli düzende her DPP ayrı
+        yazılır.
+        
+        Args:
+            dpps: Kaydedilecek DPP'ler
+            
+        Returns:
+            Tümü kaydedildiyse True
+        """
+        try:
+            if self.content_addressed:
+                for dpp in dpps:
+                    self._write(dpp)
+            else:
+                self.files.write_pack([(dpp['dpp_id'], dpp) for dpp in dpps])
+            for dpp in dpps:
+                self._invalidate(dpp['dpp_id'])
+            self.catalog.upsert_many(dpps)
+            return True
+        except Exception as e:
+            print(f"DPP toplu kaydetme hatası: {e}")
+            return False
+    
+    def _read_ref(self, dpp_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], Any]:
+        ref, path, signature = self.refs.read_with_stat(dpp_id)
+        if ref is None:
+            return None, None, None
+        # Nesneler değişmez; güncellik referans dosyasının imzasıyla izlenir
+        body = self.objects.read(ref['object'])
+        if body is None:
+            raise FileNotFoundError(f"DPP nesnesi bulunamadı: {ref['object']}")
+        dpp = {field: ref.get(field) for field in DPP_INSTANCE_FIELDS}
+        dpp.update(body)
+        return dpp, path, signature
+    
+    def _read(self, dpp_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], Any]:
+        """DPP'yi diskten okur: (dpp, dosya yolu, dosya imzası)"""
+        # Önce etkin düzene, sonra diğer düzene bak (taşıma öncesi kayıtlar)
+        readers = (self._read_ref, self.files.read_with_stat)
+        if not self.content_addressed:
+            readers = readers[::-1]
+        for reader in readers:
+            result = reader(dpp_id)
+            if result[0] is not None:
+                return result
+        return None, None, None
+    
+    def _cached(self, dpp_id: str) -> Optional[Dict[str, Any]]:
+        """Dosya imzası değişmediyse önbellekteki DPP'yi döndürür"""
+        with self._cache_lock:
+            entry = self._cache.get(dpp_id)
+        if entry is None:
+            return None
+        
+        path, signature, dpp = entry
+        try:
+            current = file_signature(path)
+        except OSError:
+            current = None
+        # Paketler değişmez; DPP sonradan tekil dosyaya veya başka pakete yazılmış olabilir
+        if current == signature and self.files.is_pack_path(path) \
+                and not self.files.in_pack(dpp_id, path):
+            current = None
+        
+        with self._cache_lock:
+            if current != signature:
+                self.cache_stats['stale'] += 1
+                self._cache.pop(dpp_id, None)
+                return None
+            if dpp_id in self._cache:
+                self._cache.move_to_end(dpp_id)
+            self.cache_stats['hits'] += 1
+        return dpp
+    
+    def _invalidate(self, dpp_id: str):
+        with self._cache_lock:
+            self._cache.pop(dpp_id, None)
+    
     def load_dpp(self, dpp_id: str) -> Optional[Dict[str, Any]]:
-        """DPP'yi yükle"""
+        """
+        DPP'yi yükle (önbellekli)
+        
+        Dönen sözlük önbellekle paylaşılır; değiştirilecekse kopyalanmalıdır.
+        """
+        if self.cache_size:
+            dpp = self._cached(dpp_id)
+            if dpp is not None:
+                return dpp
+        
         try:
-            file_path = f"{self.storage_path}/{dpp_id}.json"
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            dpp, path, signature = self._read(dpp_id)
         except Exception as e:
             print(f"DPP yükleme hatası: {e}")
             return None
+        if dpp is None:
+            print(f"DPP yükleme hatası: {dpp_id} bulunamadı")
+            return None
+        
+        if self.cache_size:
+            with self._cache_lock:
+                self.cache_stats['misses'] += 1
+                self._cache[dpp_id] = (path, signature, dpp)
+                self._cache.move_to_end(dpp_id)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return dpp
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """DPP önbellek istatistiklerini döndürür"""
+        with self._cache_lock:
+            stats = dict(self.cache_stats, size=len(self._cache), max_size=self.cache_size)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
     
     def list_dpps(self) -> List[str]:
         """Tüm DPP ID'lerini listele"""
-        import os
         try:
-            files = os.listdir(self.storage_path)
-            return [f.replace('.json', '') for f in files if f.endswith('.json')]
+            return list(dict.fromkeys(self._iter_ids()))
         except Exception as e:
             print(f"DPP listeleme hatası: {e}")
             return []
+    
+    def _iter_ids(self) -> Iterator[str]:
+        yield from self.files.iter_keys()
+        yield from self.refs.iter_keys()
+    
+    def list_catalog(self, **kwargs) -> Dict[str, Any]:
+        """Katalogdan sıralı/filtreli DPP özetlerini getir (bkz. DPPCatalog.list_entries)"""
+        return self.catalog.list_entries(**kwargs)
+    
+    def rebuild_catalog(self) -> Dict[str, int]:
+        """Katalogu diskteki DPP dosyalarından yeniden oluştur"""
+        result = self.catalog.rebuild(self.load_dpp(dpp_id) for dpp_id in self.list_dpps())
+        print(f"✅ DPP kataloğu yeniden oluşturuldu: {result['indexed']} kayıt, "
+              f"{result['skipped']} atlandı")
+        return result
+    
+    def migrate_layout(self) -> Dict[str, int]:
+        """
+        Mevcut DPP dosyalarını etkin düzene taşır
+        
+        Düz klasördeki eski dosyalar önek klasörlerine taşınır. Mod
+        değiştiyse diğer düzendeki kayıtlar etkin düzende yeniden yazılıp
+        eski kopyaları silinir (paylaşılan nesneler objects/ altında kalır).
+        
+        Returns:
+            migrated ve failed kayıt sayıları
+        """
+        if self.content_addressed:
+            pending = list(self.files.iter_keys())
+            read, remove = self.files.read, self.files.delete
+            migrated = 0
+        else:
+            moved = self.files.migrate_flat()
+            pending = list(self.refs.iter_keys())
+            read, remove = (lambda dpp_id: self._read_ref(dpp_id)[0]), self.refs.delete
+            migrated = moved['moved'] + moved['skipped']
+        
+        failed = 0
+        for dpp_id in pending:
+            try:
+                self._write(read(dpp_id))
+                remove(dpp_id)
+                self._invalidate(dpp_id)
+                migrated += 1
+            except Exception as e:
+                print(f"⚠️ DPP taşınamadı ({dpp_id}): {e}")
+                failed += 1
+        
+        print(f"✅ DPP düzeni taşındı: {migrated} kayıt, {failed} hata")
+        return {'migrated': migrated, 'failed': failed}
 
 # Kullanım örneği ve test fonksiyonları
 def create_sample_dpp():
@@ -294,8 +719,98 @@ def create_sample_dpp():
     
     return dpp, nft_metadata
 
+def benchmark_load(count: int = 1000, lookups: int = 5000, seed: int = 42) -> Dict[str, Dict[str, float]]:
+    """
+    Girintili JSON, minified JSON ve LRU önbellekli okumada DPP yükleme
+    gecikmesini (p50/p99) karşılaştırır
+    
+    Args:
+        count: Oluşturulacak DPP sayısı
+        lookups: Ölçülecek rastgele load_dpp çağrısı sayısı
+        seed: Rastgele erişim sırası için tohum
+        
+    Returns:
+        Yöntem bazında p50/p99 (mikrosaniye) ve ortalama dosya boyutu (bayt)
+    """
+    import random
+    import tempfile
+    
+    generator = DPPGenerator()
+    dpps = [generator.create_dpp({
+        'product_name': f'Benchmark Ürün {i}',
+        'product_type': ['T-shirt', 'Denim', 'Sweatshirt'][i % 3],
+        'total_co2': round(3 + (i % 70) / 10, 2),
+        'co2_breakdown': {'materials': 5.2, 'production': 2.1, 'transportation': 1.2},
+        'sustainability_score': i % 100,
+        'fiber_composition': [{'fiber': 'Organic Cotton', 'percentage': 95},
+                              {'fiber': 'Elastane', 'percentage': 5}],
+        'weight': 150 + i % 50,
+        'processes': ['Dyeing', 'Finishing'],
+        'certifications': ['GOTS', 'OEKO-TEX']
+    }) for i in range(count)]
+    
+    rng = random.Random(seed)
+    order = [dpps[rng.randrange(count)]['dpp_id'] for _ in range(lookups)]
+    variants = {
+        'indented': {'compact': False, 'cache_size': 0},
+        'compact': {'compact': True, 'cache_size': 0},
+        'cached': {'compact': False, 'cache_size': count}
+    }
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, options in variants.items():
+            storage = DPPStorage(os.path.join(tmp_dir, name), **options)
+            for dpp in dpps:
+                storage.save_dpp(dpp)
+            file_size = sum(os.path.getsize(storage.files.path_for(dpp['dpp_id'])) for dpp in dpps) / count
+            
+            # Isınma: işletim sistemi sayfa önbelleği ve LRU dolu ölçülür
+            for dpp in dpps:
+                storage.load_dpp(dpp['dpp_id'])
+            
+            latencies = []
+            for dpp_id in order:
+                started = time.perf_counter()
+                storage.load_dpp(dpp_id)
+                latencies.append((time.perf_counter() - started) * 1e6)
+            latencies.sort()
+            results[name] = {
+                'p50_us': round(latencies[len(latencies) // 2], 1),
+                'p99_us': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 1),
+                'avg_file_bytes': round(file_size)
+            }
+            storage.catalog.pool.close_all()
+    
+    return results
+
 if __name__ == "__main__":
-    # Test
-    dpp, nft_metadata = create_sample_dpp()
-    print("DPP oluşturuldu:", dpp['dpp_id'])
-    print("NFT metadata hazırlandı")
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Zero@Design DPP araçları")
+    parser.add_argument('--storage', default='data/dpp', help='DPP klasörü')
+    parser.add_argument('--rebuild-catalog', action='store_true',
+                        help='DPP kataloğunu diskteki dosyalardan yeniden oluştur')
+    parser.add_argument('--migrate-layout', action='store_true',
+                        help='Düz klasördeki DPP dosyalarını parçalı düzene taşı')
+    parser.add_argument('--content-addressed', action='store_true',
+                        help='İçerik adresli (product_hash) düzeni kullan')
+    parser.add_argument('--benchmark-load', type=int, metavar='COUNT',
+                        help='COUNT DPP ile yükleme gecikmesini (p50/p99) ölç')
+    args = parser.parse_args()
+    
+    if args.benchmark_load:
+        for name, result in benchmark_load(args.benchmark_load).items():
+            print(f"📊 {name:9s} p50 {result['p50_us']:8.1f} µs  p99 {result['p99_us']:8.1f} µs  "
+                  f"dosya {result['avg_file_bytes']:,} B")
+    elif args.migrate_layout or args.rebuild_catalog:
+        storage = DPPStorage(args.storage, content_addressed=args.content_addressed)
+        if args.migrate_layout:
+            storage.migrate_layout()
+        if args.rebuild_catalog:
+            storage.rebuild_catalog()
+    else:
+        # Test
+        dpp, nft_metadata = create_sample_dpp()
+        print("DPP oluşturuldu:", dpp['dpp_id'])
+        print("NFT metadata hazırlandı")
\ No newline at end of file
@@ -0,0 +1,417 @@
+"""
+Zero@Design - Emisyon Faktörü Kütüphanesi
+product_fabric_co2 kompozisyon faktörlerini ve master_konfeksiyon işlem
+faktörlerini dizi tabanlı, O(1) sorgulanan bir kütüphaneye yükler
+"""
+
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from query_cache import QueryCache
+from search_index import normalize_tr
+
+# Ajanın CO₂ tablosu 200 g referans ürün içindir (kg CO₂ / referans ürün)
+REFERENCE_WEIGHT = 200
+
+# Bu L1 uzaklığına (yüzde puanı) kadar en yakın kompozisyonun faktörü kullanılır
+NEAREST_MAX_DISTANCE = 20.0
+
+# Bellekte tutulan en fazla kompozisyon sorgusu sonucu (LRU)
+MEMO_SIZE = 65536
+
+# Toplu sorguda tek seferde uzaklığı hesaplanan kompozisyon sayısı
+# (kompozisyon x kütüphane x lif uzaklık dizisinin bellek sınırı)
+BATCH_SIZE = 2048
+
+# Veritabanı ve form lif adları → ajanın lif adları
+FIBER_ALIASES = {
+    'viskon': 'Viskoz',
+    'viscose': 'Viskoz',
+    'cotton': 'Pamuk',
+    'organic cotton': 'Organik Pamuk',
+    'recycled pamuk': 'Geri Dönüştürülmüş Pamuk',
+    'recycled cotton': 'Geri Dönüştürülmüş Pamuk',
+    'recycled polyester': 'Geri Dönüştürülmüş Polyester',
+    'elastane': 'Elastan',
+    'spandex': 'Elastan',
+    'lycra': 'Elastan',
+    'nylon': 'Naylon',
+    'poliamid': 'Naylon',
+    'wool': 'Yün',
+    'linen': 'Keten',
+    'hemp': 'Kenevir',
+    'bamboo': 'Bambu'
+}
+
+# "%95 Pamuk" ve "95% Pamuk" biçimleri; ayraç "/", "," veya "+"
+COMPOSITION_PART_RE = re.compile(
+    r'%\s*(\d+(?:[.,]\d+)?)\s*([^/,+%\d]+)|(\d+(?:[.,]\d+)?)\s*%\s*([^/,+%\d]+)'
+)
+
+CompositionKey = Tuple[Tuple[str, float], ...]
+
+def canonical_fiber(name: Any, known: Iterable[str] = ()) -> str:
+    """
+    Lif adını ajanın lif adına eşler ("Viskon" → "Viskoz", "cotton" → "Pamuk")
+
+    Args:
+        name: Lif adı
+        known: Büyük/küçük harf ve Türkçe karakterden bağımsız eşlenecek adlar
+    """
+    text = str(name).strip()
+    normalized = normalize_tr(text)
+    if normalized in FIBER_ALIASES:
+        return FIBER_ALIASES[normalized]
+    for fiber in known:
+        if normalize_tr(fiber) == normalized:
+            return fiber
+    return text
+
+def parse_composition(text: str, known: Iterable[str] = ()) -> Dict[str, float]:
+    """
+    Kompozisyon metnini lif → yüzde sözlüğüne çevirir
+
+    "%95 Pamuk / %5 Elastan" ve "98% Pamuk, 2% Elastan" desteklenir; aynı lif
+    birden fazla geçerse yüzdeler toplanır.
+    """
+    known = tuple(known)
+    fibers: Dict[str, float] = {}
+    for prefix_pct, prefix_name, suffix_pct, suffix_name in COMPOSITION_PART_RE.findall(text or ''):
+        percentage = float((prefix_pct or suffix_pct).replace(',', '.'))
+        fiber = canonical_fiber(prefix_name or suffix_name, known)
+        if fiber and percentage:
+            fibers[fiber] = fibers.get(fiber, 0.0) + percentage
+    return fibers
+
+def composition_key(fibers: Dict[str, float]) -> Tuple[CompositionKey, float]:
+    """
+    Yüzdeleri 100'e normalize edilmiş sıralı kompozisyon anahtarı
+
+    Returns:
+        (anahtar, toplam yüzde)
+    """
+    total = sum(fibers.values())
+    if total <= 0:
+        return (), 0.0
+    key = tuple(sorted((fiber, round(percentage * 100 / total, 2))
+                       for fiber, percentage in fibers.items() if percentage))
+    return key, total
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """Python round(x, 2) ile aynı sonucu veren vektörel yuvarlama"""
+    # np.round(x, 2) x*100'ü yuvarlar; ...x5 sınırındaki değerler Python'a bırakılır
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    boundary = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if boundary.any():
+        rounded[boundary] = [round(float(v), 2) for v in values[boundary]]
+    return rounded
+
+class EmissionFactorLibrary:
+    """
+    Kompozisyon düzeyinde kumaş emisyon faktörleri (kg CO₂e / kg kumaş)
+
+    Veritabanındaki kompozisyonlar bir kez ayrıştırılıp (kompozisyon x lif)
+    yüzde matrisine yerleştirilir. Sorgu sırası:
+      1. Kanonik anahtarla tam eşleşme (sözlük, O(1))
+      2. NEAREST_MAX_DISTANCE içindeki en yakın kompozisyon (L1, tek matris
+         işlemi) ve lif farkı için doğrusal düzeltme
+      3. Doğrusal model: kompozisyon faktörlerinden en küçük kareler ile
+         çıkarılan lif faktörleri; veride olmayan lifler için ajanın tablosu
+         verilerle kalibre edilerek kullanılır
+    Sonuçlar kompozisyon anahtarıyla sınırlı bir LRU önbellekte (QueryCache)
+    saklanır; tekrarlanan sorgular O(1)'dir. Koleksiyon hesapları için
+    reference_co2_many aynı sırayı tüm kompozisyonlara dizi işlemleriyle
+    uygular.
+    """
+
+    def __init__(self, compositions: Sequence[Tuple[str, float]],
+                 fallback_fiber_co2: Optional[Dict[str, float]] = None,
+                 process_factors: Optional[Dict[str, Dict[str, Any]]] = None,
+                 nearest_max_distance: float = NEAREST_MAX_DISTANCE):
+        """
+        Args:
+            compositions: (kompozisyon metni, kg CO₂e / kg) listesi
+            fallback_fiber_co2: Ajanın lif tablosu (kg CO₂ / 200 g referans ürün)
+            process_factors: normalize işlem adı → master_konfeksiyon faktörü
+            nearest_max_distance: En yakın eşleşme için en büyük L1 uzaklığı
+        """
+        self.fallback_fiber_co2 = dict(fallback_fiber_co2 or {})
+        self.process_factors = dict(process_factors or {})
+        self.nearest_max_distance = nearest_max_distance
+        self.stats = {'exact': 0, 'nearest': 0, 'linear': 0}
+        self._memo = QueryCache(max_entries=MEMO_SIZE, ttl=None)
+
+        # Aynı kompozisyonun (farklı ürünlerdeki) faktörlerinin ortalaması
+        grouped: Dict[CompositionKey, List[float]] = {}
+        self.texts: Dict[CompositionKey, str] = {}
+        for text, factor in compositions:
+            key, _ = composition_key(parse_composition(text, self.fallback_fiber_co2))
+            if key and factor is not None:
+                grouped.setdefault(key, []).append(float(factor))
+                self.texts.setdefault(key, text)
+
+        self.keys: List[CompositionKey] = list(grouped)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.factors = np.array([np.mean(grouped[key]) for key in self.keys], dtype=np.float64)
+        self.fibers: List[str] = sorted({fiber for key in self.keys for fiber, _ in key})
+        self.fiber_index = {fiber: i for i, fiber in enumerate(self.fibers)}
+        self.matrix = np.zeros((len(self.keys), len(self.fibers)), dtype=np.float64)
+        for row, key in enumerate(self.keys):
+            for fiber, percentage in key:
+                self.matrix[row, self.fiber_index[fiber]] = percentage
+
+        self.fiber_factors = self._fit_fiber_factors()
+        self.key_linear = np.array([self._linear_factor(key) for key in self.keys], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _fit_fiber_factors(self) -> Dict[str, float]:
+        """Lif faktörleri: kompozisyon faktörlerine en küçük kareler, gerisi kalibre tablo"""
+        fitted: Dict[str, float] = {}
+        if len(self.keys):
+            solution, *_ = np.linalg.lstsq(self.matrix / 100, self.factors, rcond=None)
+            fitted = {fiber: float(value) for fiber, value in zip(self.fibers, solution) if value > 0}
+
+        # Ajan tablosu referans ürün başınadır; kg/kg'a çevirip verilerle ölçeklenir
+        per_kg = {fiber: value * 1000 / REFERENCE_WEIGHT for fiber, value in self.fallback_fiber_co2.items()}
+        ratios = [fitted[fiber] / per_kg[fiber] for fiber in fitted if per_kg.get(fiber)]
+        # Pozitif oranların medyanı; reference_co2 bu ölçekle tabloya döner
+        self.calibration = float(np.median(ratios)) if ratios else 1.0
+
+        factors = {fiber: value * self.calibration for fiber, value in per_kg.items()}
+        factors.update(fitted)
+        return factors
+
+    def fiber_factor(self, fiber: str) -> float:
+        """Doğrusal modeldeki lif faktörü (kg CO₂e / kg); bilinmeyen lif için kalibre varsayılan"""
+        factor = self.fiber_factors.get(fiber)
+        if factor is None:
+            factor = 5.0 * 1000 / REFERENCE_WEIGHT * self.calibration
+        return factor
+
+    def _linear_factor(self, key: CompositionKey) -> float:
+        return sum(self.fiber_factor(fiber) * percentage / 100 for fiber, percentage in key)
+
+    def _resolve(self, key: CompositionKey) -> Tuple[float, str]:
+        row = self.index.get(key)
+        if row is not None:
+            return float(self.factors[row]), 'exact'
+
+        if len(self.keys):
+            vector = np.zeros(len(self.fibers))
+            unknown = 0.0
+            for fiber, percentage in key:
+                column = self.fiber_index.get(fiber)
+                if column is None:
+                    unknown += percentage
+                else:
+                    vector[column] = percentage
+            distances = np.abs(self.matrix - vector).sum(axis=1) + unknown
+            nearest = int(distances.argmin())
+            if distances[nearest] <= self.nearest_max_distance:
+                # Lif farkı doğrusal modelle düzeltilir
+                correction = self._linear_factor(key) - self._linear_factor(self.keys[nearest])
+                return float(self.factors[nearest]) + correction, 'nearest'
+
+        return self._linear_factor(key), 'linear'
+
+    def _resolve_counted(self, key: CompositionKey) -> Tuple[float, str]:
+        resolved = self._resolve(key)
+        self.stats[resolved[1]] += 1
+        return resolved
+
+    def lookup(self, fibers: Dict[str, float], memoize: bool = True) -> Dict[str, Any]:
+        """
+        Lif → yüzde sözlüğü için faktör ve eşleşme türü
+
+        Args:
+            fibers: Lif → yüzde
+            memoize: False ise önbellek ve eşleşme istatistikleri atlanır
+                (tek seferlik sorgular, ör. duyarlılık analizinin sonlu fark
+                noktaları önbellekteki gerçek kompozisyonları çıkarmasın)
+
+        Returns:
+            factor (kg CO₂e / kg, kompozisyon toplamı %100'den azsa orantılı),
+            match ('exact', 'nearest', 'linear', 'empty') ve kanonik kompozisyon
+        """
+        key, total = composition_key(fibers)
+        if not key:
+            return {'factor': 0.0, 'match': 'empty', 'composition': []}
+        if memoize:
+            factor, match = self._memo.get_or_load(key, (), lambda: self._resolve_counted(key))
+        else:
+            factor, match = self._resolve(key)
+        return {
+            'factor': factor * total / 100,
+            'match': match,
+            'composition': [{'type': fiber, 'percentage': percentage} for fiber, percentage in key],
+            'source': self.texts.get(key) if match == 'exact' else None
+        }
+
+    def reference_co2(self, fibers: Dict[str, float], memoize: bool = True) -> float:
+        """
+        Ajan ölçeğinde lif CO₂'si (kg CO₂ / 200 g referans ürün)
+
+        Veritabanı faktörleri gerçek kg CO₂e / kg'dır; ajanın lif tablosu ise
+        işlem sabitleriyle (boyama, finishing) ve eşiklerle (current_co2 > 8,
+        skor cezaları) birlikte ayarlanmış daha yüksek bir ölçektedir
+        (calibration ≈ veri / tablo). Faktör calibration'a bölünerek tablo
+        ölçeğine taşınır: kompozisyonlar arasındaki oranlar veriden gelir,
+        mutlak düzey ve eşikler değişmez. Veride olmayan lifler için sonuç
+        ajanın tablosuyla aynıdır. memoize için bkz. lookup.
+        """
+        return self.lookup(fibers, memoize)['factor'] / self.calibration * REFERENCE_WEIGHT / 1000
+
+    def reference_co2_many(self, fibers: Sequence[str], percentages: np.ndarray,
+                           memoize: bool = True) -> np.ndarray:
+        """
+        Çok sayıda kompozisyon için reference_co2 (vektörel, önbelleksiz)
+
+        Normalize etme, tam/en yakın eşleşme ve doğrusal model tekil yoldaki
+        işlem sırasıyla dizi halinde uygulanır; sonuçlar reference_co2 ile
+        bit düzeyinde aynıdır. Yuvarlamada sıfıra düşen lif içeren (tekil
+        anahtarı farklı olan) kompozisyonlar tekil yoldan hesaplanır.
+
+        Args:
+            fibers: Sütunların lif adları (tekrarsız)
+            percentages: (kompozisyon x lif) ham yüzdeler
+            memoize: False ise eşleşme istatistikleri sayılmaz ve tekil yol
+                önbelleğe yazmaz (bkz. lookup)
+
+        Returns:
+            Kompozisyon başına kg CO₂ / 200 g referans ürün
+        """
+        percentages = np.asarray(percentages, dtype=np.float64).reshape(-1, len(fibers))
+        count = len(percentages)
+        factors = np.zeros(count)
+
+        # Toplam ve normalize yüzdeler (composition_key ile aynı işlem sırası)
+        total = np.zeros(count)
+        for column in percentages.T:
+            total += column
+        valid = total > 0
+        normalized = np.zeros_like(percentages)
+        normalized[valid] = round2(percentages[valid] * 100 / total[valid, None])
+        scalar = valid & ((percentages != 0) & (normalized == 0)).any(axis=1)
+        batch = valid & ~scalar
+
+        # Anahtar sırası (lif adına göre) doğrusal model ve bilinmeyen lif toplamında korunur
+        linear = np.zeros(count)
+        unknown = np.zeros(count)
+        vectors = np.zeros((count, len(self.fibers)))
+        for column in sorted(range(len(fibers)), key=lambda j: fibers[j]):
+            fiber = fibers[column]
+            linear += self.fiber_factor(fiber) * normalized[:, column] / 100
+            if fiber in self.fiber_index:
+                vectors[:, self.fiber_index[fiber]] = normalized[:, column]
+            else:
+                unknown += normalized[:, column]
+        factors[batch] = linear[batch]
+        matches = {'exact': 0, 'nearest': 0, 'linear': int(batch.sum())}
+
+        if len(self.keys):
+            rows = np.flatnonzero(batch)
+            for start in range(0, len(rows), BATCH_SIZE):
+                chunk = rows[start:start + BATCH_SIZE]
+                distances = np.abs(self.matrix - vectors[chunk, None, :]).sum(axis=2) + unknown[chunk, None]
+                nearest = distances.argmin(axis=1)
+                best = distances[np.arange(len(chunk)), nearest]
+                exact = best == 0
+                close = ~exact & (best <= self.nearest_max_distance)
+                factors[chunk[exact]] = self.factors[nearest[exact]]
+                factors[chunk[close]] = self.factors[nearest[close]] \
+                    + (linear[chunk[close]] - self.key_linear[nearest[close]])
+                matches['exact'] += int(exact.sum())
+                matches['nearest'] += int(close.sum())
+                matches['linear'] -= int(exact.sum() + close.sum())
+        if memoize:
+            for match, matched in matches.items():
+                self.stats[match] += matched
+
+        result = factors * total / 100 / self.calibration * REFERENCE_WEIGHT / 1000
+        result[~valid] = 0.0
+        for row in np.flatnonzero(scalar):
+            result[row] = self.reference_co2({fiber: value for fiber, value
+                                              in zip(fibers, percentages[row].tolist()) if value}, memoize)
+        return result
+
+    def fiber_co2(self, fiber_composition: List[Dict[str, Any]], mapping: Optional[Dict[str, str]] = None,
+                  default_fiber: str = 'Pamuk') -> float:
+        """
+        Ajan birimiyle lif CO₂'si (reference_co2)
+
+        Args:
+            fiber_composition: [{'type': ..., 'percentage': ...}, ...]
+            mapping: Lif değişimi (ör. sürdürülebilir alternatifler)
+            default_fiber: type verilmemiş lifler için varsayılan
+        """
+        mapping = mapping or {}
+        fibers: Dict[str, float] = {}
+        for fiber in fiber_composition:
+            fiber_type = fiber.get('type', default_fiber)
+            fiber_type = mapping.get(fiber_type, fiber_type)
+            fibers[fiber_type] = fibers.get(fiber_type, 0.0) + float(fiber.get('percentage', 0) or 0)
+        return self.reference_co2(fibers)
+
+    def lookup_text(self, text: str) -> Dict[str, Any]:
+        """Kompozisyon metni için faktör ("%95 Pamuk / %5 Elastan")"""
+        return self.lookup(parse_composition(text, self.fallback_fiber_co2))
+
+    def process_factor(self, name: str) -> Optional[Dict[str, Any]]:
+        """master_konfeksiyon işlem faktörü (ad Türkçe karakter/büyük harf duyarsız)"""
+        return self.process_factors.get(normalize_tr(name).strip())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Kompozisyon, lif ve işlem sayıları ile eşleşme istatistikleri"""
+        memo = self._memo.get_stats()
+        return {
+            'compositions': len(self.keys),
+            'fibers': len(self.fibers),
+            'processes': len(self.process_factors),
+            'calibration': round(self.calibration, 4),
+            'memo_size': memo['size'],
+            'memo_hits': memo['hits'],
+            **self.stats
+        }
+
+    @classmethod
+    def from_database(cls, db_manager, fallback_fiber_co2: Optional[Dict[str, float]] = None,
+                      **kwargs) -> 'EmissionFactorLibrary':
+        """
+        product_fabric_co2 ve master_konfeksiyon tablolarından yükler
+
+        Tablolar henüz oluşturulmadıysa boş kütüphane döner (doğrusal model
+        yalnızca ajanın tablosunu kullanır).
+        """
+        try:
+            compositions = db_manager.execute_query('''
+                SELECT composition, AVG(co2_kg_per_kg) AS factor
+                FROM product_fabric_co2
+                WHERE composition IS NOT NULL AND co2_kg_per_kg IS NOT NULL
+                GROUP BY composition
+            ''')
+            processes = db_manager.execute_query('''
+                SELECT name_norm, MIN(name) AS name, MIN(category) AS category,
+                       MIN(min_co2_kg) AS min_co2_kg, MAX(max_co2_kg) AS max_co2_kg,
+                       AVG(avg_co2_kg) AS avg_co2_kg
+                FROM master_konfeksiyon
+                WHERE name_norm IS NOT NULL
+                GROUP BY name_norm
+            ''')
+        except sqlite3.Error as e:
+            print(f"⚠️ Emisyon faktörleri yüklenemedi, yerleşik tablo kullanılacak: {e}")
+            compositions, processes = [], []
+
+        return cls(
+            [(row['composition'], row['factor']) for row in compositions],
+            fallback_fiber_co2,
+            {row['name_norm']: {key: row[key] for key in
+                                ('name', 'category', 'min_co2_kg', 'max_co2_kg', 'avg_co2_kg')}
+             for row in processes},
+            **kwargs
+        )
@@ -0,0 +1,210 @@
+"""
+AI önerisi geri bildirim deposu
+Zero@Design projesi - öneri tipi bazında artımlı toplamlar ve Bayesçi başarı oranı
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from database_manager import ConnectionPool
+
+# Bu puan ve üzeri başarılı (pozitif) geri bildirim sayılır
+POSITIVE_RATING = 4
+
+# Beta(alpha, beta) önsel dağılımı: veri yokken başarı oranı 0.5
+PRIOR_ALPHA = 1.0
+PRIOR_BETA = 1.0
+
+# Bayesçi başarı oranının confidence'a etkisi
+CONFIDENCE_WEIGHT = 0.4
+
+# Saklanan en fazla ham geri bildirim kaydı
+MAX_EVENTS = 10000
+
+def _empty_aggregate() -> Dict[str, float]:
+    return {'count': 0, 'positive': 0, 'rating_sum': 0.0}
+
+class FeedbackStore:
+    """
+    Kalıcı ve sınırlı geri bildirim deposu
+
+    Her geri bildirim tek transaction'da ham kayıt olarak eklenir ve öneri
+    tipinin toplamlarını (sayı, pozitif sayı, puan toplamı) günceller; ham
+    kayıtlar max_events ile sınırlıdır, toplamlar ise hiç silinmez. Toplamlar
+    bellekte de tutulur; böylece confidence ayarı ve içgörüler O(1)'dir.
+    Diğer süreçlerin yazdıkları refresh_interval aralıklarla okunur.
+
+    db_path None ise yalnızca bellekte toplam tutulur (kalıcılık yok).
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_events: int = MAX_EVENTS,
+                 refresh_interval: float = 5.0):
+        """
+        Args:
+            db_path: SQLite veritabanı dosya yolu (None ise yalnızca bellek)
+            max_events: Saklanan en fazla ham geri bildirim
+            refresh_interval: Toplamların veritabanından yeniden okunma aralığı (saniye)
+        """
+        self.max_events = max_events
+        self.refresh_interval = refresh_interval
+        self.pool = ConnectionPool(db_path) if db_path else None
+        self._lock = threading.Lock()
+        self._aggregates: Dict[str, Dict[str, float]] = {}
+        self._totals = _empty_aggregate()
+        self._loaded_at = 0.0
+        if self.pool:
+            self._create_tables(self.pool.acquire())
+            self._load()
+
+    def _create_tables(self, conn: sqlite3.Connection):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS feedback_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                suggestion_id TEXT,
+                suggestion_type TEXT NOT NULL,
+                rating REAL NOT NULL,
+                comment TEXT,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS feedback_aggregates (
+                suggestion_type TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0,
+                positive INTEGER NOT NULL DEFAULT 0,
+                rating_sum REAL NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+
+    def _load(self):
+        """Toplamları veritabanından okur"""
+        rows = self.pool.acquire().execute(
+            "SELECT suggestion_type, count, positive, rating_sum FROM feedback_aggregates"
+        ).fetchall()
+        aggregates = {row['suggestion_type']: {'count': row['count'], 'positive': row['positive'],
+                                               'rating_sum': row['rating_sum']} for row in rows}
+        totals = _empty_aggregate()
+        for aggregate in aggregates.values():
+            for key in totals:
+                totals[key] += aggregate[key]
+        with self._lock:
+            self._aggregates = aggregates
+            self._totals = totals
+            self._loaded_at = time.monotonic()
+
+    def _refresh(self):
+        if self.pool and time.monotonic() - self._loaded_at >= self.refresh_interval:
+            self._load()
+
+    def record(self, suggestion_type: str, rating: float, suggestion_id: Optional[str] = None,
+               comment: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Geri bildirimi kaydeder ve tip toplamlarını günceller
+
+        Args:
+            suggestion_type: Öneri tipi ('material', 'process', 'design', 'supply_chain')
+            rating: 1-5 arası puan
+            suggestion_id: İstemcinin öneri kimliği (opsiyonel)
+            comment: Açıklama (opsiyonel)
+
+        Returns:
+            Tipin güncel istatistikleri
+        """
+        positive = int(rating >= POSITIVE_RATING)
+
+        if self.pool:
+            conn = self.pool.acquire()
+            now = datetime.now().isoformat()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute('''
+                    INSERT INTO feedback_events (suggestion_id, suggestion_type, rating, comment, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (suggestion_id, suggestion_type, rating, comment, now))
+                conn.execute('''
+                    INSERT INTO feedback_aggregates (suggestion_type, count, positive, rating_sum, updated_at)
+                    VALUES (?, 1, ?, ?, ?)
+                    ON CONFLICT(suggestion_type) DO UPDATE SET
+                        count = count + 1,
+                        positive = positive + excluded.positive,
+                        rating_sum = rating_sum + excluded.rating_sum,
+                        updated_at = excluded.updated_at
+                ''', (suggestion_type, positive, rating, now))
+                # Ham kayıtlar sınırlı; toplamlar etkilenmez
+                conn.execute("DELETE FROM feedback_events WHERE id <= ?",
+                             (cursor.lastrowid - self.max_events,))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        with self._lock:
+            aggregate = self._aggregates.setdefault(suggestion_type, _empty_aggregate())
+            for target in (aggregate, self._totals):
+                target['count'] += 1
+                target['positive'] += positive
+                target['rating_sum'] += rating
+        return self.get_type_stats(suggestion_type)
+
+    def success_rate(self, suggestion_type: str) -> float:
+        """Bayesçi (Beta önselli) başarı oranı; veri yokken önsel ortalama"""
+        self._refresh()
+        aggregate = self._aggregates.get(suggestion_type)
+        count, positive = (aggregate['count'], aggregate['positive']) if aggregate else (0, 0)
+        return (positive + PRIOR_ALPHA) / (count + PRIOR_ALPHA + PRIOR_BETA)
+
+    def adjust_confidence(self, suggestion_type: str, confidence: float) -> float:
+        """
+        Öneri confidence'ını tipin başarı oranına göre ayarlar
+
+        Başarı oranı önsel ortalamadan (0.5) ne kadar saparsa confidence o
+        yönde CONFIDENCE_WEIGHT oranında kayar; az veride oran önsele yakın
+        olduğundan ayar da küçüktür.
+        """
+        prior_mean = PRIOR_ALPHA / (PRIOR_ALPHA + PRIOR_BETA)
+        adjusted = confidence + CONFIDENCE_WEIGHT * (self.success_rate(suggestion_type) - prior_mean)
+        return round(min(0.99, max(0.05, adjusted)), 3)
+
+    def get_type_stats(self, suggestion_type: str) -> Dict[str, Any]:
+        """Tek öneri tipinin istatistikleri"""
+        aggregate = self._aggregates.get(suggestion_type, _empty_aggregate())
+        count = aggregate['count']
+        return {
+            'count': count,
+            'positive': aggregate['positive'],
+            'average_rating': round(aggregate['rating_sum'] / count, 2) if count else None,
+            'success_rate': round(self.success_rate(suggestion_type), 3)
+        }
+
+    @property
+    def version(self) -> int:
+        """Toplam geri bildirim sayısı; önbellek anahtarlarında sürüm olarak kullanılır"""
+        self._refresh()
+        return int(self._totals['count'])
+
+    def get_insights(self) -> Dict[str, Any]:
+        """
+        Toplam ve tip bazında istatistikler
+
+        Returns:
+            total_feedback, positive_feedback_rate, başarı oranına göre
+            sıralı öneri tipleri ve tip istatistikleri
+        """
+        self._refresh()
+        with self._lock:
+            totals = dict(self._totals)
+            types = list(self._aggregates)
+        stats = {suggestion_type: self.get_type_stats(suggestion_type) for suggestion_type in types}
+        ranked: List[str] = sorted(types, key=lambda t: stats[t]['success_rate'], reverse=True)
+        return {
+            'total_feedback': int(totals['count']),
+            'positive_feedback_rate': round(totals['positive'] / totals['count'] * 100, 1)
+            if totals['count'] else 0,
+            'most_successful_suggestion_types': ranked,
+            'suggestion_types': stats
+        }
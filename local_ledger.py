@@ -0,0 +1,367 @@
+"""
+Yerel, yalnızca eklenebilir (append-only) blok defteri simülatörü
+Zero@Design projesi - canlı düğüm olmadan kayıt ve doğrulama yük testi
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Blok dosyası: her satır bir blok (kompakt JSON)
+BLOCKS_FILE = 'blocks.log'
+LOCK_FILE = 'ledger.lock'
+
+# Genesis öncesi ebeveyn hash'i
+GENESIS_PARENT = '0' * 64
+
+def _canonical(data: Any) -> bytes:
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def block_hash(block: Dict[str, Any]) -> str:
+    """Bloğun ('hash' alanı hariç) kanonik sha256 özeti"""
+    return hashlib.sha256(_canonical({k: v for k, v in block.items() if k != 'hash'})).hexdigest()
+
+class LocalLedger:
+    """
+    Hash zincirli blokları diske yalnızca ekleyerek yazan yerel defter
+
+    İşlemler açık bloğa eklenir; blok block_time saniye sonra (0 ise hemen)
+    mühürlenip tek satır olarak blocks.log dosyasına yazılır ve fsync edilir.
+    submit, işlemi içeren blok mühürlenene kadar bekler; böylece blok süresi
+    gerçekçi bir onay gecikmesi üretir.
+
+    İşlemlerin anahtarları (dpp_id, blockchain_id, merkle_root, batch_id)
+    blok numarası ve dosya ofsetine indekslenir; arama tek bir pread'dir.
+    İstatistikler sayaçlardan O(1) okunur. Birden fazla süreç aynı defteri
+    paylaşabilir: yazmalar flock ile sıralanır, diğer süreçlerin eklediği
+    bloklar dosya boyutu büyüdüğünde okunur.
+    """
+
+    def __init__(self, path: str = "data/blockchain/ledger", block_time: float = 0.0,
+                 gas_per_tx: int = 150000):
+        """
+        Args:
+            path: Defter klasörü
+            block_time: Blok süresi (saniye, 0 ise her işlem kendi bloğunda)
+            gas_per_tx: İşlem başına kaydedilen gas
+        """
+        self.path = path
+        self.block_time = block_time
+        self.gas_per_tx = gas_per_tx
+        os.makedirs(path, exist_ok=True)
+        self.blocks_path = os.path.join(path, BLOCKS_FILE)
+
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        self._opened_at: Optional[float] = None
+
+        self._index: Dict[str, Tuple[int, int, int, int]] = {}
+        self._head_number = 0
+        self._head_hash = GENESIS_PARENT
+        self._size = 0
+        self.counters = {'blocks': 0, 'transactions': 0, 'gas_used': 0, 'dpps': 0}
+        self.kind_counts: Dict[str, int] = {}
+
+        self._lock_fd = os.open(os.path.join(path, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        self._write_fd = os.open(self.blocks_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._read_fd = os.open(self.blocks_path, os.O_RDONLY)
+        with self._file_lock():
+            self._repair_tail()
+            self._catch_up()
+
+    # --- Dosya ve indeks -------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Süreçler arası yazma kilidi"""
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _repair_tail(self):
+        """Yarım yazılmış son satırı (çökme) keser"""
+        size = os.fstat(self._read_fd).st_size
+        if size == 0:
+            return
+        tail = os.pread(self._read_fd, 1, size - 1)
+        if tail == b'\n':
+            return
+        data = os.pread(self._read_fd, size, 0)
+        keep = data.rfind(b'\n') + 1
+        os.truncate(self.blocks_path, keep)
+        logger.warning(f"Defterin yarım kalan son bloğu kesildi ({size - keep} bayt)")
+
+    def _catch_up(self):
+        """Dosyaya (bu veya başka bir süreç tarafından) eklenen blokları indeksler"""
+        size = os.fstat(self._read_fd).st_size
+        if size <= self._size:
+            return
+        data = os.pread(self._read_fd, size - self._size, self._size)
+        offset = self._size
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b'\n'):
+                break  # Başka süreç hâlâ yazıyor
+            block = json.loads(line)
+            if block['parent_hash'] != self._head_hash:
+                raise ValueError(f"Defter zinciri kopuk: blok {block['number']}")
+            self._apply_block(block, offset, len(line))
+            offset += len(line)
+        self._size = offset
+
+    def _apply_block(self, block: Dict[str, Any], offset: int, length: int):
+        for tx_index, tx in enumerate(block['transactions']):
+            position = (block['number'], offset, length, tx_index)
+            for key in tx.get('keys', []):
+                self._index[key] = position
+            self.counters['transactions'] += 1
+            self.counters['gas_used'] += tx.get('gas_used', 0)
+            self.counters['dpps'] += tx.get('dpp_count', 0)
+            self.kind_counts[tx['kind']] = self.kind_counts.get(tx['kind'], 0) + 1
+        self.counters['blocks'] += 1
+        self._head_number = block['number']
+        self._head_hash = block['hash']
+
+    def _read_block(self, offset: int, length: int) -> Dict[str, Any]:
+        return json.loads(os.pread(self._read_fd, length, offset))
+
+    # --- Yazma -----------------------------------------------------------
+
+    def submit(self, kind: str, payload: Dict[str, Any], keys: Iterable[str] = (),
+               dpp_count: int = 0) -> Dict[str, Any]:
+        """
+        İşlemi deftere ekler ve bloğu mühürlenene kadar bekler
+
+        Args:
+            kind: İşlem türü (ör. register_dpp, anchor_merkle_root)
+            payload: İşlem verisi
+            keys: İşlemin aranabileceği anahtarlar
+            dpp_count: İşlemin kapsadığı DPP sayısı (istatistik)
+
+        Returns:
+            transaction_hash, block_number, block_hash, timestamp ve gas_used
+        """
+        tx = {
+            'kind': kind,
+            'payload': payload,
+            'keys': [key for key in keys if key],
+            'dpp_count': dpp_count,
+            'gas_used': self.gas_per_tx,
+            'submitted_at': datetime.now().isoformat()
+        }
+        tx['hash'] = hashlib.sha256(_canonical(tx)).hexdigest()
+        receipt: Dict[str, Any] = {}
+
+        with self._cond:
+            self._pending.append((tx, receipt))
+            if self._opened_at is None:
+                self._opened_at = time.monotonic()
+            while not receipt:
+                remaining = self._opened_at + self.block_time - time.monotonic()
+                if remaining <= 0:
+                    self._seal_locked()
+                else:
+                    self._cond.wait(remaining)
+        return receipt
+
+    def _seal_locked(self):
+        """Açık bloğu mühürleyip diske yazar (self._cond tutulurken çağrılır)"""
+        pending, self._pending, self._opened_at = self._pending, [], None
+        with self._file_lock():
+            self._catch_up()
+            block = {
+                'number': self._head_number + 1,
+                'parent_hash': self._head_hash,
+                'timestamp': datetime.now().isoformat(),
+                'transactions': [tx for tx, _ in pending]
+            }
+            block['hash'] = block_hash(block)
+            line = json.dumps(block, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+            os.write(self._write_fd, line)
+            os.fsync(self._write_fd)
+            self._apply_block(block, self._size, len(line))
+            self._size += len(line)
+
+        for tx, receipt in pending:
+            receipt.update({
+                'transaction_hash': tx['hash'],
+                'block_number': block['number'],
+                'block_hash': block['hash'],
+                'timestamp': block['timestamp'],
+                'gas_used': tx['gas_used']
+            })
+        self._cond.notify_all()
+
+    # --- Okuma -----------------------------------------------------------
+
+    def get_transaction(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Anahtarla son işlemi getirir
+
+        Args:
+            key: dpp_id, blockchain_id, merkle_root veya batch_id
+
+        Returns:
+            İşlem (block_number ve block_hash eklenmiş) ya da None
+        """
+        with self._cond:
+            position = self._index.get(key)
+            if position is None:
+                # Başka bir sürecin eklediği bloklarda olabilir
+                with self._file_lock():
+                    self._catch_up()
+                position = self._index.get(key)
+        if position is None:
+            return None
+        number, offset, length, tx_index = position
+        block = self._read_block(offset, length)
+        return dict(block['transactions'][tx_index],
+                    block_number=number, block_hash=block['hash'],
+                    block_timestamp=block['timestamp'])
+
+    def current_block(self) -> int:
+        """Son mühürlenmiş blok numarası"""
+        return self._head_number
+
+    def iter_blocks(self) -> Iterator[Dict[str, Any]]:
+        """Diskteki blokları sırayla döndürür"""
+        with open(self.blocks_path, 'rb') as f:
+            for line in f:
+                if line.endswith(b'\n'):
+                    yield json.loads(line)
+
+    def verify_chain(self) -> Dict[str, Any]:
+        """
+        Tüm blokların hash'lerini ve ebeveyn bağlantılarını yeniden doğrular
+
+        Returns:
+            valid, doğrulanan blok sayısı ve (varsa) ilk bozuk blok
+        """
+        parent = GENESIS_PARENT
+        count = 0
+        for block in self.iter_blocks():
+            if block['parent_hash'] != parent or block_hash(block) != block['hash']:
+                return {'valid': False, 'blocks': count, 'broken_block': block['number']}
+            parent = block['hash']
+            count += 1
+        return {'valid': True, 'blocks': count, 'broken_block': None}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Sayaçlardan defter istatistikleri (O(1))
+
+        Önce başka süreçlerin eklediği bloklar artımlı olarak indekslenir;
+        yalnızca son çağrıdan beri eklenen baytlar okunur.
+        """
+        with self._cond:
+            with self._file_lock():
+                self._catch_up()
+            return dict(self.counters,
+                        current_block=self._head_number,
+                        head_hash=self._head_hash,
+                        pending_transactions=len(self._pending),
+                        by_kind=dict(self.kind_counts),
+                        indexed_keys=len(self._index),
+                        block_time=self.block_time,
+                        size_bytes=self._size)
+
+    def close(self):
+        for fd in (self._write_fd, self._read_fd, self._lock_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+def benchmark_ledger(count: int = 10000, batch_size: int = 256, block_time: float = 0.0,
+                     threads: int = 8) -> Dict[str, Any]:
+    """
+    Merkle kayıt ve doğrulama hızını yerel defterle ölçer
+
+    Args:
+        count: Kaydedilecek DPP sayısı
+        batch_size: Merkle batch boyutu
+        block_time: Defter blok süresi (saniye)
+        threads: Eşzamanlı kaydeden thread sayısı
+
+    Returns:
+        Kayıt ve doğrulama hızları (DPP/saniye) ve defter istatistikleri
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    from blockchain_integration import BlockchainDPPIntegration, DPPBlockchainStorage
+    from merkle_anchor import MerkleAnchorService
+
+    dpps = [{
+        'dpp_id': f'bench-{i}',
+        'product_info': {'name': f'Benchmark Ürün {i}', 'category': 'Apparel'},
+        'sustainability': {'co2_footprint': {'total_kg': i % 20}, 'score': i % 100}
+    } for i in range(count)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = DPPBlockchainStorage(tmp_dir)
+        ledger = LocalLedger(os.path.join(tmp_dir, 'ledger'), block_time=block_time)
+        integration = BlockchainDPPIntegration(storage=storage, ledger=ledger)
+        anchor_service = MerkleAnchorService(integration, storage)
+
+        batches = [[anchor_service.make_receipt(dpp) for dpp in dpps[i:i + batch_size]]
+                   for i in range(0, count, batch_size)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda batch: anchor_service.anchor_batch(batch), batches))
+        register_seconds = time.perf_counter() - started
+
+        # Önbelleksiz doğrulama: kanıt + zincirdeki kök araması ölçülür
+        started = time.perf_counter()
+        verified = sum(integration._verify_against_record(
+            dpp['dpp_id'], integration._generate_metadata_hash(dpp),
+            storage.load_blockchain_record(dpp['dpp_id'])
+        )['verified'] for dpp in dpps)
+        verify_seconds = time.perf_counter() - started
+
+        stats = ledger.get_stats()
+        chain = ledger.verify_chain()
+        ledger.close()
+
+    return {
+        'registered_per_second': round(count / register_seconds, 1),
+        'verified_per_second': round(count / verify_seconds, 1),
+        'verified': verified,
+        'chain_valid': chain['valid'],
+        'ledger': stats
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design yerel defter araçları")
+    parser.add_argument('--path', default='data/blockchain/ledger', help='Defter klasörü')
+    parser.add_argument('--verify', action='store_true', help='Blok hash zincirini doğrula')
+    parser.add_argument('--benchmark', type=int, metavar='COUNT',
+                        help='COUNT DPP ile kayıt ve doğrulama hızını ölç')
+    parser.add_argument('--batch-size', type=int, default=256, help='Merkle batch boyutu')
+    parser.add_argument('--block-time', type=float, default=0.0, help='Blok süresi (saniye)')
+    args = parser.parse_args()
+
+    logging.getLogger('merkle_anchor').setLevel(logging.WARNING)
+    if args.benchmark:
+        result = benchmark_ledger(args.benchmark, args.batch_size, args.block_time)
+        print(f"📊 Kayıt: {result['registered_per_second']:,} DPP/s  "
+              f"Doğrulama: {result['verified_per_second']:,} DPP/s  "
+              f"({result['verified']} doğrulandı, zincir geçerli: {result['chain_valid']})")
+        print(json.dumps(result['ledger'], indent=2))
+    else:
+        ledger = LocalLedger(args.path)
+        if args.verify:
+            print(json.dumps(ledger.verify_chain(), indent=2))
+        print(json.dumps(ledger.get_stats(), indent=2))
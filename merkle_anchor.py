@@ -0,0 +1,203 @@
+"""
+Merkle ağacı ile toplu (batch) blockchain sabitleme servisi
+Zero@Design projesi - DPP metadata hash'lerini tek işlemde kaydetme
+"""
+
+import hashlib
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Yaprak ve iç düğüm hash'leri için alan ayırıcı önekler (ikinci ön görüntü
+# saldırılarına karşı: bir iç düğüm yaprak olarak sunulamaz)
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+def merkle_leaf(metadata_hash: str) -> bytes:
+    """Hex metadata hash'inden yaprak düğümü üretir"""
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(metadata_hash)).digest()
+
+def merkle_node(left: bytes, right: bytes) -> bytes:
+    """İki alt düğümden üst düğümü üretir"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def build_merkle_tree(metadata_hashes: List[str]) -> List[List[bytes]]:
+    """
+    Metadata hash'lerinden Merkle ağacı oluşturur
+
+    Tek sayıda düğüm kalan seviyelerde son düğüm kopyalanmadan bir üst
+    seviyeye taşınır; böylece farklı yaprak listeleri aynı kökü üretemez.
+
+    Args:
+        metadata_hashes: Hex formatında yaprak hash'leri
+
+    Returns:
+        Yapraklardan köke seviye listesi (son seviye tek elemanlı köktür)
+    """
+    if not metadata_hashes:
+        raise ValueError("Merkle ağacı için en az bir yaprak gerekli")
+
+    levels = [[merkle_leaf(h) for h in metadata_hashes]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [merkle_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+def merkle_root(levels: List[List[bytes]]) -> str:
+    """Ağacın kökünü hex olarak döndürür"""
+    return levels[-1][0].hex()
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[Dict[str, str]]:
+    """
+    Yaprağın köke kadar kardeş düğümlerinden oluşan kapsama kanıtı
+
+    Args:
+        levels: build_merkle_tree çıktısı
+        index: Yaprak sırası
+
+    Returns:
+        [{'position': 'left'|'right', 'hash': hex}, ...] (yapraktan köke)
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({
+                'position': 'left' if sibling < index else 'right',
+                'hash': level[sibling].hex()
+            })
+        index //= 2
+    return proof
+
+def verify_merkle_proof(metadata_hash: str, proof: List[Dict[str, str]], root: str) -> bool:
+    """
+    Kapsama kanıtını doğrular
+
+    Args:
+        metadata_hash: DPP'nin hex metadata hash'i
+        proof: merkle_proof çıktısı
+        root: Zincire yazılmış Merkle kökü (hex)
+
+    Returns:
+        Kanıt kökü üretiyorsa True
+    """
+    try:
+        node = merkle_leaf(metadata_hash)
+        for step in proof:
+            sibling = bytes.fromhex(step['hash'])
+            node = merkle_node(sibling, node) if step['position'] == 'left' else merkle_node(node, sibling)
+    except (ValueError, KeyError, TypeError):
+        return False
+    return node.hex() == root
+
+class MerkleAnchorService:
+    """
+    DPP metadata hash'lerinin Merkle kökünü tek işlemde sabitler
+
+    Batch'ler kalıcı kayıt kuyruğundan (RegistrationWorkerPool) gelir; bu
+    servis yalnızca makbuz üretir ve verilen batch'i sabitler. Zincire
+    yalnızca kök yazılır; her DPP için kapsama kanıtı DPPBlockchainStorage'a
+    kaydedilir. Böylece işlem sayısı ve gas, pasaport sayısıyla değil batch
+    sayısıyla ölçeklenir.
+    """
+
+    def __init__(self, integration, storage):
+        """
+        Args:
+            integration: BlockchainDPPIntegration (kökü zincire yazar)
+            storage: DPPBlockchainStorage (kanıt ve batch kayıtları)
+        """
+        self.integration = integration
+        self.storage = storage
+        self._lock = threading.Lock()
+        self._anchor_lock = threading.Lock()
+        self.stats = {'anchored': 0, 'batches': 0, 'failed_batches': 0}
+
+    def make_receipt(self, dpp_data: Dict[str, Any]) -> Dict[str, Any]:
+        """DPP için bekleyen kayıt makbuzu (metadata hash ile) oluşturur"""
+        return {
+            'success': True,
+            'status': 'pending',
+            'dpp_id': dpp_data.get('dpp_id'),
+            'metadata_hash': self.integration._generate_metadata_hash(dpp_data),
+            'contract_address': self.integration.contract_address,
+            'submitted_at': datetime.now().isoformat()
+        }
+
+    def anchor_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Batch için Merkle ağacını kurar, kökü zincire yazar ve her DPP'nin
+        kapsama kanıtını kaydeder
+
+        Args:
+            batch: make_receipt makbuzları (dpp_id, metadata_hash)
+
+        Returns:
+            Batch (anchor) kaydı
+        """
+        # Kök yazımları sıralı yapılır (zincirdeki nonce sırası korunur)
+        with self._anchor_lock:
+            batch_id = uuid.uuid4().hex
+            levels = build_merkle_tree([item['metadata_hash'] for item in batch])
+            root = merkle_root(levels)
+
+            result = self.integration.anchor_merkle_root(root, len(batch), batch_id)
+            if not result.get('success'):
+                # Yeniden deneme kalıcı kuyruğun işidir (backoff ile)
+                with self._lock:
+                    self.stats['failed_batches'] += 1
+                logger.error(f"Merkle kökü sabitlenemedi ({len(batch)} DPP): {result.get('error')}")
+                return result
+
+            anchor = {
+                'batch_id': batch_id,
+                'merkle_root': root,
+                'leaf_count': len(batch),
+                'dpp_ids': [item['dpp_id'] for item in batch],
+                'transaction_hash': result['transaction_hash'],
+                'block_number': result['block_number'],
+                'contract_address': result['contract_address'],
+                'gas_used': result['gas_used'],
+                'timestamp': result['timestamp']
+            }
+            self.storage.save_anchor_record(batch_id, anchor)
+
+            for index, item in enumerate(batch):
+                self.storage.save_blockchain_record(item['dpp_id'], {
+                    'success': True,
+                    'status': 'confirmed',
+                    'dpp_id': item['dpp_id'],
+                    'metadata_hash': item['metadata_hash'],
+                    'transaction_hash': result['transaction_hash'],
+                    'block_number': result['block_number'],
+                    'contract_address': result['contract_address'],
+                    'submitted_at': item['submitted_at'],
+                    'timestamp': result['timestamp'],
+                    'anchor': {
+                        'batch_id': batch_id,
+                        'merkle_root': root,
+                        'leaf_index': index,
+                        'leaf_count': len(batch)
+                    },
+                    'merkle_proof': merkle_proof(levels, index)
+                })
+
+            with self._lock:
+                self.stats['batches'] += 1
+                self.stats['anchored'] += len(batch)
+
+        logger.info(f"Merkle kökü sabitlendi: {len(batch)} DPP, kök {root[:16]}…, "
+                    f"tx {result['transaction_hash'][:16]}…")
+        return anchor
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Servis istatistiklerini döndürür"""
+        with self._lock:
+            return dict(self.stats)
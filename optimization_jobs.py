@@ -0,0 +1,322 @@
+"""
+Koleksiyon optimizasyonu için süreç havuzu ve iş yöneticisi
+Zero@Design projesi - büyük koleksiyonları Flask worker'ını bloklamadan çözme
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+from collection_optimizer import CollectionOptimizer
+
+logger = logging.getLogger(__name__)
+
+# İş durumları
+JOB_STATUSES = ('queued', 'running', 'completed', 'failed', 'cancelled', 'timeout')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled', 'timeout')
+
+# Varsayılan süreç sayısı
+OPTIMIZATION_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+# Bir süreç görevine düşen ürün sayısı
+SHARD_SIZE = 5000
+
+# Bu boyuttan büyük koleksiyonlar iş olarak kuyruğa alınır
+ASYNC_THRESHOLD = 5000
+
+# İş başına varsayılan ve en uzun süre (saniye)
+JOB_TIMEOUT = 300.0
+
+# Worker süreçleri çok thread'li Flask sürecinden fork edilmez (fork, başka
+# thread'lerin tuttuğu kilitleri kopyalayabilir); forkserver temiz bir
+# süreçten üretir
+MP_START_METHOD = 'forkserver'
+
+# Bellekte tutulan en fazla bitmiş iş
+MAX_FINISHED_JOBS = 100
+
+def _shard_option_co2(optimizer: CollectionOptimizer, products: List[Dict[str, Any]]) -> np.ndarray:
+    """Süreç görevi: parçanın kodlanması ve seçenek CO₂ matrisi"""
+    return optimizer.option_co2(optimizer.engine.encode(products))
+
+class JobCancelled(Exception):
+    """İş iptal edildi veya süresi doldu"""
+
+class OptimizationJobManager:
+    """
+    Süreç havuzunda parçalı koleksiyon optimizasyonu
+
+    Kodlama ve seçenek CO₂ hesabı ürün başına bağımsız olduğundan koleksiyon
+    shard_size'lık parçalara bölünüp ProcessPoolExecutor'a dağıtılır; sonuçlar
+    parça sırasıyla birleştirilir ve küresel seçim (CollectionOptimizer.solve)
+    ana süreçte yapılır. Böylece sonuç, worker sayısından ve parçaların
+    bitiş sırasından bağımsız olarak tek süreçli optimize ile aynıdır.
+
+    İşler arka plan thread'inde yürür; durum, ilerleme (biten parça) ve sonuç
+    get_job ile sorgulanır. İptal ve zaman aşımında bekleyen parçalar
+    kuyruktan çıkarılır, çalışan parçaların sonucu yok sayılır.
+    """
+
+    def __init__(self, optimizer: CollectionOptimizer, workers: int = OPTIMIZATION_WORKERS,
+                 shard_size: int = SHARD_SIZE, timeout: float = JOB_TIMEOUT,
+                 max_finished_jobs: int = MAX_FINISHED_JOBS):
+        """
+        Args:
+            optimizer: Koleksiyon optimizasyon çözücüsü
+            workers: Süreç sayısı
+            shard_size: Süreç görevi başına ürün sayısı
+            timeout: İş başına varsayılan en uzun süre (saniye)
+            max_finished_jobs: Bellekte tutulan en fazla bitmiş iş
+        """
+        self.optimizer = optimizer
+        self.workers = workers
+        self.shard_size = shard_size
+        self.timeout = timeout
+        self.max_finished_jobs = max_finished_jobs
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(MP_START_METHOD)
+                )
+            return self._executor
+
+    def _shards(self, products: Sequence[Dict[str, Any]]) -> List[Sequence[Dict[str, Any]]]:
+        return [products[i:i + self.shard_size] for i in range(0, len(products), self.shard_size)]
+
+    def optimize(self, products: Sequence[Dict[str, Any]], target_reduction: float = 15.0,
+                 timeout: Optional[float] = None, job: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Koleksiyonu süreç havuzunda çözer (bloklayan çağrı)
+
+        Tek parçalık koleksiyonlar da havuzda çözülür; böylece iptal ve zaman
+        aşımı her iş için aynı şekilde uygulanır.
+
+        Args:
+            products: Koleksiyon ürünleri
+            target_reduction: Hedef toplam azaltım (%)
+            timeout: En uzun süre (saniye); None ise varsayılan
+            job: İlerleme ve iptal için iş kaydı (submit tarafından verilir)
+
+        Returns:
+            CollectionOptimizer.optimize ile aynı sonuç
+
+        Raises:
+            JobCancelled: İş iptal edildi veya süre aşıldı
+        """
+        shards = self._shards(products)
+        if job is not None:
+            job['shards'] = len(shards)
+        if not shards:
+            return self.optimizer.optimize(products, target_reduction)
+
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+        executor = self._get_executor()
+        futures = {executor.submit(_shard_option_co2, self.optimizer, list(shard)): index
+                   for index, shard in enumerate(shards)}
+        results: List[Optional[np.ndarray]] = [None] * len(shards)
+        pending = set(futures)
+        try:
+            while pending:
+                if job is not None and job['cancel_requested']:
+                    raise JobCancelled('cancelled')
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise JobCancelled('timeout')
+                done, pending = wait(pending, timeout=min(remaining, 0.5), return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = future.result()
+                if job is not None:
+                    job['completed_shards'] = sum(result is not None for result in results)
+        finally:
+            for future in pending:
+                future.cancel()
+
+        if job is not None and job['cancel_requested']:
+            raise JobCancelled('cancelled')
+        return self.optimizer.solve(products, np.hstack(results), target_reduction)
+
+    # --- Arka plan işleri ------------------------------------------------
+
+    def submit(self, products: Sequence[Dict[str, Any]], target_reduction: float = 15.0,
+               timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Optimizasyonu arka plan işi olarak başlatır
+
+        Args:
+            products: Koleksiyon ürünleri
+            target_reduction: Hedef toplam azaltım (%)
+            timeout: En uzun süre (saniye, 0 < timeout <= varsayılan); None ise varsayılan
+
+        Returns:
+            İş durumu (job_id ile get_job / cancel_job çağrılır)
+
+        Raises:
+            ValueError: timeout geçersizse
+        """
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+                                    or not 0 < timeout <= self.timeout):
+            raise ValueError(f"timeout 0 ile {self.timeout:g} saniye arasında bir sayı olmalı")
+
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        job = {
+            'job_id': job_id,
+            'status': 'queued',
+            'products': len(products),
+            'target_reduction': target_reduction,
+            'shards': 0,
+            'completed_shards': 0,
+            'cancel_requested': False,
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._evict_finished()
+
+        thread = threading.Thread(target=self._run, args=(job, products, target_reduction, timeout),
+                                  name=f'optimize-{job_id[:8]}', daemon=True)
+        thread.start()
+        return self._public(job)
+
+    def _run(self, job: Dict[str, Any], products: Sequence[Dict[str, Any]],
+             target_reduction: float, timeout: Optional[float]):
+        self._update(job, status='running')
+        try:
+            result = self.optimize(products, target_reduction, timeout, job)
+            self._update(job, status='completed', result=result)
+        except JobCancelled as e:
+            self._update(job, status=str(e))
+        except Exception as e:
+            logger.error(f"Optimizasyon işi başarısız ({job['job_id']}): {e}")
+            self._update(job, status='failed', error=str(e))
+
+    def _update(self, job: Dict[str, Any], **fields):
+        with self._lock:
+            job.update(fields, updated_at=datetime.now().isoformat())
+
+    def _evict_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _public(self, job: Dict[str, Any], include_result: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            status = {key: value for key, value in job.items() if key not in ('result', 'cancel_requested')}
+            shards = job['shards']
+            status['progress'] = 1.0 if job['status'] == 'completed' else \
+                round(job['completed_shards'] / shards, 3) if shards else 0.0
+            if include_result and job['status'] == 'completed':
+                status['result'] = job['result']
+        return status
+
+    def get_job(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        İş durumu, ilerleme ve (tamamlandıysa) sonuç
+
+        Returns:
+            İş durumu veya bilinmeyen iş için None
+        """
+        job = self._jobs.get(job_id)
+        return self._public(job, include_result) if job else None
+
+    def cancel_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        İşi iptal eder (bitmiş işler değişmez)
+
+        Returns:
+            İş durumu veya bilinmeyen iş için None
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        with self._lock:
+            if job['status'] not in FINISHED_STATUSES:
+                job['cancel_requested'] = True
+        return self._public(job)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Süreç havuzu ve iş sayıları"""
+        with self._lock:
+            counts = {status: 0 for status in JOB_STATUSES}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+        return {
+            'workers': self.workers,
+            'shard_size': self.shard_size,
+            'jobs': counts
+        }
+
+    def shutdown(self):
+        """Bekleyen işleri iptal eder ve süreç havuzunu kapatır"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job['status'] not in FINISHED_STATUSES:
+                    job['cancel_requested'] = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def benchmark_jobs(count: int = 100000, workers: int = OPTIMIZATION_WORKERS,
+                   target_reduction: float = 15.0) -> Dict[str, Any]:
+    """
+    Tek süreçli optimizasyonu süreç havuzuyla karşılaştırır
+
+    Returns:
+        Süreler ve sonuçların aynı olup olmadığı
+    """
+    from ai_agent import ai_agent
+    from co2_engine import _random_collection
+
+    products = _random_collection(count)
+    manager = OptimizationJobManager(ai_agent.collection_optimizer, workers=workers)
+    try:
+        started = time.perf_counter()
+        single = ai_agent.collection_optimizer.optimize(products, target_reduction)
+        single_seconds = time.perf_counter() - started
+
+        manager._get_executor().submit(int).result()  # süreçleri ısıt
+        started = time.perf_counter()
+        parallel = manager.optimize(products, target_reduction)
+        parallel_seconds = time.perf_counter() - started
+    finally:
+        manager.shutdown()
+
+    return {
+        'skus': count,
+        'workers': workers,
+        'single_seconds': round(single_seconds, 3),
+        'parallel_seconds': round(parallel_seconds, 3),
+        'identical': single == parallel
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design paralel koleksiyon optimizasyonu")
+    parser.add_argument('--benchmark', type=int, metavar='COUNT', default=100000,
+                        help='COUNT SKU ile tek süreç ve süreç havuzunu karşılaştır')
+    parser.add_argument('--workers', type=int, default=OPTIMIZATION_WORKERS, help='Süreç sayısı')
+    args = parser.parse_args()
+
+    result = benchmark_jobs(args.benchmark, args.workers)
+    print(f"📊 {result['skus']:,} SKU: tek süreç {result['single_seconds']} s, "
+          f"{result['workers']} süreç {result['parallel_seconds']} s "
+          f"(aynı sonuç: {result['identical']})")
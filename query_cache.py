@@ -0,0 +1,186 @@
+"""
+Zero@Design - Sorgu Sonuç Önbelleği
+Referans tablo okumaları için LRU/TTL önbellek ve tablo sürümü takibi
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Tablo sürüm sayaçlarının tutulduğu tablo
+VERSION_TABLE = 'table_versions'
+
+def create_version_table(conn: sqlite3.Connection):
+    """Tablo sürüm sayaçları tablosunu oluşturur"""
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def bump_table_versions(conn: sqlite3.Connection, tables: Iterable[str]):
+    """
+    Verilen tabloların sürüm sayacını artırır
+
+    Yazma işlemiyle aynı transaction içinde çağrılmalıdır; böylece veri ve
+    sürüm birlikte commit edilir. Commit çağırana aittir.
+
+    Args:
+        conn: SQLite bağlantısı
+        tables: Değişen tablolar
+    """
+    create_version_table(conn)
+    conn.executemany(f'''
+        INSERT INTO {VERSION_TABLE} (table_name, version) VALUES (?, 1)
+        ON CONFLICT(table_name) DO UPDATE SET
+            version = version + 1,
+            updated_at = CURRENT_TIMESTAMP
+    ''', [(table,) for table in set(tables)])
+
+class TableVersions:
+    """
+    Süreç içi tablo sürüm görünümü
+
+    Sürümler table_versions tablosundan okunur. Başka bir bağlantının
+    (import CLI, diğer gunicorn worker'ları) commit ettiği değişiklikler
+    PRAGMA data_version ile tespit edilir; tablo yalnızca o zaman yeniden
+    okunur. Aynı bağlantının kendi yazmaları data_version'ı değiştirmediği
+    için yazma yolları commit sonrası invalidate() çağırır.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = 0
+
+    def invalidate(self):
+        """Bir sonraki okumada sürümlerin yeniden yüklenmesini sağlar"""
+        with self._lock:
+            self._generation += 1
+
+    def _reload(self, conn: sqlite3.Connection):
+        try:
+            rows = conn.execute(f"SELECT table_name, version FROM {VERSION_TABLE}").fetchall()
+        except sqlite3.OperationalError:
+            # Sürüm tablosu olmayan eski veritabanı: yalnızca TTL geçerli
+            rows = []
+        with self._lock:
+            self._versions = {row[0]: row[1] for row in rows}
+
+    def current(self, conn: sqlite3.Connection, tables: Iterable[str]) -> Tuple[int, ...]:
+        """
+        Tabloların güncel sürümlerini döndürür
+
+        Args:
+            conn: Mevcut thread'in bağlantısı
+            tables: Sürümü istenen tablolar
+
+        Returns:
+            tables sırasıyla sürüm numaraları
+        """
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        seen = (id(conn), data_version, self._generation)
+        if getattr(self._local, 'seen', None) != seen:
+            self._reload(conn)
+            self._local.seen = seen
+
+        versions = self._versions
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Bilinen son sürümleri döndürür"""
+        with self._lock:
+            return dict(self._versions)
+
+def _clone(value: Any) -> Any:
+    """Önbellekteki sonucun çağırana verilecek kopyası (list/dict/tuple)"""
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return tuple(_clone(item) for item in value)
+    return value
+
+class QueryCache:
+    """
+    Okuma-içi (read-through) LRU/TTL sonuç önbelleği
+
+    Her kayıt, doldurulduğu andaki tablo sürümleriyle saklanır. Sürümlerden
+    biri değiştiğinde kayıt geçersiz sayılır ve yeniden yüklenir; TTL ise
+    sürüm tablosu olmayan veritabanları için üst sınırdır.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = 300.0):
+        """
+        Args:
+            max_entries: En fazla kayıt sayısı (aşılınca en eski kullanılan çıkar)
+            ttl: Kayıt ömrü (saniye, None ise süresiz)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, Tuple[int, ...], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'expired': 0, 'evictions': 0}
+
+    def get_or_load(self, key: Hashable, versions: Tuple[int, ...],
+                    loader: Callable[[], Any]) -> Any:
+        """
+        Kayıt geçerliyse önbellekten, değilse loader ile yükleyip döndürür
+
+        Args:
+            key: Önbellek anahtarı (sorgu ve parametreler)
+            versions: İlgili tabloların güncel sürümleri
+            loader: Önbellekte yoksa sonucu üreten fonksiyon
+
+        Returns:
+            Sonucun kopyası (önbellekteki nesne değiştirilemez)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_versions, expires_at = entry
+                if entry_versions != versions:
+                    self.stats['stale'] += 1
+                    del self._entries[key]
+                elif expires_at <= now:
+                    self.stats['expired'] += 1
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return _clone(value)
+            self.stats['misses'] += 1
+
+        # Yükleme kilit dışında yapılır; eşzamanlı iki miss aynı sonucu üretir
+        value = loader()
+        expires_at = now + self.ttl if self.ttl is not None else float('inf')
+
+        with self._lock:
+            self._entries[key] = (value, versions, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+        return _clone(value)
+
+    def clear(self):
+        """Tüm kayıtları siler"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            stats = dict(self.stats, size=len(self._entries),
+                         max_entries=self.max_entries, ttl=self.ttl)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
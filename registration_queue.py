@@ -0,0 +1,336 @@
+"""
+Kalıcı DPP blockchain kayıt kuyruğu ve arka plan worker havuzu
+Zero@Design projesi - /api/create-dpp isteğinden bağımsız zincir kaydı
+"""
+
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import logging
+
+from database_manager import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+# İş durumları
+JOB_STATUSES = ('pending', 'processing', 'confirmed', 'failed')
+
+class RegistrationQueue:
+    """
+    SQLite tabanlı kalıcı kayıt kuyruğu
+
+    Her DPP için tek bir iş vardır (dpp_id birincil anahtar); aynı DPP'nin
+    tekrar kuyruğa eklenmesi etkisizdir. İşler kiralama (lease) ile alınır:
+    işi alan worker çökerse kira süresi dolunca iş tekrar alınabilir.
+    Birden fazla gunicorn worker'ı aynı kuyruğu güvenle paylaşır.
+    """
+
+    def __init__(self, db_path: str = "data/registration_queue.db",
+                 max_attempts: int = 5, backoff_base: float = 2.0,
+                 backoff_max: float = 300.0):
+        """
+        Args:
+            db_path: Kuyruk veritabanı dosya yolu
+            max_attempts: Bir işin 'failed' sayılmadan önceki deneme sayısı
+            backoff_base: İlk yeniden deneme gecikmesi (saniye, her denemede iki katı)
+            backoff_max: En uzun yeniden deneme gecikmesi (saniye)
+        """
+        self.pool = ConnectionPool(db_path)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._create_table(self.pool.acquire())
+
+    def _create_table(self, conn: sqlite3.Connection):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS registration_jobs (
+                dpp_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                lease_until REAL,
+                last_error TEXT,
+                batch_id TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_registration_jobs_due "
+                     "ON registration_jobs (status, next_attempt_at)")
+        conn.commit()
+
+    def enqueue(self, dpp_id: str) -> Dict[str, Any]:
+        """
+        DPP'yi kayıt kuyruğuna ekler (idempotent)
+
+        Args:
+            dpp_id: DPP kimliği
+
+        Returns:
+            İşin güncel durumu
+        """
+        conn = self.pool.acquire()
+        now = datetime.now().isoformat()
+        conn.execute('''
+            INSERT OR IGNORE INTO registration_jobs
+            (dpp_id, status, next_attempt_at, created_at, updated_at)
+            VALUES (?, 'pending', ?, ?, ?)
+        ''', (dpp_id, time.time(), now, now))
+        conn.commit()
+        return self.get_status(dpp_id)
+
+    def enqueue_many(self, dpp_ids: List[str]) -> int:
+        """
+        DPP'leri tek transaction'da kuyruğa ekler (idempotent)
+
+        Returns:
+            Yeni eklenen iş sayısı
+        """
+        conn = self.pool.acquire()
+        now = datetime.now().isoformat()
+        before = conn.total_changes
+        conn.executemany('''
+            INSERT OR IGNORE INTO registration_jobs
+            (dpp_id, status, next_attempt_at, created_at, updated_at)
+            VALUES (?, 'pending', ?, ?, ?)
+        ''', [(dpp_id, time.time(), now, now) for dpp_id in dpp_ids])
+        conn.commit()
+        return conn.total_changes - before
+
+    def claim(self, limit: int, lease_seconds: float = 60.0,
+              min_batch: int = 1, max_wait: float = 0.0) -> List[str]:
+        """
+        Zamanı gelmiş işleri kiralar
+
+        Yeterli iş birikmediyse (min_batch) ve en eski iş max_wait
+        saniyeden genç ise hiçbir iş alınmaz; böylece Merkle batch'leri dolu
+        tutulur.
+
+        Args:
+            limit: En fazla alınacak iş sayısı
+            lease_seconds: Kira süresi
+            min_batch: Hemen işlemek için gereken en az iş sayısı
+            max_wait: Bu süreyi aşan iş varsa batch dolmasa da işlenir
+
+        Returns:
+            Kiralanan dpp_id'ler
+        """
+        conn = self.pool.acquire()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            due = '''
+                (status = 'pending' AND next_attempt_at <= :now)
+                OR (status = 'processing' AND lease_until < :now)
+            '''
+            count, oldest = conn.execute(
+                f"SELECT COUNT(*), MIN(next_attempt_at) FROM registration_jobs WHERE {due}",
+                {'now': now}
+            ).fetchone()
+            if not count or (count < min_batch and now - oldest < max_wait):
+                conn.commit()
+                return []
+
+            ids = [row[0] for row in conn.execute(
+                f"SELECT dpp_id FROM registration_jobs WHERE {due} "
+                f"ORDER BY next_attempt_at LIMIT :limit",
+                {'now': now, 'limit': limit}
+            )]
+            conn.executemany('''
+                UPDATE registration_jobs
+                SET status = 'processing', attempts = attempts + 1,
+                    lease_until = ?, updated_at = ?
+                WHERE dpp_id = ?
+            ''', [(now + lease_seconds, datetime.now().isoformat(), dpp_id) for dpp_id in ids])
+            conn.commit()
+            return ids
+        except Exception:
+            conn.rollback()
+            raise
+
+    def complete(self, dpp_ids: List[str], batch_id: Optional[str] = None):
+        """İşleri onaylanmış olarak işaretler"""
+        conn = self.pool.acquire()
+        now = datetime.now().isoformat()
+        conn.executemany('''
+            UPDATE registration_jobs
+            SET status = 'confirmed', lease_until = NULL, last_error = NULL,
+                batch_id = COALESCE(?, batch_id), updated_at = ?
+            WHERE dpp_id = ?
+        ''', [(batch_id, now, dpp_id) for dpp_id in dpp_ids])
+        conn.commit()
+
+    def fail(self, dpp_ids: List[str], error: str):
+        """
+        Başarısız işleri üstel geri çekilme (backoff) ile yeniden planlar;
+        deneme hakkı biten işler 'failed' olur
+        """
+        conn = self.pool.acquire()
+        now = time.time()
+        updated_at = datetime.now().isoformat()
+        placeholders = ','.join('?' for _ in dpp_ids)
+        rows = conn.execute(
+            f"SELECT dpp_id, attempts FROM registration_jobs WHERE dpp_id IN ({placeholders})",
+            dpp_ids
+        ).fetchall()
+
+        updates = []
+        for dpp_id, attempts in rows:
+            if attempts >= self.max_attempts:
+                updates.append(('failed', now, error, updated_at, dpp_id))
+            else:
+                delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+                delay *= random.uniform(0.8, 1.2)  # Worker'lar aynı anda denemesin
+                updates.append(('pending', now + delay, error, updated_at, dpp_id))
+        conn.executemany('''
+            UPDATE registration_jobs
+            SET status = ?, next_attempt_at = ?, lease_until = NULL,
+                last_error = ?, updated_at = ?
+            WHERE dpp_id = ?
+        ''', updates)
+        conn.commit()
+
+    def get_status(self, dpp_id: str) -> Optional[Dict[str, Any]]:
+        """İşin durumunu döndürür (yoksa None)"""
+        row = self.pool.acquire().execute(
+            "SELECT * FROM registration_jobs WHERE dpp_id = ?", (dpp_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['next_attempt_at'] = datetime.fromtimestamp(job['next_attempt_at']).isoformat()
+        job.pop('lease_until')
+        return job
+
+    def get_stats(self) -> Dict[str, int]:
+        """Durum bazında iş sayıları"""
+        counts = {status: 0 for status in JOB_STATUSES}
+        for status, count in self.pool.acquire().execute(
+            "SELECT status, COUNT(*) FROM registration_jobs GROUP BY status"
+        ):
+            counts[status] = count
+        return counts
+
+class RegistrationWorkerPool:
+    """
+    Kuyruktaki işleri Merkle batch'leri halinde zincire kaydeden worker'lar
+
+    Her worker kuyruktan en fazla batch_size iş kiralar, DPP'leri yükler ve
+    MerkleAnchorService.anchor_batch ile tek işlemde sabitler. Zincir hatası
+    tüm batch'i backoff ile yeniden planlar.
+    """
+
+    def __init__(self, queue: RegistrationQueue, dpp_storage, anchor_service,
+                 workers: int = 2, batch_size: int = 256, max_wait: float = 5.0,
+                 poll_interval: float = 0.5, lease_seconds: float = 60.0):
+        """
+        Args:
+            queue: Kayıt kuyruğu
+            dpp_storage: DPP'lerin yükleneceği DPPStorage
+            anchor_service: Merkle kökünü sabitleyen MerkleAnchorService
+            workers: Worker thread sayısı
+            batch_size: Batch başına en fazla DPP
+            max_wait: Batch dolmasa da işlenmeden önceki en uzun bekleme (saniye)
+            poll_interval: Boş kuyrukta yoklama aralığı (saniye)
+            lease_seconds: İş kira süresi (saniye)
+        """
+        self.queue = queue
+        self.dpp_storage = dpp_storage
+        self.anchor_service = anchor_service
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Worker thread'lerini başlatır"""
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f'dpp-registration-{i}', daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Worker'ları durdurur (yarım kalan işler kira süresi sonunda tekrar alınır)"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.process_once()
+            except Exception as e:
+                logger.error(f"Kayıt worker hatası: {str(e)}")
+                processed = 0
+            if not processed:
+                self._stop.wait(self.poll_interval)
+
+    def process_once(self, min_batch: Optional[int] = None) -> int:
+        """
+        Bir batch işler
+
+        Args:
+            min_batch: Hemen işlemek için gereken en az iş (varsayılan: batch_size)
+
+        Returns:
+            İşlenen iş sayısı
+        """
+        dpp_ids = self.queue.claim(
+            self.batch_size, self.lease_seconds,
+            min_batch=self.batch_size if min_batch is None else min_batch,
+            max_wait=self.max_wait
+        )
+        if not dpp_ids:
+            return 0
+
+        batch, done, missing = [], [], []
+        for dpp_id in dpp_ids:
+            dpp = self.dpp_storage.load_dpp(dpp_id)
+            if dpp is None:
+                missing.append(dpp_id)
+                continue
+            receipt = self.anchor_service.make_receipt(dpp)
+            # İdempotans: aynı içerik zaten sabitlendiyse yeniden kaydetme
+            record = self.anchor_service.storage.load_blockchain_record(dpp_id)
+            if record and record.get('status') == 'confirmed' \
+                    and record.get('metadata_hash') == receipt['metadata_hash']:
+                done.append(dpp_id)
+            else:
+                batch.append(receipt)
+
+        if missing:
+            self.queue.fail(missing, 'DPP bulunamadı')
+        if done:
+            self.queue.complete(done)
+        if not batch:
+            return len(dpp_ids)
+
+        batch_ids = [item['dpp_id'] for item in batch]
+        try:
+            anchor = self.anchor_service.anchor_batch(batch)
+        except Exception as e:
+            anchor = {'success': False, 'error': str(e)}
+
+        if 'batch_id' in anchor:
+            self.queue.complete(batch_ids, anchor['batch_id'])
+        else:
+            self.queue.fail(batch_ids, anchor.get('error') or 'Merkle kökü sabitlenemedi')
+        return len(dpp_ids)
+
+    def drain(self, timeout: float = 30.0):
+        """Zamanı gelmiş tüm işleri batch beklemeden işler (test ve kapanış için)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.process_once(min_batch=1):
+            pass
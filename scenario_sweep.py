@@ -0,0 +1,262 @@
+"""
+Zero@Design - What-if Senaryo Izgarası
+Ağırlık, lif değişim oranı ve işlem bayrağı kombinasyonlarının kartezyen
+ızgarasını tek vektörel geçişte hesaplar ve baskın noktaları ayıklar
+"""
+
+import time
+from itertools import product as combinations
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from co2_engine import (CO2Engine, CollectionMatrix, DEFAULT_FIBER, DEFAULT_WEIGHT, ECO_PROCESSES,
+                        PROCESS_FLAGS, SUSTAINABLE_SUBSTITUTES, WEIGHT_OPTIMIZATION_FACTOR)
+from collection_optimizer import intervention_cost
+
+# Varsayılan eksenler
+DEFAULT_WEIGHT_FACTORS = {'min': 0.7, 'max': 1.0, 'steps': 7}
+DEFAULT_SUBSTITUTIONS = (0, 25, 50, 75, 100)
+
+# Eksen başına ve toplam en fazla ızgara noktası
+MAX_AXIS_STEPS = 1000
+MAX_GRID_POINTS = 200000
+
+# Düşük etkili senaryonun açtığı bayrak sayısı (işlem maliyeti bayrak başına bölünür)
+ECO_FLAG_COUNT = sum(bool(value) for fields in ECO_PROCESSES.values() for value in fields.values())
+
+def _axis(values: Any, name: str) -> List[float]:
+    """Liste veya {'min', 'max', 'steps'} aralığını değer listesine çevirir"""
+    if isinstance(values, dict):
+        steps = int(values.get('steps', 2))
+        if not 1 <= steps <= MAX_AXIS_STEPS:
+            raise ValueError(f"{name}.steps 1-{MAX_AXIS_STEPS} arasında olmalı")
+        values = np.linspace(float(values['min']), float(values['max']), steps).tolist()
+    if not isinstance(values, (list, tuple)) or not values:
+        raise ValueError(f"{name} boş olmayan bir liste veya aralık olmalı")
+    if len(values) > MAX_AXIS_STEPS:
+        raise ValueError(f"{name} en fazla {MAX_AXIS_STEPS} değer içerebilir")
+    # Tekrarlar atılır, sıra korunur
+    return list(dict.fromkeys(round(float(value), 6) for value in values))
+
+class ScenarioSweep:
+    """
+    Tek ürün için kartezyen what-if ızgarası
+
+    Eksenler: ağırlık çarpanı, sürdürülebilir alternatife geçen lif oranı
+    (%0-100, SUSTAINABLE_SUBSTITUTES) ve değiştirilen işlem bayraklarının tüm
+    kombinasyonları. Her değişim oranı için lif kompozisyonu bir kez
+    kodlanır; ızgara bu kompozisyonların indekslenmesiyle tek CollectionMatrix
+    olarak kurulur ve CO2Engine ile hesaplanır. Böylece her nokta, aynı varyant
+    ürünün analyze_product sonucuyla birebir aynıdır.
+
+    Maliyet puanı CollectionOptimizer ile aynı ölçektedir: tam lif değişimi,
+    düşük etkili işlem senaryosu ve %20 ağırlık azaltma birer müdahaledir;
+    kısmi değişimler orantılı maliyetlendirilir. Budamada maliyet ve CO₂
+    açısından baskın olunan noktalar atılır.
+    """
+
+    def __init__(self, engine: CO2Engine, difficulty_weight: float = 1.0):
+        """
+        Args:
+            engine: Vektörel CO₂ motoru
+            difficulty_weight: Zorluğun maliyete göre ağırlığı
+        """
+        self.engine = engine
+        self.costs = {name: intervention_cost(name, difficulty_weight)
+                      for name in ('sustainable_fibers', 'eco_processes', 'weight_optimization')}
+
+    def variant_composition(self, fiber_composition: List[Dict[str, Any]],
+                            substitution: float) -> List[Dict[str, Any]]:
+        """
+        Liflerin substitution yüzdesini sürdürülebilir alternatifine aktarır
+
+        Örn. %60 Pamuk, substitution=50 → %30 Pamuk + %30 Organik Pamuk
+        """
+        variant = []
+        for fiber in fiber_composition:
+            fiber_type = fiber.get('type', DEFAULT_FIBER)
+            percentage = fiber.get('percentage', 0)
+            substitute = SUSTAINABLE_SUBSTITUTES.get(fiber_type)
+            if substitute is None or substitution <= 0:
+                variant.append({'type': fiber_type, 'percentage': percentage})
+            elif substitution >= 100:
+                variant.append({'type': substitute, 'percentage': percentage})
+            else:
+                variant.append({'type': fiber_type, 'percentage': percentage * (100 - substitution) / 100})
+                variant.append({'type': substitute, 'percentage': percentage * substitution / 100})
+        return variant
+
+    def sweep(self, product: Dict[str, Any], weight_factors: Any = None, substitutions: Any = None,
+              process_flags: Optional[Sequence[str]] = None, prune: bool = True) -> Dict[str, Any]:
+        """
+        Izgarayı hesaplar
+
+        Args:
+            product: analyze_product biçiminde ürün
+            weight_factors: Ağırlık çarpanları listesi veya {'min', 'max', 'steps'}
+            substitutions: Lif değişim yüzdeleri listesi veya aralık
+            process_flags: Değiştirilecek işlem bayrakları (ör. 'naturalDye');
+                           None ise tümü. Diğer bayraklar üründeki gibi kalır.
+            prune: True ise yalnızca maliyet-CO₂ Pareto noktaları döner
+
+        Returns:
+            base (ürünün kendisi), grid_size, returned ve points (nokta
+            sözlükleri üreten iterator; maliyete göre artan sırada)
+
+        Raises:
+            ValueError: Geçersiz eksen veya çok büyük ızgara
+        """
+        fiber_composition = product.get('fiberComposition', [])
+        processes = product.get('processes', {})
+        weight = product.get('weight', DEFAULT_WEIGHT)
+
+        factors = _axis(weight_factors if weight_factors is not None else DEFAULT_WEIGHT_FACTORS,
+                        'weight_factors')
+        if min(factors) <= 0:
+            raise ValueError('weight_factors pozitif olmalı')
+        # Değiştirilebilir lif yoksa değişim ekseni tek noktaya iner
+        if any(fiber.get('type', DEFAULT_FIBER) in SUSTAINABLE_SUBSTITUTES for fiber in fiber_composition):
+            substitutions = _axis(substitutions if substitutions is not None else list(DEFAULT_SUBSTITUTIONS),
+                                  'substitutions')
+            if min(substitutions) < 0 or max(substitutions) > 100:
+                raise ValueError('substitutions 0-100 arasında olmalı')
+        else:
+            substitutions = [0.0]
+
+        fields = [field for _, field in PROCESS_FLAGS]
+        varied = list(dict.fromkeys(process_flags)) if process_flags is not None else fields
+        unknown = set(varied) - set(fields)
+        if unknown:
+            raise ValueError(f"Bilinmeyen işlem bayrakları: {', '.join(sorted(unknown))}")
+
+        size = len(factors) * len(substitutions) * 2 ** len(varied)
+        if size > MAX_GRID_POINTS:
+            raise ValueError(f"Izgara {size} nokta; en fazla {MAX_GRID_POINTS}")
+
+        engine = self.engine
+        current = {field: bool(processes.get(group, {}).get(field)) for group, field in PROCESS_FLAGS}
+        combos = np.array(list(combinations((False, True), repeat=len(varied))), dtype=bool) \
+            .reshape(-1, len(varied))
+        flag_values = {field: combos[:, varied.index(field)] if field in varied
+                       else np.full(len(combos), current[field]) for field in fields}
+
+        # Değişim oranı başına kompozisyon (lif katkısı da oran başına bir kez)
+        variants = engine.encode([{'fiberComposition': self.variant_composition(fiber_composition, s)}
+                                  for s in substitutions])
+        fiber_co2 = engine._fabric_co2(variants)
+
+        s_index, p_index, w_index = np.indices((len(substitutions), len(combos), len(factors))).reshape(3, -1)
+        weight_values = np.array(factors) * weight
+        matrix = CollectionMatrix(variants.fibers, variants.slot_fibers[:, s_index],
+                                  variants.slot_percentages[:, s_index],
+                                  {field: values[p_index] for field, values in flag_values.items()},
+                                  weight_values[w_index])
+        co2 = engine._co2(fiber_co2[s_index], engine._process_co2(matrix.flags), matrix.weights)
+        scores = engine._scores(matrix, co2)
+
+        base = engine.analyze_collection([product])
+        base_co2 = float(base['current_co2'][0])
+        reductions = engine._reduction(np.full(len(co2), base_co2), co2)
+
+        # Maliyet: orantılı lif değişimi + yeni açılan bayraklar + ağırlık azaltımı
+        enabled = sum((flag_values[field] & ~current[field]).astype(np.float64) for field in fields)
+        cost = (np.array(substitutions) / 100 * self.costs['sustainable_fibers'])[s_index] \
+            + (enabled / ECO_FLAG_COUNT * self.costs['eco_processes'])[p_index] \
+            + (np.clip(1 - np.array(factors), 0, None) / (1 - WEIGHT_OPTIMIZATION_FACTOR)
+               * self.costs['weight_optimization'])[w_index]
+        cost = np.round(cost, 2)
+
+        if prune:
+            order = np.lexsort((co2, cost))
+            # Daha ucuz (veya eşit maliyette önceki) hiçbir noktadan daha az CO₂'li olmayan atılır
+            best_before = np.minimum.accumulate(np.concatenate(([np.inf], co2[order][:-1])))
+            order = order[co2[order] < best_before]
+        else:
+            order = np.arange(len(co2))
+
+        # İşlem sözlükleri kombinasyon başına bir kez kurulur; noktalar paylaşır
+        groups = list(dict.fromkeys(group for group, _ in PROCESS_FLAGS))
+        combo_processes = [{group: {field: bool(flag_values[field][p]) for g, field in PROCESS_FLAGS if g == group}
+                            for group in groups} for p in range(len(combos))]
+        columns = {name: values[order].tolist() for name, values in (
+            ('s', s_index), ('p', p_index), ('w', w_index), ('weight', matrix.weights), ('co2', co2),
+            ('reduction', reductions), ('score', scores), ('cost', cost))}
+
+        def points() -> Iterator[Dict[str, Any]]:
+            for k in range(len(order)):
+                yield {
+                    'weight_factor': factors[columns['w'][k]],
+                    'weight': round(columns['weight'][k], 1),
+                    'substitution': substitutions[columns['s'][k]],
+                    'processes': combo_processes[columns['p'][k]],
+                    'co2': columns['co2'][k],
+                    'reduction': columns['reduction'][k],
+                    'sustainability_score': columns['score'][k],
+                    'cost': columns['cost'][k]
+                }
+
+        return {
+            'base': {'co2': base_co2, 'sustainability_score': int(base['sustainability_score'][0])},
+            'axes': {'weight_factors': factors, 'substitutions': substitutions, 'process_flags': varied},
+            'grid_size': int(len(co2)),
+            'returned': int(len(order)),
+            'points': points()
+        }
+
+def benchmark_sweep(weight_steps: int = 21, substitution_steps: int = 11) -> Dict[str, Any]:
+    """
+    Izgarayı varyant başına analiz döngüsüyle karşılaştırır
+
+    Returns:
+        Izgara boyutu, vektörel ve döngü süreleri, Pareto nokta sayısı ve
+        tekil hesapla fark sayısı
+    """
+    from ai_agent import ai_agent
+
+    product = {
+        'fiberComposition': [{'type': 'Pamuk', 'percentage': 60}, {'type': 'Polyester', 'percentage': 35},
+                             {'type': 'Elastan', 'percentage': 5}],
+        'processes': {'dyeing': {'lowImpactDye': True}},
+        'weight': 350
+    }
+    sweeper = ScenarioSweep(ai_agent.co2_engine)
+    axes = {'weight_factors': {'min': 0.6, 'max': 1.0, 'steps': weight_steps},
+            'substitutions': {'min': 0, 'max': 100, 'steps': substitution_steps}}
+
+    started = time.perf_counter()
+    result = sweeper.sweep(product, prune=False, **axes)
+    points = list(result['points'])
+    vector_seconds = time.perf_counter() - started
+    pareto = sweeper.sweep(product, **axes)['returned']
+
+    started = time.perf_counter()
+    mismatches = 0
+    for point in points:
+        composition = sweeper.variant_composition(product['fiberComposition'], point['substitution'])
+        co2 = ai_agent._calculate_co2(composition, point['processes'], point['weight_factor'] * product['weight'])
+        score = ai_agent._calculate_sustainability_score(composition, point['processes'], co2)
+        if co2 != point['co2'] or score != point['sustainability_score']:
+            mismatches += 1
+    loop_seconds = time.perf_counter() - started
+
+    return {
+        'grid_size': result['grid_size'],
+        'pareto_points': pareto,
+        'vector_seconds': round(vector_seconds, 3),
+        'loop_seconds': round(loop_seconds, 3),
+        'mismatches': mismatches
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Zero@Design what-if senaryo ızgarası")
+    parser.add_argument('--weight-steps', type=int, default=21, help='Ağırlık ekseni adım sayısı')
+    parser.add_argument('--substitution-steps', type=int, default=11, help='Lif değişim ekseni adım sayısı')
+    args = parser.parse_args()
+
+    result = benchmark_sweep(args.weight_steps, args.substitution_steps)
+    print(f"📊 {result['grid_size']:,} varyant: vektörel {result['vector_seconds']} s, "
+          f"döngü {result['loop_seconds']} s, Pareto noktası {result['pareto_points']}")
+    print(f"✅ Tekil hesapla fark: {result['mismatches']}")
@@ -0,0 +1,282 @@
+"""
+Zero@Design - Tam Metin Arama İndeksi
+Referans tabloları için SQLite FTS5 tabanlı, Türkçe duyarlı arama indeksi
+"""
+
+import functools
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, List, Optional, Any
+
+# FTS5 sanal tablo adı
+SEARCH_TABLE = 'search_index'
+
+# İndekslenen tablolar ve kolon eşlemeleri
+# code: indeks rowid'si için sabit tablo kodu (rowid = code << 40 | id)
+# title: başlık kolonu, body: açıklama kolonları, category: kategori kolonları
+SEARCH_SOURCES = {
+    'finished_product_operations': {
+        'code': 1,
+        'title': ['operation_type'],
+        'body': ['description', 'applicable_product_groups', 'notes'],
+        'category': ['category'],
+        'order_by': 'category, operation_type'
+    },
+    'garment_processes': {
+        'code': 2,
+        'title': ['process_step'],
+        'body': ['description', 'applicable_product_groups', 'notes'],
+        'category': ['category'],
+        'order_by': 'category, process_step'
+    },
+    'master_co2_data': {
+        'code': 3,
+        'title': ['operation'],
+        'body': ['description', 'applicable_product_groups', 'notes'],
+        'category': ['upper_category', 'category'],
+        'order_by': 'upper_category, category, operation'
+    },
+    'master_konfeksiyon': {
+        'code': 4,
+        'title': ['name'],
+        'body': ['description', 'type', 'stage'],
+        'category': ['category'],
+        'order_by': 'category, name'
+    },
+    'product_fabric_co2': {
+        'code': 5,
+        'title': ['product', 'composition'],
+        'body': ['fabric_type', 'usage_hint', 'gender'],
+        'category': ['category'],
+        'order_by': 'gender, category, product'
+    }
+}
+
+# bm25 kolon ağırlıkları: title, body, category
+BM25_WEIGHTS = (10.0, 2.0, 5.0)
+
+# Kaynak kayıt id'leri için ayrılan bit sayısı
+ROWID_SHIFT = 40
+
+# Artımlı güncellemede tek sorguda kullanılan en fazla id sayısı
+ID_BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+def normalize_tr(text: Any) -> str:
+    """
+    Türkçe duyarlı metin normalizasyonu
+
+    Türkçe büyük/küçük harf kurallarını uygular (I → ı, İ → i), ardından
+    noktasız ı'yı ve aksanlı harfleri (ç, ğ, ö, ş, ü) ASCII karşılıklarına
+    indirger. Böylece "Işık", "ışık" ve "isik" aynı terime eşlenir.
+
+    Args:
+        text: Normalize edilecek değer (None ve NaN boş string döner)
+
+    Returns:
+        Normalize edilmiş küçük harfli metin
+    """
+    if text is None or (isinstance(text, float) and text != text):
+        return ''
+
+    text = str(text).replace('I', 'ı').replace('İ', 'i').lower()
+    text = text.replace('ı', 'i')
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def build_match_query(search_term: str) -> Optional[str]:
+    """
+    Kullanıcı arama terimini FTS5 MATCH ifadesine çevirir
+
+    Her kelime normalize edilir, tırnak içine alınır ve önek eşleşmesi için
+    '*' eklenir. Kelimeler AND ile birleşir.
+
+    Args:
+        search_term: Kullanıcı arama terimi
+
+    Returns:
+        MATCH ifadesi veya terim boşsa None
+    """
+    tokens = _TOKEN_RE.findall(normalize_tr(search_term))
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+# Referans kolonlarının çoğu düşük kardinaliteli (kategori, ürün, kumaş tipi);
+# toplu indekslemede aynı değerler tekrar tekrar normalize edilmez
+_cached_normalize_tr = functools.lru_cache(maxsize=65536)(normalize_tr)
+
+def register_functions(conn: sqlite3.Connection):
+    """Bağlantıya tr_norm SQL fonksiyonunu kaydeder"""
+    conn.create_function('tr_norm', 1, _cached_normalize_tr, deterministic=True)
+
+def create_search_index(conn: sqlite3.Connection):
+    """FTS5 arama tablosunu oluşturur"""
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            title,
+            body,
+            category,
+            source_table UNINDEXED,
+            source_id UNINDEXED,
+            tokenize = "unicode61 remove_diacritics 2"
+        )
+    ''')
+
+def migrate_search_index(conn: sqlite3.Connection):
+    """Tablo kodlu rowid'lerden önce oluşturulmuş indeksi yeniden oluşturur"""
+    legacy = conn.execute(f"SELECT 1 FROM {SEARCH_TABLE} WHERE rowid < ? LIMIT 1",
+                          (1 << ROWID_SHIFT,)).fetchone()
+    if legacy:
+        conn.execute(f"DELETE FROM {SEARCH_TABLE}")
+        rebuild_search_index(conn)
+
+def _concat_expr(columns: List[str]) -> str:
+    """Kolonları ayrı ayrı normalize edip boşlukla birleştiren SQL ifadesi"""
+    return " || ' ' || ".join(f"tr_norm({column})" for column in columns)
+
+def _rowid_expr(table: str) -> str:
+    """Kaynak tablo id'sinden indeks rowid'si üreten SQL ifadesi"""
+    return f"({SEARCH_SOURCES[table]['code']} << {ROWID_SHIFT}) | id"
+
+def _insert_select(table: str, where: str = '') -> str:
+    """Kaynak tablodan indekse INSERT ... SELECT sorgusu"""
+    source = SEARCH_SOURCES[table]
+    return f'''
+        INSERT INTO {SEARCH_TABLE} (rowid, title, body, category, source_table, source_id)
+        SELECT {_rowid_expr(table)},
+               {_concat_expr(source['title'])},
+               {_concat_expr(source['body'])},
+               {_concat_expr(source['category'])},
+               ?, id
+        FROM {table} {where}
+    '''
+
+def rebuild_search_index(conn: sqlite3.Connection, tables: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Verilen tabloların arama indeksini kaynak tablolardan yeniden oluşturur
+
+    Çağıran taraf commit işleminden sorumludur; böylece import ile indeks
+    güncellemesi aynı transaction içinde kalabilir.
+
+    Args:
+        conn: SQLite bağlantısı
+        tables: İndekslenecek tablolar (varsayılan: tümü)
+
+    Returns:
+        Tablo bazında indekslenen kayıt sayıları
+    """
+    register_functions(conn)
+    create_search_index(conn)
+
+    counts = {}
+    for table in tables or SEARCH_SOURCES.keys():
+        low = SEARCH_SOURCES[table]['code'] << ROWID_SHIFT
+        conn.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid >= ? AND rowid < ?",
+                     (low, low + (1 << ROWID_SHIFT)))
+        cursor = conn.execute(_insert_select(table), (table,))
+        counts[table] = cursor.rowcount
+
+    return counts
+
+def update_search_index(conn: sqlite3.Connection, table: str,
+                        upserted_ids: List[int], deleted_ids: List[int]):
+    """
+    Yalnızca değişen kayıtların indeks satırlarını günceller
+
+    Rowid kaynak id'den türetildiği için silme ve ekleme işlemleri tablo
+    boyutundan bağımsız, değişen kayıt sayısıyla orantılıdır.
+
+    Args:
+        conn: SQLite bağlantısı (commit çağırana aittir)
+        table: Kaynak tablo
+        upserted_ids: Eklenen veya güncellenen kayıt id'leri
+        deleted_ids: Silinen kayıt id'leri
+    """
+    register_functions(conn)
+    code = SEARCH_SOURCES[table]['code'] << ROWID_SHIFT
+
+    stale_ids = list(upserted_ids) + list(deleted_ids)
+    for start in range(0, len(stale_ids), ID_BATCH_SIZE):
+        conn.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = ?",
+                         [(code | record_id,) for record_id in stale_ids[start:start + ID_BATCH_SIZE]])
+
+    upserted_ids = list(upserted_ids)
+    for start in range(0, len(upserted_ids), ID_BATCH_SIZE):
+        batch = upserted_ids[start:start + ID_BATCH_SIZE]
+        placeholders = ','.join('?' for _ in batch)
+        conn.execute(_insert_select(table, f"WHERE id IN ({placeholders})"), (table, *batch))
+
+def search(conn: sqlite3.Connection, search_term: str, limit: int = 50, offset: int = 0,
+           tables: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    İndekste sıralı (bm25) ve sayfalı arama yapar
+
+    Args:
+        conn: SQLite bağlantısı (row_factory = sqlite3.Row)
+        search_term: Arama terimi
+        limit: Sayfa boyutu
+        offset: Atlanacak kayıt sayısı
+        tables: Aranacak tablolar (varsayılan: tümü)
+
+    Returns:
+        Sıralı sonuçlar, tablo bazında gruplanmış kayıtlar ve toplamlar
+    """
+    tables = [t for t in (tables or SEARCH_SOURCES.keys()) if t in SEARCH_SOURCES]
+    results = {table: [] for table in tables}
+    response = {
+        'ranked': [],
+        'results': results,
+        'total': 0,
+        'totals_by_table': {table: 0 for table in tables},
+        'limit': limit,
+        'offset': offset
+    }
+
+    match = build_match_query(search_term)
+    if not match or not tables:
+        return response
+
+    table_filter = ','.join('?' for _ in tables)
+
+    for row in conn.execute(f'''
+        SELECT source_table, COUNT(*) AS count FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH ? AND source_table IN ({table_filter})
+        GROUP BY source_table
+    ''', (match, *tables)):
+        response['totals_by_table'][row[0]] = row[1]
+    response['total'] = sum(response['totals_by_table'].values())
+
+    hits = conn.execute(f'''
+        SELECT source_table, source_id, bm25({SEARCH_TABLE}, ?, ?, ?) AS score
+        FROM {SEARCH_TABLE}
+        WHERE {SEARCH_TABLE} MATCH ? AND source_table IN ({table_filter})
+        ORDER BY score
+        LIMIT ? OFFSET ?
+    ''', (*BM25_WEIGHTS, match, *tables, limit, offset)).fetchall()
+
+    # Sayfadaki kayıtları tablo başına tek sorguyla getir
+    ids_by_table = {}
+    for table, source_id, _ in hits:
+        ids_by_table.setdefault(table, []).append(source_id)
+
+    records = {}
+    for table, ids in ids_by_table.items():
+        placeholders = ','.join('?' for _ in ids)
+        for row in conn.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", ids):
+            records[(table, row['id'])] = dict(row)
+
+    for table, source_id, score in hits:
+        record = records.get((table, source_id))
+        if record is None:
+            continue
+        results[table].append(record)
+        response['ranked'].append({
+            'table': table,
+            'score': round(-score, 4),
+            'record': record
+        })
+
+    return response
@@ -0,0 +1,454 @@
+"""
+Zero@Design - Parçalı (Sharded) Dosya Deposu
+JSON kayıtlarını hash önekli alt klasörlerde, atomik yazma ile saklar
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from database_manager import ConnectionPool
+
+# Önek klasörü: anahtarın sha256 özetinin ilk iki hex karakteri (256 klasör)
+SHARD_WIDTH = 2
+
+# Grup yazmalarında paralel yazma ve fsync için en fazla thread sayısı
+FSYNC_WORKERS = 16
+
+# Paket dosyalarının klasörü (kök altında) ve anahtar → paket indeksi
+PACK_DIR = 'packs'
+PACK_INDEX_FILE = 'index.db'
+
+# Bellekte tutulan en fazla ayrıştırılmış paket sayısı
+PACK_CACHE_SIZE = 8
+
+_SHARD_RE = re.compile(r'^[0-9a-f]{%d}$' % SHARD_WIDTH)
+
+def shard_prefix(key: str) -> str:
+    """Anahtar için önek klasör adını döndürür"""
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:SHARD_WIDTH]
+
+def content_digest(data: Any) -> str:
+    """JSON verisinin kanonik (sıralı anahtar, boşluksuz) sha256 özeti"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def _encode_json(data: Any, indent: Optional[int]) -> str:
+    # json.dumps tek seferde (girintisizse C kodlayıcıyla) serileştirir;
+    # json.dump ise her zaman saf Python kodlayıcıyı parça parça çalıştırır
+    if indent is None:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, ensure_ascii=False, indent=indent)
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2):
+    """
+    JSON verisini önce geçici dosyaya yazar, sonra os.replace ile yerine koyar
+
+    Okuyucular hiçbir zaman yarım yazılmış dosya görmez; yazma yarıda
+    kalırsa eski dosya bozulmadan kalır.
+
+    Args:
+        path: Hedef dosya yolu
+        data: Yazılacak veri
+        indent: JSON girintisi (None ise boşluksuz tek satır)
+    """
+    atomic_write_json_many([(path, data)], indent)
+
+def _write_temp(path: str, payload: bytes) -> str:
+    """Hedef klasörde geçici dosyaya yazar ve fsync eder; geçici yolu döndürür"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.tmp')
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    os.close(fd)
+    return tmp_path
+
+def atomic_write_json_many(items: List[Tuple[str, Any]], indent: Optional[int] = 2):
+    """
+    Birden fazla JSON dosyasını grup halinde atomik yazar
+
+    Önce tüm geçici dosyalar yazılıp fsync edilir, en son os.replace ile
+    yerlerine konur. Grup yazmalarında geçici dosya oluşturma, yazma ve
+    fsync paralel thread'lerde yapılır (bu çağrılar GIL'i bırakır); dosya
+    sistemi eşzamanlı bekleyen fsync'leri tek günlük (journal) commit'inde
+    birleştirdiğinden grup, dosya başına bir disk beklemesi yerine birkaç
+    beklemeyle kalıcı olur. Yazma veya fsync hatasında hiçbir hedef dosya
+    değişmez.
+
+    Args:
+        items: (hedef yol, veri) listesi
+        indent: JSON girintisi (None ise boşluksuz tek satır)
+    """
+    payloads = [(path, _encode_json(data, indent).encode('utf-8')) for path, data in items]
+    for directory in {os.path.dirname(path) for path, _ in payloads}:
+        os.makedirs(directory, exist_ok=True)
+
+    if len(payloads) == 1:
+        path, payload = payloads[0]
+        os.replace(_write_temp(path, payload), path)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(FSYNC_WORKERS, len(payloads))) as executor:
+        futures = [executor.submit(_write_temp, path, payload) for path, payload in payloads]
+
+    written, error = [], None
+    for future, (path, _) in zip(futures, payloads):
+        try:
+            written.append((future.result(), path))
+        except BaseException as e:
+            error = error or e
+    if error is not None:
+        for tmp_path, _ in written:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        raise error
+    for tmp_path, path in written:
+        os.replace(tmp_path, path)
+
+def file_signature(path: str) -> Tuple[int, int, int]:
+    """
+    Dosyanın (inode, mtime_ns, boyut) imzası
+
+    atomic_write_json her yazmada yeni bir dosya (inode) oluşturduğu için
+    başka bir süreçteki kayıt da imzayı değiştirir.
+    """
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+def read_json(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class ShardedJSONStore:
+    """
+    Anahtar → JSON dosyası deposu
+
+    Dosyalar root/<önek>/<anahtar><suffix> yolunda tutulur. Eski düz
+    düzendeki (root/<anahtar><suffix>) dosyalar okunmaya devam eder ve
+    migrate_flat ile yeni düzene taşınır.
+    """
+
+    def __init__(self, root: str, suffix: str = '.json', indent: Optional[int] = 2):
+        """
+        Args:
+            root: Depo kök klasörü
+            suffix: Dosya uzantısı (anahtardan sonra eklenir)
+            indent: JSON girintisi
+        """
+        self.root = root
+        self.suffix = suffix
+        self.indent = indent
+
+    def path_for(self, key: str) -> str:
+        """Anahtarın parçalı düzendeki dosya yolu"""
+        return os.path.join(self.root, shard_prefix(key), key + self.suffix)
+
+    def legacy_path_for(self, key: str) -> str:
+        """Anahtarın eski düz düzendeki dosya yolu"""
+        return os.path.join(self.root, key + self.suffix)
+
+    def locate(self, key: str) -> Optional[str]:
+        """Anahtarın mevcut dosya yolunu bulur (yoksa None)"""
+        for path in (self.path_for(key), self.legacy_path_for(key)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def write(self, key: str, data: Any) -> str:
+        """Kaydı atomik olarak yazar ve dosya yolunu döndürür"""
+        path = self.path_for(key)
+        atomic_write_json(path, data, self.indent)
+        return path
+
+    def write_many(self, items: List[Tuple[str, Any]]) -> List[str]:
+        """Kayıtları grup halinde atomik yazar (atomic_write_json_many)"""
+        paths = [(self.path_for(key), data) for key, data in items]
+        atomic_write_json_many(paths, self.indent)
+        return [path for path, _ in paths]
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Kaydı okur (yoksa None)"""
+        path = self.locate(key)
+        return read_json(path) if path else None
+
+    def read_with_stat(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[Tuple[int, int, int]]]:
+        """
+        Kaydı dosya yolu ve dosya imzasıyla (file_signature) birlikte okur
+
+        İmza, önbellekteki kopyanın hâlâ güncel olup olmadığını tek bir
+        os.stat ile kontrol etmek için kullanılır.
+        """
+        path = self.locate(key)
+        if path is None:
+            return None, None, None
+        signature = file_signature(path)
+        return read_json(path), path, signature
+
+    def exists(self, key: str) -> bool:
+        return self.locate(key) is not None
+
+    def delete(self, key: str) -> bool:
+        """Kaydı her iki düzenden de siler"""
+        deleted = False
+        for path in (self.path_for(key), self.legacy_path_for(key)):
+            try:
+                os.remove(path)
+                deleted = True
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    def _keys_in(self, directory: str) -> Iterator[str]:
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(self.suffix) \
+                        and not entry.name.startswith('.'):
+                    yield entry.name[:-len(self.suffix)]
+
+    def iter_legacy_keys(self) -> Iterator[str]:
+        """Eski düz düzendeki anahtarlar"""
+        return self._keys_in(self.root)
+
+    def iter_keys(self) -> Iterator[str]:
+        """Depodaki tüm anahtarlar (parçalı ve eski düzen)"""
+        try:
+            with os.scandir(self.root) as entries:
+                shards = sorted(e.path for e in entries if e.is_dir() and _SHARD_RE.match(e.name))
+        except FileNotFoundError:
+            return
+        for shard in shards:
+            yield from self._keys_in(shard)
+        yield from self.iter_legacy_keys()
+
+    def migrate_flat(self) -> Dict[str, int]:
+        """
+        Eski düz düzendeki dosyaları önek klasörlerine taşır
+
+        Taşıma aynı dosya sistemi içinde os.replace ile yapılır (atomik).
+        Hedefte daha yeni bir kayıt varsa eski dosya silinir.
+
+        Returns:
+            moved ve skipped dosya sayıları
+        """
+        moved = skipped = 0
+        for key in list(self.iter_legacy_keys()):
+            source = self.legacy_path_for(key)
+            target = self.path_for(key)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                os.remove(source)
+                skipped += 1
+            else:
+                os.replace(source, target)
+                moved += 1
+        return {'moved': moved, 'skipped': skipped}
+
+class PackedJSONStore(ShardedJSONStore):
+    """
+    Paket (pack) destekli anahtar → JSON deposu
+
+    Tekil kayıtlar ShardedJSONStore gibi dosya başına yazılır. write_pack
+    ise bir grup kaydı root/packs/<paket>.json altında tek bir boşluksuz
+    JSON dosyasına yazar ve anahtar → paket eşlemesini SQLite indeksinde
+    (root/packs/index.db) tek transaction'da tutar; böylece toplu yazmalarda
+    kayıt başına dosya oluşturma, fsync ve os.replace maliyeti paket başına
+    bire iner.
+
+    Okumada önce paket indeksine, yoksa tekil dosyaya bakılır. Paketler
+    değişmezdir; tekil yazma anahtarı indeksten çıkarır, write_pack ise
+    indeksi yeni pakete yönlendirir. Böylece her iki yolda da en son yazılan
+    kopya geçerli olur.
+    """
+
+    def __init__(self, root: str, suffix: str = '.json', indent: Optional[int] = 2,
+                 pack_cache_size: int = PACK_CACHE_SIZE):
+        """
+        Args:
+            root: Depo kök klasörü
+            suffix: Tekil dosya uzantısı
+            indent: Tekil dosyaların JSON girintisi (paketler her zaman boşluksuz)
+            pack_cache_size: Bellekte tutulacak ayrıştırılmış paket sayısı
+        """
+        super().__init__(root, suffix, indent)
+        self.pack_root = os.path.join(root, PACK_DIR)
+        self.index_path = os.path.join(self.pack_root, PACK_INDEX_FILE)
+        self.pack_cache_size = pack_cache_size
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._packs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._packs_lock = threading.Lock()
+
+    def _index(self, create: bool = False):
+        """İndeks bağlantısı (indeks yoksa ve create=False ise None)"""
+        if self._pool is None:
+            if not create and not os.path.exists(self.index_path):
+                return None
+            with self._pool_lock:
+                if self._pool is None:
+                    os.makedirs(self.pack_root, exist_ok=True)
+                    pool = ConnectionPool(self.index_path)
+                    conn = pool.acquire()
+                    conn.execute('''
+                        CREATE TABLE IF NOT EXISTS pack_index (
+                            key TEXT PRIMARY KEY,
+                            pack TEXT NOT NULL
+                        )
+                    ''')
+                    conn.commit()
+                    self._pool = pool
+        return self._pool.acquire()
+
+    def pack_path(self, pack_id: str) -> str:
+        return os.path.join(self.pack_root, pack_id + '.json')
+
+    def is_pack_path(self, path: str) -> bool:
+        return os.path.dirname(path) == self.pack_root
+
+    def write_pack(self, items: List[Tuple[str, Any]]) -> str:
+        """
+        Kayıtları tek paket dosyasına yazar ve indekse ekler
+
+        Paket önce atomik yazılıp fsync edilir, indeks ardından güncellenir;
+        indekse girmemiş bir paket okunmaz. Aynı anahtarların parçalı
+        düzendeki eski tekil dosyaları commit'ten sonra silinir; böylece o
+        dosyaların imzasını izleyen önbellekler (başka süreçlerde de) kaydı
+        yeniden yükler. Düz düzendeki eski kopyalar indeks önce okunduğu
+        için zaten gölgede kalır.
+
+        Args:
+            items: (anahtar, veri) listesi
+
+        Returns:
+            Paket dosya yolu
+        """
+        pack_id = uuid.uuid4().hex
+        path = self.pack_path(pack_id)
+        atomic_write_json(path, dict(items), indent=None)
+
+        conn = self._index(create=True)
+        try:
+            conn.executemany("INSERT OR REPLACE INTO pack_index (key, pack) VALUES (?, ?)",
+                             [(key, pack_id) for key, _ in items])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        for key, _ in items:
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+        return path
+
+    def _unindex(self, keys: List[str]) -> int:
+        conn = self._index()
+        if conn is None:
+            return 0
+        try:
+            removed = conn.executemany("DELETE FROM pack_index WHERE key = ?",
+                                       [(key,) for key in keys]).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return removed
+
+    def write(self, key: str, data: Any) -> str:
+        """Kaydı tekil dosyaya yazar; paketteki eski kopyası indeksten çıkarılır"""
+        path = super().write(key, data)
+        self._unindex([key])
+        return path
+
+    def write_many(self, items: List[Tuple[str, Any]]) -> List[str]:
+        paths = super().write_many(items)
+        self._unindex([key for key, _ in items])
+        return paths
+
+    def _pack_of(self, key: str) -> Optional[str]:
+        conn = self._index()
+        if conn is None:
+            return None
+        row = conn.execute("SELECT pack FROM pack_index WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _load_pack(self, pack_id: str) -> Dict[str, Any]:
+        """Paketi okur (değişmez olduğu için önbellek imza kontrolü gerektirmez)"""
+        with self._packs_lock:
+            pack = self._packs.get(pack_id)
+            if pack is not None:
+                self._packs.move_to_end(pack_id)
+                return pack
+        pack = read_json(self.pack_path(pack_id))
+        if self.pack_cache_size:
+            with self._packs_lock:
+                self._packs[pack_id] = pack
+                while len(self._packs) > self.pack_cache_size:
+                    self._packs.popitem(last=False)
+        return pack
+
+    def read_with_stat(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[Tuple[int, int, int]]]:
+        """
+        Kaydı paketten, yoksa tekil dosyadan okur
+
+        Paketteki kayıt için dönen yol ve imza paket dosyasınındır; kayıt
+        önbellekle paylaşılmaması için kopyalanır.
+        """
+        pack_id = self._pack_of(key)
+        if pack_id is None:
+            return super().read_with_stat(key)
+        path = self.pack_path(pack_id)
+        signature = file_signature(path)
+        return copy.deepcopy(self._load_pack(pack_id)[key]), path, signature
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.read_with_stat(key)[0]
+
+    def exists(self, key: str) -> bool:
+        return self._pack_of(key) is not None or self.locate(key) is not None
+
+    def delete(self, key: str) -> bool:
+        """Kaydı tekil dosyalardan ve paket indeksinden siler"""
+        deleted = super().delete(key)
+        return self._unindex([key]) > 0 or deleted
+
+    def in_pack(self, key: str, path: str) -> bool:
+        """Anahtar hâlâ verilen paket dosyasına mı işaret ediyor"""
+        pack_id = self._pack_of(key)
+        return pack_id is not None and self.pack_path(pack_id) == path
+
+    def iter_keys(self) -> Iterator[str]:
+        """Tekil dosyalardaki ve paketlerdeki tüm anahtarlar (tekrarsız)"""
+        seen = set()
+        for key in super().iter_keys():
+            seen.add(key)
+            yield key
+        conn = self._index()
+        if conn is None:
+            return
+        for (key,) in conn.execute("SELECT key FROM pack_index ORDER BY rowid").fetchall():
+            if key not in seen:
+                yield key
@@ -0,0 +1,190 @@
+"""
+Zero@Design - Stil Kartı Deposu
+Stil kartlarını SQLite'ta saklayan, çoklu worker için güvenli depo
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from database_manager import ConnectionPool
+
+# Sayfa boyutu sınırları
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+class StyleCardStore:
+    """
+    Stil kartı deposu
+
+    Her kayıt tek bir INSERT ile eklenir (O(1)); id'ler SQLite AUTOINCREMENT
+    ile atomik olarak verilir. WAL modunda birden fazla gunicorn worker'ı
+    aynı anda yazabilir, yazmalar kaybolmaz. Kartın tamamı JSON olarak,
+    filtrelenen alanlar ise ayrıca indeksli kolonlarda tutulur.
+    """
+
+    def __init__(self, pool: ConnectionPool, legacy_file: Optional[str] = None):
+        """
+        Args:
+            pool: Veritabanı bağlantı havuzu
+            legacy_file: Eski style_cards.json dosyası (varsa bir kez taşınır)
+        """
+        self.pool = pool
+        self.legacy_file = legacy_file
+        self._ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = self.pool.acquire()
+        if not self._ready:
+            self._create_table(conn)
+            if self.legacy_file:
+                self._migrate_legacy_file(conn)
+            self._ready = True
+        return conn
+
+    def _create_table(self, conn: sqlite3.Connection):
+        """style_cards tablosunu ve indekslerini oluşturur"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS style_cards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_name TEXT,
+                product_category TEXT,
+                total_co2 REAL,
+                sustainability_score REAL,
+                created_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_style_cards_category "
+                     "ON style_cards (product_category, id)")
+        conn.commit()
+
+    def _migrate_legacy_file(self, conn: sqlite3.Connection):
+        """
+        Eski JSON dosyasındaki kartları id'lerini koruyarak tabloya taşır
+
+        BEGIN IMMEDIATE ile aynı anda başlayan worker'lardan yalnızca biri
+        taşıma yapar; dosya sonrasında .migrated uzantısıyla saklanır.
+        """
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                cards = json.load(f)
+        except FileNotFoundError:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM style_cards LIMIT 1").fetchone() is None:
+                conn.executemany(
+                    "INSERT INTO style_cards (id, product_name, product_category, total_co2, "
+                    "sustainability_score, created_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [self._row(card, card.get('id', index + 1), card.get('created_at'))
+                     for index, card in enumerate(cards)]
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        try:
+            os.replace(self.legacy_file, self.legacy_file + '.migrated')
+            print(f"✅ {len(cards)} stil kartı SQLite'a taşındı")
+        except FileNotFoundError:
+            pass  # Başka bir worker taşımayı tamamladı
+
+    def _row(self, card: Dict[str, Any], card_id: Optional[int], created_at: Optional[str]) -> tuple:
+        data = {key: value for key, value in card.items() if key not in ('id', 'created_at')}
+        return (
+            card_id,
+            card.get('productName'),
+            card.get('productCategory'),
+            self._number(card.get('totalCO2')),
+            self._number(card.get('sustainabilityScore')),
+            created_at or datetime.now().isoformat(),
+            json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        )
+
+    def _number(self, value: Any) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _card(self, row: sqlite3.Row) -> Dict[str, Any]:
+        card = json.loads(row['data'])
+        card['id'] = row['id']
+        card['created_at'] = row['created_at']
+        return card
+
+    def add(self, card: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Yeni stil kartı ekler
+
+        Args:
+            card: Stil kartı verisi
+
+        Returns:
+            id ve created_at eklenmiş kart
+        """
+        conn = self._connection()
+        created_at = datetime.now().isoformat()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO style_cards (id, product_name, product_category, total_co2, "
+                "sustainability_score, created_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row(card, None, created_at)
+            )
+            card_id = cursor.lastrowid
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return dict(card, id=card_id, created_at=created_at)
+
+    def get(self, card_id: int) -> Optional[Dict[str, Any]]:
+        """Id ile stil kartını getirir"""
+        row = self._connection().execute(
+            "SELECT * FROM style_cards WHERE id = ?", (card_id,)
+        ).fetchone()
+        return self._card(row) if row else None
+
+    def list_cards(self, after_id: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                   category: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Stil kartlarını id sırasıyla sayfalı (keyset) getirir
+
+        Args:
+            after_id: Bu id'den sonraki kartlar (önceki sayfanın next_cursor'ı)
+            limit: Sayfa boyutu (en fazla MAX_PAGE_SIZE)
+            category: Ürün kategorisi filtresi (tam eşleşme)
+
+        Returns:
+            style_cards ve sonraki sayfa için next_cursor (son sayfada None)
+        """
+        limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+        query = "SELECT * FROM style_cards WHERE id > ?"
+        params: List[Any] = [after_id]
+        if category:
+            query += " AND product_category = ?"
+            params.append(category)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connection().execute(query, params).fetchall()
+        cards = [self._card(row) for row in rows[:limit]]
+        return {
+            'style_cards': cards,
+            'next_cursor': cards[-1]['id'] if len(rows) > limit else None
+        }
+
+    def count(self, category: Optional[str] = None) -> int:
+        """Kart sayısını döndürür"""
+        if category:
+            row = self._connection().execute(
+                "SELECT COUNT(*) FROM style_cards WHERE product_category = ?", (category,)
+            ).fetchone()
+        else:
+            row = self._connection().execute("SELECT COUNT(*) FROM style_cards").fetchone()
+        return row[0]
@@ -0,0 +1,440 @@
+"""
+Zero@Design - Öneri Kural Tablosu
+suggestion_rules.json karar tablosunu derleyip ürün grupları üzerinde
+NumPy yüklem maskeleriyle değerlendirir
+"""
+
+import json
+import operator
+import os
+import string
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from co2_engine import DEFAULT_FIBER, PROCESS_FLAGS
+
+logger = logging.getLogger(__name__)
+
+# Varsayılan kural tablosu (kod ile birlikte dağıtılır)
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suggestion_rules.json')
+
+SCOPES = ('product', 'fiber')
+
+# Alan → tür; fiber kapsamındaki kurallar ürün alanlarını da kullanabilir
+PRODUCT_FIELDS = {
+    'current_co2': 'number',
+    'weight': 'number',
+    'category': 'text',
+    'target_market': 'text',
+    **{f'{group}.{field}': 'flag' for group, field in PROCESS_FLAGS}
+}
+FIBER_FIELDS = {
+    'fiber_type': 'text',
+    'percentage': 'number'
+}
+
+COMPARISONS = {
+    '==': np.equal,
+    '!=': np.not_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal
+}
+OPERATORS = tuple(COMPARISONS) + ('in', 'not_in', 'truthy', 'falsy')
+
+# Tekil ürün yolu için aynı karşılaştırmalar
+SCALAR_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le
+}
+
+# Bu boyuta kadar olan gruplar dizi kurulumu yerine ürün ürün değerlendirilir
+SCALAR_BATCH_LIMIT = 8
+
+# Açıklama şablonlarında kullanılabilen alanlar (render_description ile aynı)
+TEMPLATE_FIELDS = {
+    'product': ('current_co2', 'weight', 'category', 'target_market'),
+    'fiber': ('current_co2', 'weight', 'category', 'target_market', 'fiber_type', 'percentage')
+}
+
+SUGGESTION_FIELDS = ('type', 'title', 'description', 'impact', 'co2_reduction',
+                     'implementation_difficulty', 'cost_impact', 'confidence')
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _field_value(field: str, context: Dict[str, Any], fiber: Optional[Dict[str, Any]]) -> Any:
+    """Tekil yol için alan değeri (ProductBatch sütunlarıyla aynı dönüşümler)"""
+    if field == 'fiber_type':
+        return fiber.get('type', DEFAULT_FIBER)
+    if field == 'percentage':
+        return _number(fiber.get('percentage', 0))
+    if field in ('current_co2', 'weight'):
+        return _number(context.get(field))
+    if '.' in field:
+        group, flag = field.split('.', 1)
+        return bool((context.get('processes') or {}).get(group, {}).get(flag))
+    return context.get(field)
+
+class ProductBatch:
+    """
+    Kural değerlendirmesi için sütunlara açılmış ürün grubu
+
+    Ürün alanları (ürün sayısı,) dizileridir; lifler tüm ürünler için tek
+    düz listede tutulur (fiber_product ürün indeksini, fiber_slot
+    kompozisyondaki sırayı verir).
+    """
+
+    def __init__(self, contexts: Sequence[Dict[str, Any]]):
+        """
+        Args:
+            contexts: current_co2, fiberComposition, processes, weight,
+                      category ve target_market içeren ürün bağlamları
+        """
+        self.contexts = contexts
+        self.columns: Dict[str, np.ndarray] = {
+            'current_co2': np.array([_number(c.get('current_co2')) for c in contexts], dtype=np.float64),
+            'weight': np.array([_number(c.get('weight')) for c in contexts], dtype=np.float64),
+            'category': np.array([c.get('category') for c in contexts], dtype=object),
+            'target_market': np.array([c.get('target_market') for c in contexts], dtype=object)
+        }
+        for group, field in PROCESS_FLAGS:
+            self.columns[f'{group}.{field}'] = np.array(
+                [bool((c.get('processes') or {}).get(group, {}).get(field)) for c in contexts], dtype=bool)
+
+        owners: List[int] = []
+        slots: List[int] = []
+        self.fibers: List[Dict[str, Any]] = []
+        for index, context in enumerate(contexts):
+            for slot, fiber in enumerate(context.get('fiberComposition', [])):
+                owners.append(index)
+                slots.append(slot)
+                self.fibers.append(fiber)
+        self.fiber_product = np.array(owners, dtype=np.int64)
+        self.fiber_slot = np.array(slots, dtype=np.int64)
+        self.fiber_columns: Dict[str, np.ndarray] = {
+            'fiber_type': np.array([f.get('type', DEFAULT_FIBER) for f in self.fibers], dtype=object),
+            'percentage': np.array([_number(f.get('percentage', 0)) for f in self.fibers], dtype=np.float64)
+        }
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    def column(self, field: str, scope: str) -> np.ndarray:
+        """Alanın kapsam uzunluğundaki sütunu (fiber kapsamında ürün alanları yayılır)"""
+        if field in FIBER_FIELDS:
+            return self.fiber_columns[field]
+        column = self.columns[field]
+        return column[self.fiber_product] if scope == 'fiber' else column
+
+class CompiledRules:
+    """
+    Derlenmiş kural tablosu
+
+    Her benzersiz (kapsam, alan, operatör, değer) yüklemi bir kez
+    değerlendirilir ve maskesi aynı yüklemi kullanan tüm kurallarca
+    paylaşılır. Eşleşmeler özgün if/else zinciriyle aynı sırada döner:
+    tablo sırası, ardışık fiber kurallarında ise önce lif sırası.
+    """
+
+    def __init__(self, table: Dict[str, Any]):
+        """
+        Args:
+            table: {"version": ..., "rules": [...]} kural tablosu
+
+        Raises:
+            ValueError: Geçersiz kural
+        """
+        self.table_version = table.get('version')
+        self.rules: List[Dict[str, Any]] = []
+        self.predicates: Dict[Tuple, Tuple[str, str, str, Any]] = {}
+        group = -1
+        previous_scope = None
+
+        for index, rule in enumerate(table.get('rules', [])):
+            rule_id = rule.get('id', f'rule_{index}')
+            scope = rule.get('scope', 'product')
+            if scope not in SCOPES:
+                raise ValueError(f"{rule_id}: geçersiz kapsam '{scope}'")
+            suggestion = rule.get('suggestion', {})
+            missing = [field for field in SUGGESTION_FIELDS if field not in suggestion]
+            if missing:
+                raise ValueError(f"{rule_id}: eksik öneri alanları: {', '.join(missing)}")
+
+            self._check_template(rule_id, scope, suggestion['description'])
+            keys = [self._compile_predicate(rule_id, scope, condition) for condition in rule.get('when', [])]
+            # Ardışık fiber kuralları tek grup: lif lif sırayla değerlendirilir
+            if scope == 'product' or previous_scope != 'fiber':
+                group += 1
+            previous_scope = scope
+
+            self.rules.append({
+                'id': rule_id,
+                'scope': scope,
+                'group': group,
+                'predicates': keys,
+                'suggestion': {field: suggestion[field] for field in SUGGESTION_FIELDS},
+                'templated': '{' in suggestion['description']
+            })
+
+    @staticmethod
+    def _check_template(rule_id: str, scope: str, template: str):
+        """Açıklama şablonundaki alanların kapsamda tanımlı olduğunu doğrular"""
+        try:
+            # İç içe biçim belirteçleri ({percentage:{width}}) de alan içerir
+            pending, fields = [template], []
+            while pending:
+                for _, field, spec, _ in string.Formatter().parse(pending.pop()):
+                    if field is not None:
+                        fields.append(field)
+                        pending.append(spec or '')
+        except ValueError as e:
+            raise ValueError(f"{rule_id}: geçersiz açıklama şablonu: {e}")
+        for field in fields:
+            name = field.split('.', 1)[0].split('[', 1)[0]
+            if name not in TEMPLATE_FIELDS[scope]:
+                raise ValueError(f"{rule_id}: '{scope}' kapsamında açıklamada bilinmeyen alan '{{{field}}}' "
+                                 f"(kullanılabilir: {', '.join(TEMPLATE_FIELDS[scope])})")
+
+    def _compile_predicate(self, rule_id: str, scope: str, condition: Dict[str, Any]) -> Tuple:
+        field, op, value = condition.get('field'), condition.get('op'), condition.get('value')
+        fields = dict(PRODUCT_FIELDS, **FIBER_FIELDS) if scope == 'fiber' else PRODUCT_FIELDS
+        if field not in fields:
+            raise ValueError(f"{rule_id}: '{scope}' kapsamında bilinmeyen alan '{field}'")
+        if op not in OPERATORS:
+            raise ValueError(f"{rule_id}: geçersiz operatör '{op}'")
+        kind = fields[field]
+        if op in ('>', '>=', '<', '<=') and kind != 'number':
+            raise ValueError(f"{rule_id}: '{op}' yalnızca sayısal alanlarda kullanılabilir ({field})")
+        if op in ('in', 'not_in') and not isinstance(value, list):
+            raise ValueError(f"{rule_id}: '{op}' için değer liste olmalı")
+
+        key = (scope, field, op, json.dumps(value, sort_keys=True))
+        self.predicates.setdefault(key, (scope, field, op, value))
+        return key
+
+    @staticmethod
+    def _mask(column: np.ndarray, op: str, value: Any) -> np.ndarray:
+        if op == 'truthy':
+            return column.astype(bool)
+        if op == 'falsy':
+            return ~column.astype(bool)
+        if op in ('in', 'not_in'):
+            # Küme üyeliği (np.isin nesne dizilerinde None ile str'yi sıralayamaz)
+            members = set(value)
+            mask = np.fromiter((item in members for item in column.tolist()), dtype=bool, count=len(column))
+            return mask if op == 'in' else ~mask
+        return np.asarray(COMPARISONS[op](column, value), dtype=bool)
+
+    @staticmethod
+    def _test(item: Any, op: str, value: Any) -> bool:
+        if op == 'truthy':
+            return bool(item)
+        if op == 'falsy':
+            return not item
+        if op in ('in', 'not_in'):
+            return (item in value) == (op == 'in')
+        try:
+            return bool(SCALAR_COMPARISONS[op](item, value))
+        except TypeError:
+            return False
+
+    def evaluate_one(self, context: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Tek ürünü dizi kurmadan değerlendirir (evaluate ile aynı sonuç ve sıra)
+
+        Ürün yüklemleri bir kez, lif yüklemleri lif başına bir kez hesaplanır.
+        """
+        product_results: Dict[Tuple, bool] = {}
+
+        def holds(key: Tuple, fiber: Optional[Dict[str, Any]], fiber_results: Dict[Tuple, bool]) -> bool:
+            scope, field, op, value = self.predicates[key]
+            cache = fiber_results if field in FIBER_FIELDS else product_results
+            if key not in cache:
+                cache[key] = self._test(_field_value(field, context, fiber), op, value)
+            return cache[key]
+
+        matches = []
+        fibers = context.get('fiberComposition', [])
+        index = 0
+        while index < len(self.rules):
+            rule = self.rules[index]
+            if rule['scope'] == 'product':
+                if all(holds(key, None, {}) for key in rule['predicates']):
+                    matches.append((rule, None))
+                index += 1
+                continue
+            # Ardışık fiber kuralları: önce lif sırası, sonra kural sırası
+            group = [r for r in self.rules[index:] if r['group'] == rule['group']]
+            for fiber in fibers:
+                fiber_results: Dict[Tuple, bool] = {}
+                for fiber_rule in group:
+                    if all(holds(key, fiber, fiber_results) for key in fiber_rule['predicates']):
+                        matches.append((fiber_rule, fiber))
+            index += len(group)
+        return matches
+
+    def evaluate(self, batch: ProductBatch) -> List[List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]:
+        """
+        Kuralları ürün grubunda değerlendirir
+
+        Returns:
+            Ürün başına (kural, lif veya None) eşleşmeleri, özgün öneri sırasıyla
+        """
+        sizes = {'product': len(batch), 'fiber': len(batch.fibers)}
+        masks = {key: self._mask(batch.column(field, scope), op, value)
+                 for key, (scope, field, op, value) in self.predicates.items()}
+
+        products, groups, slots, rule_indices, fiber_rows = [], [], [], [], []
+        for index, rule in enumerate(self.rules):
+            mask = np.ones(sizes[rule['scope']], dtype=bool)
+            for key in rule['predicates']:
+                mask &= masks[key]
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                continue
+            if rule['scope'] == 'fiber':
+                products.append(batch.fiber_product[rows])
+                slots.append(batch.fiber_slot[rows])
+                fiber_rows.append(rows)
+            else:
+                products.append(rows)
+                slots.append(np.zeros(len(rows), dtype=np.int64))
+                fiber_rows.append(np.full(len(rows), -1, dtype=np.int64))
+            groups.append(np.full(len(rows), rule['group'], dtype=np.int64))
+            rule_indices.append(np.full(len(rows), index, dtype=np.int64))
+
+        matches: List[List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]] = [[] for _ in range(len(batch))]
+        if not products:
+            return matches
+
+        products, groups, slots, rule_indices, fiber_rows = (
+            np.concatenate(parts) for parts in (products, groups, slots, rule_indices, fiber_rows))
+        order = np.lexsort((rule_indices, slots, groups, products))
+        for product, rule_index, fiber_row in zip(products[order].tolist(), rule_indices[order].tolist(),
+                                                  fiber_rows[order].tolist()):
+            matches[product].append((self.rules[rule_index],
+                                     batch.fibers[fiber_row] if fiber_row >= 0 else None))
+        return matches
+
+class RuleEngine:
+    """
+    Dosyadan yüklenen, değişiklikte yeniden derlenen kural motoru
+
+    Dosyanın değişiklik zamanı en fazla check_interval saniyede bir
+    kontrol edilir; değişmişse tablo yeniden derlenir ve version artar
+    (analiz önbelleği bu sürümle geçersizlenir). Hatalı bir tablo yüklenmez,
+    önceki kurallar kullanılmaya devam eder.
+    """
+
+    def __init__(self, path: str = DEFAULT_RULES_PATH, check_interval: float = 1.0):
+        """
+        Args:
+            path: Kural tablosu (JSON) dosya yolu
+            check_interval: Dosya değişikliği kontrol aralığı (saniye)
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.version = 0
+        self.stats = {'reloads': 0, 'reload_errors': 0, 'evaluated_products': 0}
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._mtime: Optional[int] = None
+        self.compiled = self._load()
+
+    def _load(self) -> CompiledRules:
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, 'r', encoding='utf-8') as f:
+            compiled = CompiledRules(json.load(f))
+        self._mtime = mtime
+        self.version += 1
+        return compiled
+
+    def maybe_reload(self) -> bool:
+        """
+        Kural dosyası değiştiyse yeniden derler
+
+        Returns:
+            Kurallar yeniden yüklendiyse True
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self._mtime:
+                    return False
+                # Hatalı dosya, değişene kadar yeniden denenmez
+                self._mtime = mtime
+                self.compiled = self._load()
+            except (OSError, ValueError) as e:
+                self.stats['reload_errors'] += 1
+                logger.error(f"Öneri kuralları yüklenemedi, önceki kurallar kullanılıyor: {e}")
+                return False
+            self.stats['reloads'] += 1
+            logger.info(f"Öneri kuralları yeniden yüklendi (sürüm {self.version})")
+            return True
+
+    def current_version(self) -> int:
+        """Değişiklik kontrolünden sonra kural sürümü"""
+        self.maybe_reload()
+        return self.version
+
+    def evaluate(self, contexts: Sequence[Dict[str, Any]]) -> List[List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]]:
+        """
+        Ürün bağlamlarını güncel kurallarla değerlendirir
+
+        Args:
+            contexts: ProductBatch bağlamları
+
+        Returns:
+            Ürün başına (kural, lif veya None) eşleşmeleri
+        """
+        self.maybe_reload()
+        self.stats['evaluated_products'] += len(contexts)
+        compiled = self.compiled
+        if len(contexts) <= SCALAR_BATCH_LIMIT:
+            return [compiled.evaluate_one(context) for context in contexts]
+        return compiled.evaluate(ProductBatch(contexts))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Kural sayısı, sürüm ve yeniden yükleme istatistikleri"""
+        return {
+            'path': self.path,
+            'version': self.version,
+            'table_version': self.compiled.table_version,
+            'rules': len(self.compiled.rules),
+            'predicates': len(self.compiled.predicates),
+            **self.stats
+        }
+
+def render_description(rule: Dict[str, Any], context: Dict[str, Any],
+                       fiber: Optional[Dict[str, Any]]) -> str:
+    """Öneri açıklamasını ürün ve lif alanlarıyla doldurur ({percentage}, {fiber_type}, ...)"""
+    description = rule['suggestion']['description']
+    if not rule['templated']:
+        return description
+    values = {
+        'current_co2': context.get('current_co2'),
+        'weight': context.get('weight'),
+        'category': context.get('category'),
+        'target_market': context.get('target_market')
+    }
+    if fiber is not None:
+        values['fiber_type'] = fiber.get('type', DEFAULT_FIBER)
+        values['percentage'] = fiber.get('percentage', 0)
+    return description.format_map(values)